@@ -2,15 +2,14 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import ToolMessage
 import json
 
+from agents.tool_prefetch import prefetched_tool_call
 
-def create_fundamentals_analyst(llm, toolkit):
-    def fundamentals_analyst_node(state):
-        coin = state["coin"]
-        current_date = state["trade_date"]
 
-        tools = [toolkit.get_crypto_fundamentals]
+def create_fundamentals_analyst(llm, toolkit, prefetch=False):
+    # Prompts and chains are built once; only coin/date are injected per request
+    tools = [toolkit.get_crypto_fundamentals]
 
-        STRICT_SYSTEM = f"""
+    STRICT_SYSTEM = """
 You are a STRICT crypto fundamentals analyst.
 
 RULES YOU MUST FOLLOW:
@@ -39,43 +38,54 @@ OUTPUT FORMAT:
 **Summary**
 Write 2–4 sentences strictly describing the data. 
 If values are missing, state: "Data incomplete — unable to form full analysis."
+If the tool output has a "warnings" list, name the unavailable data in the Summary.
 
 If the tool output indicates an error or is empty, say:
 
 ⚠️ No fundamental data available for {coin}.
 """
 
-        # Prompt for tool request
-        tool_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "Call the 'get_crypto_fundamentals' tool immediately to retrieve factual data for {coin}. "
-                    "Do not ask questions. Do not reason. Just call the tool."
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(coin=coin)
-
-        # Prompt for final formatted report
-        report_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", STRICT_SYSTEM),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(coin=coin, current_date=current_date)
-
-        tool_chain = tool_prompt | llm
-        report_chain = report_prompt | llm
-
-        # Step 1 — Trigger tool call
-        result = tool_chain.invoke(state["messages"])
+    # Prompt for tool request
+    tool_prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "Call the 'get_crypto_fundamentals' tool immediately to retrieve factual data for {coin}. "
+                "Do not ask questions. Do not reason. Just call the tool."
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    # Prompt for final formatted report
+    report_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", STRICT_SYSTEM),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    tool_chain = tool_prompt | llm.bind_tools(tools)
+    report_chain = report_prompt | llm
+
+    async def fundamentals_analyst_node(state):
+        coin = state["coin"]
+        current_date = state["trade_date"]
+        prompt_vars = {"coin": coin, "current_date": current_date}
+
+        # Step 1 — Trigger tool call (or build it directly in prefetch mode)
+        if prefetch:
+            result = prefetched_tool_call("get_crypto_fundamentals", coin)
+        else:
+            result = await tool_chain.ainvoke(
+                {**prompt_vars, "messages": state["messages"]}
+            )
 
         # Step 2 — Execute tool if called
         if result.tool_calls:
             tool_call = result.tool_calls[0]
             tool_func = getattr(toolkit, tool_call["name"])
-            tool_output = tool_func.invoke(tool_call["args"])
+            tool_output = await tool_func.ainvoke(tool_call["args"])
 
             # Empty output handling
             if not tool_output or tool_output.strip() == "":
@@ -92,7 +102,9 @@ If the tool output indicates an error or is empty, say:
             state["messages"].append(tool_message)
 
             # Step 3 — Second pass (Generate report)
-            result = report_chain.invoke({"messages": state["messages"]})
+            result = await report_chain.ainvoke(
+                {**prompt_vars, "messages": state["messages"]}
+            )
 
         final_report = result.content or f"⚠️ No fundamental data available for {coin}."
 
@@ -4,8 +4,120 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage
 
 
+# Mean social polarity (-1..1) at or below which a Buy is held back
+SENTIMENT_BEARISH = -0.3
+# ... and at or above which it is noted as supporting the outlook
+SENTIMENT_BULLISH = 0.3
+
+
+def apply_risk_rules(decision, confidence, long_term_conf, user_type, sentiment_score=None):
+    """
+    Risk-adjust a research decision for the trader type.
+
+    Returns (final_action, final_reason, risk_notes). Pure, so the
+    backtest proxy applies exactly the rules the pipeline does.
+    """
+    # --- Risk Adjustment Rules ---
+    risk_notes = []
+
+    holder_action = decision
+    holder_reason = ""
+    if confidence < 0.55:
+        holder_action = "Hold"
+        holder_reason = "Confidence too low for action — defaulting to Hold."
+        risk_notes.append(
+            "Overall confidence < 0.55 — Holder action downgraded to Hold."
+        )
+    elif decision == "Buy" and confidence <= 0.7:
+        holder_action = "Hold"
+        holder_reason = (
+            "Buy signal lacks strong confidence — set to Hold for caution."
+        )
+        risk_notes.append("Buy confidence ≤ 0.7 — Holder action adjusted to Hold.")
+    elif decision == "Buy":
+        holder_action = "Buy"
+        holder_reason = "Strong enough research to proceed with Buy."
+        risk_notes.append("Buy confirmed for holder based on overall research.")
+    elif decision == "Sell":
+        holder_action = "Sell"
+        holder_reason = "Sell maintained to prevent downside."
+        risk_notes.append("Sell preserved for downside protection.")
+    else:
+        holder_action = "Hold"
+        holder_reason = "No major risk signals — maintaining Hold."
+
+    buyer_action = "Hold"
+    buyer_reason = (
+        "New entry not advised unless confidence and long-term view are strong."
+    )
+    if decision == "Buy" and confidence > 0.8 and long_term_conf > 0.75:
+        buyer_action = "Buy"
+        buyer_reason = (
+            "High long-term confidence and overall conviction support new entry."
+        )
+        risk_notes.append("Strong long-term outlook — Buy allowed for new buyers.")
+    else:
+        risk_notes.append(
+            "New buyers advised to Hold unless long-term confidence is strong."
+        )
+
+    # --- Social sentiment (numeric score from the local scorer) ---
+    if sentiment_score is not None and sentiment_score <= SENTIMENT_BEARISH:
+        if "Buy" in (holder_action, buyer_action):
+            risk_notes.append(
+                f"Social sentiment is bearish ({sentiment_score:+.2f}) — Buy downgraded to Hold."
+            )
+        if holder_action == "Buy":
+            holder_action = "Hold"
+            holder_reason = "Buy held back while social sentiment is clearly bearish."
+        if buyer_action == "Buy":
+            buyer_action = "Hold"
+            buyer_reason = "New entry held back while social sentiment is clearly bearish."
+    elif sentiment_score is not None and sentiment_score >= SENTIMENT_BULLISH:
+        risk_notes.append(f"Social sentiment is bullish ({sentiment_score:+.2f}).")
+
+    # --- Choose final recommendation based on user_type ---
+    if user_type == "holder":
+        return holder_action, holder_reason, risk_notes
+    return buyer_action, buyer_reason, risk_notes
+
+
 def create_risk_manager_agent(llm):
-    def risk_manager_node(state):
+    # --- Prompt for explanation (built once; inputs injected per request) ---
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a risk management analyst. The trade date is {current_date}.",
+            ),
+            (
+                "user",
+                """
+Based on the research summary, give a FINAL risk-adjusted recommendation 
+only for the specified trader type and investment horizon.
+
+Trader Type: {user_type}
+Investment Horizon: {horizon}
+Recommendation: {final_action}
+Reason: {final_reason}
+
+Horizon Forecast:
+{horizon} term: {horizon_rec} ({horizon_conf})
+
+Risk Notes:
+{risk_notes}
+
+Research Summary:
+{summary}
+                """,
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    chain = prompt | llm
+
+    async def risk_manager_node(state):
         coin = state["coin"]
         current_date = state["trade_date"]
 
@@ -48,57 +160,9 @@ def create_risk_manager_agent(llm):
         )
         long_term_conf = horizon_forecasts["long_term"].get("confidence", confidence)
 
-        # --- Risk Adjustment Rules ---
-        risk_notes = []
-
-        holder_action = decision
-        holder_reason = ""
-        if confidence < 0.55:
-            holder_action = "Hold"
-            holder_reason = "Confidence too low for action — defaulting to Hold."
-            risk_notes.append(
-                "Overall confidence < 0.55 — Holder action downgraded to Hold."
-            )
-        elif decision == "Buy" and confidence <= 0.7:
-            holder_action = "Hold"
-            holder_reason = (
-                "Buy signal lacks strong confidence — set to Hold for caution."
-            )
-            risk_notes.append("Buy confidence ≤ 0.7 — Holder action adjusted to Hold.")
-        elif decision == "Buy":
-            holder_action = "Buy"
-            holder_reason = "Strong enough research to proceed with Buy."
-            risk_notes.append("Buy confirmed for holder based on overall research.")
-        elif decision == "Sell":
-            holder_action = "Sell"
-            holder_reason = "Sell maintained to prevent downside."
-            risk_notes.append("Sell preserved for downside protection.")
-        else:
-            holder_action = "Hold"
-            holder_reason = "No major risk signals — maintaining Hold."
-
-        buyer_action = "Hold"
-        buyer_reason = (
-            "New entry not advised unless confidence and long-term view are strong."
+        final_action, final_reason, risk_notes = apply_risk_rules(
+            decision, confidence, long_term_conf, user_type, state.get("sentiment_score")
         )
-        if decision == "Buy" and confidence > 0.8 and long_term_conf > 0.75:
-            buyer_action = "Buy"
-            buyer_reason = (
-                "High long-term confidence and overall conviction support new entry."
-            )
-            risk_notes.append("Strong long-term outlook — Buy allowed for new buyers.")
-        else:
-            risk_notes.append(
-                "New buyers advised to Hold unless long-term confidence is strong."
-            )
-
-        # --- Choose final recommendation based on user_type ---
-        if user_type == "holder":
-            final_action = holder_action
-            final_reason = holder_reason
-        else:
-            final_action = buyer_action
-            final_reason = buyer_reason
 
         # --- Filter horizon-specific recommendation ---
         horizon_map = {
@@ -110,65 +174,26 @@ def create_risk_manager_agent(llm):
             horizon, (long_term_rec, long_term_conf)
         )
 
-        # --- Prompt for explanation ---
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    f"You are a risk management analyst. The trade date is {current_date}.",
-                ),
-                (
-                    "user",
-                    """
-Based on the research summary, give a FINAL risk-adjusted recommendation 
-only for the specified trader type and investment horizon.
-
-Trader Type: {user_type}
-Investment Horizon: {horizon}
-Recommendation: {final_action}
-Reason: {final_reason}
-
-Horizon Forecast:
-{horizon} term: {horizon_rec} ({horizon_conf})
-
-Risk Notes:
-{risk_notes}
-
-Research Summary:
-{summary}
-                    """,
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(
-            user_type=user_type,
-            horizon=horizon,
-            final_action=final_action,
-            final_reason=final_reason,
-            horizon_rec=horizon_rec,
-            horizon_conf=horizon_conf,
-            risk_notes="\n".join(risk_notes),
-            summary=research_summary,
-        )
-
-        chain = prompt | llm
-
-        try:
-            result = chain.invoke({"messages": state.get("messages", [])})
-            return {
-                "messages": [AIMessage(content=result.content)],
-                "final_recommendation": final_action,
+        result = await chain.ainvoke(
+            {
+                "current_date": current_date,
+                "user_type": user_type,
+                "horizon": horizon,
+                "final_action": final_action,
                 "final_reason": final_reason,
-                "confidence": horizon_conf,
+                "horizon_rec": horizon_rec,
+                "horizon_conf": horizon_conf,
                 "risk_notes": "\n".join(risk_notes),
-            }
-        except Exception as e:
-            return {
+                "summary": research_summary,
                 "messages": state.get("messages", []),
-                "final_recommendation": "Hold",
-                "final_reason": f"Error during decision evaluation: {e}",
-                "confidence": 0.5,
-                "risk_notes": f"Error during risk check: {e}",
             }
+        )
+        return {
+            "messages": [AIMessage(content=result.content)],
+            "final_recommendation": final_action,
+            "final_reason": final_reason,
+            "confidence": horizon_conf,
+            "risk_notes": "\n".join(risk_notes),
+        }
 
     return risk_manager_node
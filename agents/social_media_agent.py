@@ -1,93 +1,105 @@
 # agents/social_media_agent.py
 
+import json
+
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import ToolMessage
 
-
-def create_sentiment_analyst(llm, toolkit):
-    def sentiment_analyst_node(state):
+from agents.tool_prefetch import prefetched_tool_call
+
+
+def mean_polarity(tool_output):
+    """The scorer's mean polarity from the tool's JSON (None without posts)."""
+    try:
+        return json.loads(tool_output).get("mean")
+    except (ValueError, AttributeError):
+        return None
+
+
+def create_sentiment_analyst(llm, toolkit, prefetch=False):
+    # Prompts and chains are built once; only coin/date are injected per request
+    # Uses the existing tool from the toolkit
+    tools = [toolkit.get_reddit_sentiment_posts]
+
+    system_message = (
+        "You are a social media sentiment analyst. You have called the "
+        "'get_reddit_sentiment_posts' tool, which scored recent social and news "
+        "posts related to {coin} (from Twitter/X and CryptoPanic news).\n\n"
+        "The tool output is provided in the messages as JSON: 'posts' scored, "
+        "'mean' polarity (-1 bearish to 1 bullish), 'std' (dispersion: high means "
+        "opinions are split), 'bullish'/'bearish'/'neutral' counts, "
+        "'bull_bear_ratio', and a few 'representative' posts with their polarity.\n"
+        "Do not re-score the posts. Interpret the aggregates and use the "
+        "representative posts to name what is driving the mood.\n\n"
+        "Report format:\n"
+        "**Mood**: Bullish, Bearish or Neutral, with the mean and bull/bear ratio.\n"
+        "**Agreement**: How split the posts are, from the dispersion.\n"
+        "**Drivers**: 2-3 bullets on the themes in the representative posts.\n"
+        "**Summary**: One sentence on what social sentiment implies for {coin}.\n\n"
+        "If 'posts' is 0, state that no recent posts were found for {coin} and "
+        "suggest checking other sources like market news, on-chain data, or "
+        "longer-term fundamentals.\n\n"
+        "Do not call the 'get_reddit_sentiment_posts' tool again; "
+        "use the provided tool output to generate the report."
+    )
+
+    # Prompt for first LLM call (with tool-calling)
+    tool_prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a helpful AI sentiment analyst.\n"
+                "You have access to the following tools: {tool_names}.\n"
+                "Use the 'get_reddit_sentiment_posts' tool to fetch recent social/news "
+                "posts for {coin}.\n"
+                "Date: {current_date}.",
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    ).partial(tool_names=", ".join([tool.name for tool in tools]))
+
+    # Prompt for second LLM call (without tool-calling)
+    report_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", system_message),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    # Chain for first call (with tools)
+    tool_chain = tool_prompt | llm.bind_tools(tools)
+
+    # Chain for second call (no tools to prevent re-triggering)
+    report_chain = report_prompt | llm
+
+    async def sentiment_analyst_node(state):
         coin = state["coin"]
         current_date = state["trade_date"]
+        prompt_vars = {"coin": coin, "current_date": current_date}
 
-        # Uses the existing tool from the toolkit
-        tools = [toolkit.get_reddit_sentiment_posts]
-
-        system_message = (
-            f"You are a social media sentiment analyst. You have called the "
-            f"'get_reddit_sentiment_posts' tool to fetch recent social and news posts "
-            f"related to {coin}. These posts come from sources like Twitter/X and "
-            f"CryptoPanic news.\n\n"
-            f"The tool output is provided in the messages. Classify each post as "
-            f"Positive (e.g., optimistic, bullish), Negative (e.g., critical, bearish), "
-            f"or Neutral (e.g., factual, no strong opinion).\n"
-            f"Provide a markdown table with columns: Post (short excerpt, max 50 characters), "
-            f"Sentiment, Reason.\n"
-            f"Summarize the overall market mood (e.g., Bullish, Bearish, Neutral).\n\n"
-            f"If the tool output is 'No recent posts found for this coin.' or similar, "
-            f"return a report stating:\n"
-            f"| Post | Sentiment | Reason |\n"
-            f"|------|-----------|--------|\n"
-            f"| No posts found | Neutral | No recent posts available |\n\n"
-            f"**Summary**: No recent posts found for {coin}. Consider checking other "
-            f"sources like market news, on-chain data, or longer-term fundamentals.\n\n"
-            f"Example output:\n"
-            f"| Post | Sentiment | Reason |\n"
-            f"|------|-----------|--------|\n"
-            f"| Bitcoin to the moon! | Positive | Optimistic about price |\n"
-            f"| BTC is crashing | Negative | Bearish sentiment |\n\n"
-            f"**Summary**: Mixed sentiment with cautious outlook.\n\n"
-            f"Do not call the 'get_reddit_sentiment_posts' tool again; "
-            f"use the provided tool output to generate the report."
-        )
-
-        # Prompt for first LLM call (with tool-calling)
-        tool_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "You are a helpful AI sentiment analyst.\n"
-                    "You have access to the following tools: {tool_names}.\n"
-                    "Use the 'get_reddit_sentiment_posts' tool to fetch recent social/news "
-                    "posts for {coin}.\n"
-                    "Date: {current_date}.",
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(
-            current_date=current_date,
-            tool_names=", ".join([tool.name for tool in tools]),
-            coin=coin,
-        )
-
-        # Prompt for second LLM call (without tool-calling)
-        report_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_message),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(current_date=current_date, coin=coin)
-
-        # Chain for first call (with tools)
-        tool_chain = tool_prompt | llm
-
-        # Chain for second call (no tools to prevent re-triggering)
-        report_chain = report_prompt | llm
-
-        # STEP 1: First LLM call triggers tool
-        result = tool_chain.invoke(state["messages"])
+        # STEP 1: First LLM call triggers tool (skipped in prefetch mode)
+        if prefetch:
+            result = prefetched_tool_call("get_reddit_sentiment_posts", coin)
+        else:
+            result = await tool_chain.ainvoke(
+                {**prompt_vars, "messages": state["messages"]}
+            )
 
         # STEP 2: If tools were triggered, call them and re-run LLM
+        sentiment_score = None
         if result.tool_calls:
             tool_outputs = []
             for tool_call in result.tool_calls:
                 tool_name = tool_call["name"]
                 args = tool_call["args"]
                 tool_func = getattr(toolkit, tool_name)
-                tool_output = tool_func.invoke(args)
+                tool_output = await tool_func.ainvoke(args)
 
                 # Ensure tool_output is not empty
                 if not tool_output or tool_output.strip() == "":
                     tool_output = "No recent posts found for this coin."
+                else:
+                    sentiment_score = mean_polarity(tool_output)
 
                 # Wrap tool output as ToolMessage
                 tool_outputs.append(
@@ -101,14 +113,11 @@ def create_sentiment_analyst(llm, toolkit):
             state["messages"].append(result)        # AIMessage with tool calls
             state["messages"].append(tool_outputs[0])  # ToolMessage
 
-            # STEP 3: Re-run LLM with report prompt (no tools)
-            try:
-                result = report_chain.invoke(state["messages"])
-            except Exception as e:
-                return {
-                    "messages": state["messages"],
-                    "sentiment_report": f"Error: Failed to generate report due to {str(e)}",
-                }
+            # STEP 3: Re-run LLM with report prompt (no tools). Failures propagate
+            # so the run fails and can be resumed from this node.
+            result = await report_chain.ainvoke(
+                {**prompt_vars, "messages": state["messages"]}
+            )
 
             # Check for unexpected tool calls
             if result.tool_calls:
@@ -116,19 +125,16 @@ def create_sentiment_analyst(llm, toolkit):
                     state["messages"][0],  # Original HumanMessage
                     tool_outputs[0],       # ToolMessage
                 ]
-                try:
-                    result = report_chain.invoke(simplified_messages)
-                except Exception as e:
-                    return {
-                        "messages": state["messages"],
-                        "sentiment_report": f"Error: Failed to generate report on retry due to {str(e)}",
-                    }
+                result = await report_chain.ainvoke(
+                    {**prompt_vars, "messages": simplified_messages}
+                )
 
         report = result.content or "⚠️ No report generated."
 
         return {
             "messages": [result],
             "sentiment_report": report,
+            "sentiment_score": sentiment_score,
         }
 
     return sentiment_analyst_node
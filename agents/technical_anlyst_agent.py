@@ -1,62 +1,71 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import ToolMessage, AIMessage
+from langchain_core.messages import ToolMessage
 import json
-import uuid
 
-
-def create_technical_analyst(llm, toolkit):
-    def technical_analyst_node(state):
+from agents.tool_prefetch import prefetched_tool_call
+
+
+def create_technical_analyst(llm, toolkit, prefetch=False):
+    # Prompts and chains are built once; only coin/date are injected per request
+    tools = [toolkit.get_crypto_technicals]
+
+    # System message for report generation
+    system_message = (
+        "You are a cryptocurrency technical analyst. You have called the 'get_crypto_technicals' tool to fetch technical indicators (RSI, MACD, Bollinger Bands) for {coin}. "
+        "The tool output is provided in the messages as a JSON string containing hourly indicators like rsi, macd, macd_signal, bb_lower, bb_upper, bb_middle, close, "
+        "plus a 'timeframes' object with 1h/4h/1d views that add ema20/ema50/ema200, atr, stoch_rsi (0-1, with %K/%D), obv and annualized realized_vol (null where history is too short). "
+        "Write a detailed expert-level analysis explaining the technical outlook, highlighting overbought/oversold conditions, momentum, trend alignment across timeframes, and volatility. "
+        "Include a markdown table with columns: Indicator, Value, Interpretation (e.g., Overbought, Bullish, Neutral). "
+        "Provide a professional summary of the technical outlook (e.g., bullish, bearish, neutral). "
+        "If the tool output is empty or reports an error, state: 'No technical data available for {coin}.'"
+        "Example output:\n"
+        "## Technical Report for {coin}\n"
+        "[Analysis of RSI, MACD, Bollinger Bands...]"
+    )
+
+    # Prompt for first LLM call (tool-calling)
+    tool_prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a crypto analyst AI.\n"
+                "Immediately call the 'get_crypto_technicals' tool to fetch technical indicators for the coin '{coin}'.\n"
+                "Do not ask for clarification or additional input; use the provided coin symbol.\n"
+                "Date: {current_date}.",
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    # Prompt for second LLM call (report generation, no tools)
+    report_prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                system_message,
+            ),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    )
+
+    # Chains
+    tool_chain = tool_prompt | llm.bind_tools(tools)
+    report_chain = report_prompt | llm
+
+    async def technical_analyst_node(state):
         coin = state["coin"]
         current_date = state["trade_date"]
-
-        tools = [toolkit.get_crypto_technicals]
+        prompt_vars = {"coin": coin, "current_date": current_date}
 
         # print(f"[🧪] Running technical analysis for: {coin}")
 
-        # System message for report generation
-        system_message = (
-            f"You are a cryptocurrency technical analyst. You have called the 'get_crypto_technicals' tool to fetch technical indicators (RSI, MACD, Bollinger Bands) for {coin}. "
-            f"The tool output is provided in the messages as a JSON string containing indicators like rsi, macd, macd_signal, bb_lower, bb_upper, bb_middle, close. "
-            f"Write a detailed expert-level analysis explaining the technical outlook, highlighting overbought/oversold conditions, momentum, and volatility. "
-            f"Include a markdown table with columns: Indicator, Value, Interpretation (e.g., Overbought, Bullish, Neutral). "
-            f"Provide a professional summary of the technical outlook (e.g., bullish, bearish, neutral). "
-            f"If the tool output is empty or reports an error, state: 'No technical data available for {coin}.'"
-            f"Example output:\n"
-            f"## Technical Report for {coin}\n"
-            f"[Analysis of RSI, MACD, Bollinger Bands...]"
-        )
-
-        # Prompt for first LLM call (tool-calling)
-        tool_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "You are a crypto analyst AI.\n"
-                    "Immediately call the 'get_crypto_technicals' tool to fetch technical indicators for the coin '{coin}'.\n"
-                    "Do not ask for clarification or additional input; use the provided coin symbol.\n"
-                    "Date: {current_date}.",
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(current_date=current_date, coin=coin)
-
-        # Prompt for second LLM call (report generation, no tools)
-        report_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    system_message,
-                ),
-                MessagesPlaceholder(variable_name="messages"),
-            ]
-        ).partial(current_date=current_date, coin=coin)
-
-        # Chains
-        tool_chain = tool_prompt | llm
-        report_chain = report_prompt | llm
-
-        # STEP 1: First LLM call to trigger tool
-        result = tool_chain.invoke(state["messages"])
+        # STEP 1: First LLM call to trigger tool (skipped in prefetch mode)
+        if prefetch:
+            result = prefetched_tool_call("get_crypto_technicals", coin)
+        else:
+            result = await tool_chain.ainvoke(
+                {**prompt_vars, "messages": state["messages"]}
+            )
         # print(f"[🧪] First result.tool_calls: {result.tool_calls}")
         # print(f"[🧪] First result.content: {result.content}")
 
@@ -65,18 +74,7 @@ def create_technical_analyst(llm, toolkit):
             # print(
             #     f"[🧪] Warning: No tool calls generated, manually triggering get_crypto_technicals for {coin}"
             # )
-            tool_call_id = str(uuid.uuid4())
-            result = AIMessage(
-                content="",
-                tool_calls=[
-                    {
-                        "name": "get_crypto_technicals",
-                        "args": {"coin": coin},
-                        "id": tool_call_id,
-                        "type": "tool_call",
-                    }
-                ],
-            )
+            result = prefetched_tool_call("get_crypto_technicals", coin)
 
         # STEP 3: Execute tool calls
         tool_outputs = []
@@ -85,7 +83,7 @@ def create_technical_analyst(llm, toolkit):
             args = tool_call["args"]
             # print(f"[🧪] Calling tool: {tool_name} with args: {args}")
             tool_func = getattr(toolkit, tool_name)
-            tool_output = tool_func.invoke(args)
+            tool_output = await tool_func.ainvoke(args)
             # print(f"[🧪] Tool output: {tool_output}")
             # Ensure tool_output is valid
             if not tool_output or tool_output.strip() == "":
@@ -106,18 +104,12 @@ def create_technical_analyst(llm, toolkit):
         # Log messages before second invoke
         # print(f"[🧪] Messages before second invoke: {state['messages']}")
 
-        # STEP 4: Re-run LLM with report prompt (no tools)
-        try:
-            input_dict = {"messages": state["messages"]}
-            # print(f"[🧪] Input to report_chain: {input_dict}")
-            result = report_chain.invoke(input_dict)
-            # print(f"[🧪] Second LLM result: {result}")
-        except Exception as e:
-            # print(f"[🧪] Error invoking LLM: {e}")
-            return {
-                "messages": state["messages"],
-                "technical_report": f"Error: Failed to generate report due to {str(e)}",
-            }
+        # STEP 4: Re-run LLM with report prompt (no tools). Failures propagate
+        # so the run fails and can be resumed from this node.
+        input_dict = {**prompt_vars, "messages": state["messages"]}
+        # print(f"[🧪] Input to report_chain: {input_dict}")
+        result = await report_chain.ainvoke(input_dict)
+        # print(f"[🧪] Second LLM result: {result}")
 
         # Check for unexpected tool calls
         if result.tool_calls:
@@ -129,17 +121,10 @@ def create_technical_analyst(llm, toolkit):
                 state["messages"][0],  # Original HumanMessage
                 tool_outputs[0],  # ToolMessage
             ]
-            try:
-                input_dict = {"messages": simplified_messages}
-                # print(f"[🧪] Retry input to report_chain: {input_dict}")
-                result = report_chain.invoke(input_dict)
-                # print(f"[🧪] Retry LLM result: {result}")
-            except Exception as e:
-                # print(f"[🧪] Retry failed: {e}")
-                return {
-                    "messages": state["messages"],
-                    "technical_report": f"Error: Failed to generate report on retry due to {str(e)}",
-                }
+            input_dict = {**prompt_vars, "messages": simplified_messages}
+            # print(f"[🧪] Retry input to report_chain: {input_dict}")
+            result = await report_chain.ainvoke(input_dict)
+            # print(f"[🧪] Retry LLM result: {result}")
 
         report = result.content or f"No technical data available for {coin}."
         # print(f"[🧪] Final report: {report}")
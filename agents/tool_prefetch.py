@@ -0,0 +1,25 @@
+# agents/tool_prefetch.py
+
+from langchain_core.messages import AIMessage
+import uuid
+
+
+def prefetched_tool_call(tool_name, coin):
+    """
+    Build the AIMessage the tool-calling LLM step would have produced.
+
+    The analysts always call exactly one tool with the coin from state, so in
+    prefetch mode we skip that LLM round-trip and let the node execute the
+    tool call directly.
+    """
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": tool_name,
+                "args": {"coin": coin},
+                "id": str(uuid.uuid4()),
+                "type": "tool_call",
+            }
+        ],
+    )
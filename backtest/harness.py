@@ -0,0 +1,317 @@
+# backtest/harness.py
+"""
+Backtest Buy/Hold/Sell decisions against forward returns.
+
+Prices come from a PriceStore of their own (hourly bars, bucketed here
+into daily bars), kept apart from the app's live store so fetched history
+is never trimmed by, or mixed into, the live retention window. Two scorers:
+
+  proxy     Deterministic technical view + the risk manager's rules,
+            computed for every date of a coin at once; coins are split
+            across a process pool.
+  pipeline  The full graph via `arun_trading_pipeline_batch`, one batch
+            per sampled date. The analyst tools read *current* upstream
+            data, so run this with LLM_MODE=replay over recorded fixtures
+            (or only for recent dates) to get a meaningful score.
+
+Run from the repo root:
+    python -m backtest.harness --coins bitcoin,ethereum,solana \\
+        --start 2025-01-01 --end 2025-06-30 --horizon short_term --workers 4
+    python -m backtest.harness ... --fetch      # fill the store from CoinGecko first
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backtest.signals import proxy_actions, technical_view
+from toolkit.indicator_state import bucket_bars
+from toolkit.price_store import PRICE_RETENTION_DAYS, PRICE_STORE_DIR, PriceStore
+
+BACKTEST_STORE_DIR = os.getenv(
+    "BACKTEST_STORE_DIR", os.path.join(os.path.dirname(PRICE_STORE_DIR), "backtest-prices")
+)
+DAY = 86400
+# Forward-return window scored for each pipeline horizon, in days
+HORIZON_DAYS = {"short_term": 7, "medium_term": 30, "long_term": 90}
+# Days of history before the start date so the slow indicators are warm
+WARMUP_DAYS = 200
+# A Hold counts as right when the price stays within this band
+HOLD_BAND = 0.02
+ACTIONS = ("Buy", "Hold", "Sell")
+
+
+def to_ts(day: str) -> int:
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def to_day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+# ---------------- Data ---------------- #
+
+def open_store(path: str, first_day: int) -> PriceStore:
+    """A PriceStore whose retention reaches back to `first_day`, so appends keep the window."""
+    days = (int(time.time()) - first_day) // DAY + 1
+    return PriceStore(path=path, retention_days=max(PRICE_RETENTION_DAYS, days))
+
+
+def fetch_history(prices: PriceStore, coin_ids, start: int, end: int, vs_currency="usd"):
+    """Fill the store for [start - warm-up, end] from CoinGecko's range endpoint."""
+    from toolkit.coin_registry import coin_registry
+    from toolkit.http_client import HttpClient
+
+    http = HttpClient()
+    base_url = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+    for coin in coin_ids:
+        coin_id = coin_registry.coin_id(coin) or coin
+        response = http.get(
+            f"{base_url}/coins/{coin_id}/market_chart/range",
+            params={
+                "vs_currency": vs_currency,
+                "from": start - WARMUP_DAYS * DAY,
+                "to": end,
+                "x_cg_demo_api_key": os.getenv("COINGECKO_API_KEY"),
+            },
+        )
+        if response.status_code != 200:
+            print(f"[WARN] History fetch for {coin_id} failed: {response.status_code}")
+            continue
+        data = response.json()
+        prices.append(coin_id, vs_currency, data.get("prices"), data.get("total_volumes"))
+
+
+def daily_matrices(prices: PriceStore, coin_ids, first_day: int, last_day: int, vs_currency="usd"):
+    """
+    (high, low, close, volume) coins × days matrices on a shared UTC date
+    grid; days a coin has no bars for stay NaN. Warns when a coin's stored
+    range does not cover the window.
+    """
+    days = (last_day - first_day) // DAY + 1
+    # Bars can't exist past today, so a window reaching into the future isn't short
+    covered_to = min(last_day, int(time.time()) // DAY * DAY - DAY)
+    matrices = np.full((4, len(coin_ids), days), np.nan)
+    for row, coin_id in enumerate(coin_ids):
+        bars = prices.read(coin_id, vs_currency)
+        if bars is None or len(bars) == 0:
+            print(f"[WARN] No stored bars for {coin_id}; run with --fetch")
+            continue
+        stored_from, stored_to = int(bars["ts"][0]), int(bars["ts"][-1])
+        if stored_from > first_day or stored_to < covered_to:
+            print(
+                f"[WARN] Stored bars for {coin_id} cover "
+                f"{to_day(stored_from)}..{to_day(stored_to)}, not "
+                f"{to_day(first_day)}..{to_day(last_day)}; run with --fetch"
+            )
+        for start, high, low, close, volume in bucket_bars(bars, DAY):
+            column = (start - first_day) // DAY
+            if 0 <= column < days:
+                matrices[:, row, column] = (high, low, close, volume)
+    return matrices
+
+
+def forward_returns(close, horizon_days):
+    forward = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward[:, :-horizon_days] = close[:, horizon_days:] / close[:, :-horizon_days] - 1
+    return forward
+
+
+# ---------------- Scoring ---------------- #
+
+def score(actions, returns):
+    """Per-action counts, hit rates and mean forward returns, plus the strategy return."""
+    actions = np.asarray(actions, dtype=object)
+    returns = np.asarray(returns, dtype=float)
+    scored = ~np.isnan(returns) & np.isin(actions, ACTIONS)
+    actions, returns = actions[scored], returns[scored]
+
+    hits = np.select(
+        [actions == "Buy", actions == "Sell"],
+        [returns > 0, returns < 0],
+        default=np.abs(returns) <= HOLD_BAND,
+    )
+    # Long on Buy, short on Sell, flat on Hold
+    position = np.select([actions == "Buy", actions == "Sell"], [1.0, -1.0], default=0.0)
+
+    by_action = {}
+    for action in ACTIONS:
+        chosen = actions == action
+        count = int(chosen.sum())
+        by_action[action] = {
+            "count": count,
+            "hit_rate": round(float(hits[chosen].mean()), 4) if count else None,
+            "mean_forward_return": round(float(returns[chosen].mean()), 4) if count else None,
+        }
+    if not len(actions):
+        return {"signals": 0, "by_action": by_action}
+    return {
+        "signals": int(len(actions)),
+        "hit_rate": round(float(hits.mean()), 4),
+        "strategy_mean_return": round(float((position * returns).mean()), 4),
+        "buy_and_hold_mean_return": round(float(returns.mean()), 4),
+        "by_action": by_action,
+    }
+
+
+def backtest_coins(coin_ids, start, end, horizon, user_type, store_path=BACKTEST_STORE_DIR):
+    """
+    Proxy-score a chunk of coins (process-pool worker): indicators and
+    decisions for every date at once, then scored per coin.
+
+    Returns {coin_id: {"actions": [...], "returns": [...]}} over the
+    scored date range.
+    """
+    prices = PriceStore(path=store_path)
+    first_day = start - WARMUP_DAYS * DAY
+    horizon_days = HORIZON_DAYS[horizon]
+    # Bars after `end` only feed the forward returns
+    high, low, close, volume = daily_matrices(
+        prices, coin_ids, first_day, end + horizon_days * DAY
+    )
+    decision, confidence, long_term = technical_view(high, low, close, volume)
+    actions = proxy_actions(decision, confidence, long_term, user_type)
+    forward = forward_returns(close, horizon_days)
+
+    # Only dates in [start, end] with a close are scored
+    scored = slice((start - first_day) // DAY, (end - first_day) // DAY + 1)
+    results = {}
+    for row, coin_id in enumerate(coin_ids):
+        has_close = ~np.isnan(close[row, scored])
+        results[coin_id] = {
+            "actions": actions[row, scored][has_close].tolist(),
+            "returns": forward[row, scored][has_close].tolist(),
+        }
+    return results
+
+
+def run_proxy(coin_ids, start, end, horizon, user_type, workers=1, store_path=BACKTEST_STORE_DIR):
+    chunks = [coin_ids[i::workers] for i in range(workers) if coin_ids[i::workers]]
+    args = [(chunk, start, end, horizon, user_type, store_path) for chunk in chunks]
+    if workers <= 1:
+        parts = [backtest_coins(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(backtest_coins, *zip(*args)))
+    results = {}
+    for part in parts:
+        results.update(part)
+    return results
+
+
+async def run_pipeline(
+    coin_ids, start, end, horizon, user_type, every=7, store_path=BACKTEST_STORE_DIR
+):
+    """Score the full pipeline's final decisions on every `every`-th day."""
+    from main_runner import arun_trading_pipeline_batch
+
+    prices = PriceStore(path=store_path)
+    horizon_days = HORIZON_DAYS[horizon]
+    close = daily_matrices(prices, coin_ids, start, end + horizon_days * DAY)[2]
+    forward = forward_returns(close, horizon_days)
+    rows = {coin_id: row for row, coin_id in enumerate(coin_ids)}
+    results = {coin_id: {"actions": [], "returns": []} for coin_id in coin_ids}
+
+    for column in range(0, (end - start) // DAY + 1, every):
+        trade_date = to_day(start + column * DAY)
+        async for coin_id, result in arun_trading_pipeline_batch(
+            coin_ids, trade_date=trade_date, trader_position=user_type, duration=horizon
+        ):
+            outcome = forward[rows[coin_id], column]
+            if result["status"] != "success" or np.isnan(outcome):
+                continue
+            results[coin_id]["actions"].append(result["data"]["final_decision"].capitalize())
+            results[coin_id]["returns"].append(float(outcome))
+    return results
+
+
+def report(results, meta) -> dict:
+    actions = [a for r in results.values() for a in r["actions"]]
+    returns = [x for r in results.values() for x in r["returns"]]
+    return {
+        **meta,
+        "overall": score(actions, returns),
+        "per_coin": {coin_id: score(r["actions"], r["returns"]) for coin_id, r in results.items()},
+    }
+
+
+def print_report(summary):
+    overall = summary["overall"]
+    print(
+        f"\n📊 Backtest ({summary['mode']}) {summary['start']} → {summary['end']}, "
+        f"{summary['horizon']} = {summary['horizon_days']}d forward, {summary['trader_position']}"
+    )
+    print(
+        f"signals={overall['signals']} hit_rate={overall.get('hit_rate')} "
+        f"strategy={overall.get('strategy_mean_return')} "
+        f"buy&hold={overall.get('buy_and_hold_mean_return')}"
+    )
+    print(f"{'action':<8}{'count':>8}{'hit rate':>10}{'mean fwd':>10}")
+    for action, row in overall["by_action"].items():
+        hit_rate, mean = str(row["hit_rate"]), str(row["mean_forward_return"])
+        print(f"{action:<8}{row['count']:>8}{hit_rate:>10}{mean:>10}")
+    print(f"\n{'coin':<20}{'signals':>8}{'hit rate':>10}{'strategy':>10}")
+    for coin_id, row in summary["per_coin"].items():
+        hit_rate, strategy = str(row.get("hit_rate")), str(row.get("strategy_mean_return"))
+        print(f"{coin_id:<20}{row['signals']:>8}{hit_rate:>10}{strategy:>10}")
+    print(f"\n⏱️ {summary['seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest Buy/Hold/Sell decisions")
+    parser.add_argument("--coins", required=True, help="comma-separated CoinGecko ids")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--horizon", default="short_term", choices=sorted(HORIZON_DAYS))
+    parser.add_argument("--position", default="existing_buyer")
+    parser.add_argument("--mode", default="proxy", choices=("proxy", "pipeline"))
+    parser.add_argument("--every", type=int, default=7, help="pipeline mode: days between runs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--store", default=BACKTEST_STORE_DIR)
+    parser.add_argument("--fetch", action="store_true", help="fill the store from CoinGecko")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    coin_ids = [c.strip() for c in args.coins.split(",") if c.strip()]
+    start, end = to_ts(args.start), to_ts(args.end)
+    if args.fetch:
+        horizon_end = end + HORIZON_DAYS[args.horizon] * DAY
+        store = open_store(args.store, start - WARMUP_DAYS * DAY)
+        fetch_history(store, coin_ids, start, horizon_end)
+
+    started = time.perf_counter()
+    if args.mode == "proxy":
+        workers = max(1, min(args.workers, len(coin_ids)))
+        results = run_proxy(coin_ids, start, end, args.horizon, args.position, workers, args.store)
+    else:
+        results = asyncio.run(
+            run_pipeline(coin_ids, start, end, args.horizon, args.position, args.every, args.store)
+        )
+
+    summary = report(
+        results,
+        {
+            "mode": args.mode,
+            "start": args.start,
+            "end": args.end,
+            "horizon": args.horizon,
+            "horizon_days": HORIZON_DAYS[args.horizon],
+            "trader_position": args.position,
+            "seconds": round(time.perf_counter() - started, 2),
+        },
+    )
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
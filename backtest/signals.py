@@ -0,0 +1,77 @@
+# backtest/signals.py
+"""
+Deterministic stand-in for the pipeline's decision, vectorized over dates.
+
+The technical analyst reads RSI, MACD, Bollinger position and trend
+EMAs; `technical_view` turns the same indicators (from
+`indicators.compute_extended`, every date at once) into a research
+decision and confidence. `proxy_actions` then runs them through the risk
+manager's own rules (`apply_risk_rules`), so only the LLM's judgement is
+replaced.
+"""
+
+import numpy as np
+
+from agents.risk_management_agent import apply_risk_rules
+from tools import indicators
+
+# |score| needed for a directional call; below it the view is Hold
+DECISION_THRESHOLD = 0.25
+
+
+def technical_view(high, low, close, volume, bar_seconds=86400):
+    """
+    Return (decision, confidence, long_term_confidence) arrays shaped
+    like `close` (coins × dates); dates without enough history are Hold
+    at 0.5 confidence.
+    """
+    values = indicators.compute_extended(
+        high, low, close, volume, bar_seconds, last_only=False
+    )
+    close = values["close"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        components = np.stack(
+            [
+                # Oversold (RSI < 50) leans bullish, overbought bearish
+                np.clip((50 - values["rsi"]) / 20, -1, 1),
+                # Momentum: MACD above its signal line
+                np.sign(values["macd"] - values["macd_signal"]),
+                # Near the lower band leans bullish, the upper band bearish
+                -np.clip(
+                    (close - values["bb_middle"]) / (values["bb_upper"] - values["bb_middle"]),
+                    -1,
+                    1,
+                ),
+                # Trend: price over EMA50, EMA50 over EMA200
+                0.5 * np.sign(close - values["ema50"])
+                + 0.5 * np.sign(values["ema50"] - values["ema200"]),
+            ]
+        )
+    available = ~np.isnan(components)
+    score = np.where(
+        available.any(axis=0),
+        np.nansum(components, axis=0) / np.maximum(available.sum(axis=0), 1),
+        0.0,
+    )
+
+    decision = np.full(close.shape, "Hold", dtype=object)
+    decision[score >= DECISION_THRESHOLD] = "Buy"
+    decision[score <= -DECISION_THRESHOLD] = "Sell"
+    confidence = np.clip(0.5 + 0.5 * np.abs(score), 0, 1)
+
+    trend = np.nan_to_num(components[3])
+    long_term_confidence = np.clip(0.5 + 0.5 * trend * np.sign(score), 0, 1)
+    return decision, confidence, long_term_confidence
+
+
+def proxy_actions(decision, confidence, long_term_confidence, user_type):
+    """The risk manager's final action for every (coin, date) cell."""
+    actions = np.empty(decision.shape, dtype=object)
+    for index in np.ndindex(decision.shape):
+        actions[index], _, _ = apply_risk_rules(
+            decision[index],
+            float(confidence[index]),
+            float(long_term_confidence[index]),
+            user_type,
+        )
+    return actions
@@ -0,0 +1,104 @@
+# benchmarks/bench_agent_setup.py
+"""
+Micro-benchmark: per-request cost of a node with and without the registry.
+
+Before: every node invocation called create_*(llm, toolkit), rebuilding
+prompt templates, re-binding tools and recreating closures, then ran it.
+After: build_agent_registry() does the setup once at compile time and each
+request only runs the prebuilt node.
+
+Both cases time the same path end to end: one node call with its prompt
+formatting, chain invocation and tool round trip. The LLM is the offline
+replay model with zero latency and the tool cache is pre-filled, so the
+difference between the columns is the setup the registry saves.
+
+Run from the repo root:
+    python -m benchmarks.bench_agent_setup
+No network calls are made for the timed calls.
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from agents.news_agent import create_crypto_news_analyst
+from agents.fundamental_analysis_agent import create_fundamentals_analyst
+from agents.technical_anlyst_agent import create_technical_analyst
+from agents.social_media_agent import create_sentiment_analyst
+from agents.research_analyst_agent import create_research_analyst_agent
+from agents.risk_management_agent import create_risk_manager_agent
+from replay.llm import ReplayChatModel
+from toolkit.crypto_toolkit import MyCryptoToolKit
+
+ROUNDS = 200
+COIN = "bitcoin"
+
+# Tool payloads served from the tool cache instead of upstream APIs
+TOOL_DATA = {
+    "news": [{"Title": "Benchmark headline", "Source": "bench", "Published": "", "URL": ""}],
+    "fundamentals": {"Name": "Bitcoin", "Symbol": "BTC", "Current Price (USD)": 1.0},
+    "technicals": {"rsi": 50.0, "macd": 0.0, "close": 1.0},
+    "posts": ["bitcoin looks strong today", "not sure about bitcoin this week"],
+}
+
+
+def request_state():
+    # Nodes append to `messages`, so every call gets a fresh state
+    return {
+        "coin": COIN,
+        "trade_date": "2025-08-05",
+        "user_type": "existing_buyer",
+        "horizon": "short_term",
+        "messages": [HumanMessage(content=f"Analyze {COIN}.")],
+        "research_summary": "Market Summary:\n• benchmark",
+        "research_decision": "Hold",
+        "research_confidence": 0.6,
+    }
+
+
+async def time_calls(get_node):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await get_node()(request_state())
+    return (time.perf_counter() - started) / ROUNDS * 1e6
+
+
+async def run():
+    llm = ReplayChatModel(latency=0)
+    toolkit = MyCryptoToolKit(cryptopanic_key=None, coingecko_key=None)
+    key = toolkit.coins.key(COIN)
+    for kind, data in TOOL_DATA.items():
+        toolkit.cache.put(kind, key, data)
+
+    factories = {
+        "news": lambda: create_crypto_news_analyst(llm, toolkit),
+        "fundamentals": lambda: create_fundamentals_analyst(llm, toolkit),
+        "technical": lambda: create_technical_analyst(llm, toolkit),
+        "sentiment": lambda: create_sentiment_analyst(llm, toolkit),
+        "research": lambda: create_research_analyst_agent(llm),
+        "risk": lambda: create_risk_manager_agent(llm),
+    }
+    registry = {name: factory() for name, factory in factories.items()}
+
+    print(f"{'node':<14}{'before (µs)':>14}{'after (µs)':>14}{'saved (µs)':>14}")
+    total_before = total_after = 0.0
+    for name, factory in factories.items():
+        # Warm-up call so lazy imports and caches don't count against "before"
+        await registry[name](request_state())
+        before = await time_calls(factory)
+        after = await time_calls(lambda: registry[name])
+        total_before += before
+        total_after += after
+        print(f"{name:<14}{before:>14.1f}{after:>14.1f}{before - after:>14.1f}")
+
+    saved = total_before - total_after
+    print(f"{'per request':<14}{total_before:>14.1f}{total_after:>14.1f}{saved:>14.1f}")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/bench_indicators.py
+"""
+Indicator compute: per-coin `ta` objects vs the vectorized engine.
+
+Generates random-walk hourly bars for N coins (ragged lengths, like
+coins with short histories), checks every engine series against `ta`
+(the base set and the extended one) and times both ways of getting the
+latest values.
+
+It also replays the same bars through the streaming per-coin state
+(with a serialize/restore half-way) and compares it with the full
+recomputation, then times one live update for every coin.
+
+Run from the repo root:
+    python -m benchmarks.bench_indicators --coins 500 --bars 720
+No network calls are made.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator, StochRSIIndicator
+from ta.trend import EMAIndicator, MACD
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import OnBalanceVolumeIndicator
+
+from toolkit.indicator_state import IndicatorState
+from tools import indicators
+
+
+def random_closes(coins, bars, seed=7):
+    rng = np.random.default_rng(seed)
+    series = []
+    for _ in range(coins):
+        length = int(rng.integers(bars // 4, bars + 1))
+        steps = rng.normal(0, 0.01, length)
+        series.append(float(rng.uniform(0.01, 50_000)) * np.exp(np.cumsum(steps)))
+    return series
+
+
+def ta_series(close):
+    close = pd.Series(close)
+    macd = MACD(close=close, window_slow=26, window_fast=12, window_sign=9)
+    bb = BollingerBands(close=close, window=20, window_dev=2)
+    return {
+        "rsi": RSIIndicator(close=close, window=14).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "bb_lower": bb.bollinger_lband(),
+        "bb_middle": bb.bollinger_mavg(),
+        "bb_upper": bb.bollinger_hband(),
+    }
+
+
+def ta_extended(high, low, close, volume):
+    high, low, close, volume = (pd.Series(v) for v in (high, low, close, volume))
+    atr = AverageTrueRange(high=high, low=low, close=close, window=14).average_true_range()
+    # ta fills the ATR warm-up with zeros rather than NaN
+    atr.iloc[:13] = np.nan
+    stoch = StochRSIIndicator(close=close, window=14, smooth1=3, smooth2=3)
+    return {
+        **{
+            f"ema{span}": EMAIndicator(close=close, window=span).ema_indicator()
+            for span in indicators.EMA_SPANS
+        },
+        "atr": atr,
+        "stoch_rsi": stoch.stochrsi(),
+        "stoch_rsi_k": stoch.stochrsi_k(),
+        "stoch_rsi_d": stoch.stochrsi_d(),
+        "obv": OnBalanceVolumeIndicator(close=close, volume=volume).on_balance_volume(),
+    }
+
+
+def random_bars(series, seed=11):
+    rng = np.random.default_rng(seed)
+    bars = []
+    for close in series:
+        spread = np.abs(rng.normal(0, 0.005, (2, len(close)))) * close
+        volume = rng.uniform(1e6, 1e8, len(close))
+        bars.append((close + spread[0], close - spread[1], close, volume))
+    return bars
+
+
+def check(series):
+    """Largest relative deviation from `ta` per indicator, over every bar."""
+    full = indicators.compute(indicators.align(series), last_only=False)
+    bars = random_bars(series)
+    matrices = [indicators.align(column) for column in zip(*bars)]
+    extended = indicators.compute_extended(*matrices, bar_seconds=3600, last_only=False)
+    latest = indicators.compute_extended(*matrices, bar_seconds=3600, last_only=True)
+    for name, values in latest.items():
+        if not np.allclose(values, extended[name][:, -1], equal_nan=True):
+            raise AssertionError(f"{name}: last-only value differs from the full series")
+
+    worst = {}
+    for i, close in enumerate(series):
+        expected_series = {**ta_series(close), **ta_extended(*bars[i])}
+        for name, expected in expected_series.items():
+            source = full if name in full else extended
+            got = source[name][i, -len(close):]
+            expected = expected.to_numpy()
+            if not np.array_equal(np.isnan(got), np.isnan(expected)):
+                raise AssertionError(f"{name}: NaN warm-up differs from ta for coin {i}")
+            ok = ~np.isnan(expected)
+            scale = np.maximum(np.abs(expected[ok]), 1e-12)
+            error = float(np.max(np.abs(got[ok] - expected[ok]) / scale, initial=0.0))
+            worst[name] = max(worst.get(name, 0.0), error)
+    return worst
+
+
+def check_streaming(bars):
+    """Largest relative deviation of streamed values from the full recomputation."""
+    matrices = [indicators.align(column) for column in zip(*bars)]
+    expected = indicators.compute_extended(*matrices, bar_seconds=3600, last_only=True)
+    worst = {}
+    states = []
+    for i, (high, low, close, volume) in enumerate(bars):
+        state = IndicatorState(3600)
+        for t in range(len(close)):
+            if t == len(close) // 2:
+                state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+            state.push(t * 3600, high[t], low[t], close[t], volume[t])
+        states.append(state)
+        for name, value in state.values.items():
+            target = expected[name][i]
+            if np.isnan(target) != np.isnan(value):
+                raise AssertionError(f"{name}: streamed value defined differently for coin {i}")
+            if not np.isnan(target):
+                error = abs(value - target) / max(abs(target), 1e-12)
+                worst[name] = max(worst.get(name, 0.0), error)
+    return worst, states
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized indicators vs ta")
+    parser.add_argument("--coins", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=720)
+    parser.add_argument("--check", type=int, default=50, help="coins compared against ta")
+    args = parser.parse_args()
+
+    series = random_closes(args.coins, args.bars)
+
+    worst = check(series[: args.check])
+    print(f"max relative error vs ta over {min(args.check, args.coins)} coins:")
+    for name, error in worst.items():
+        print(f"  {name:<14}{error:.2e}")
+
+    streamed, states = check_streaming(random_bars(series[: args.check]))
+    print("max relative error of the streaming state vs full recomputation:")
+    for name, error in streamed.items():
+        print(f"  {name:<14}{error:.2e}")
+
+    started = time.perf_counter()
+    for close in series:
+        ta_series(close)
+    per_coin = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indicators.latest(indicators.align(series))
+    vectorized = time.perf_counter() - started
+
+    bars = random_bars(series)
+    matrices = [indicators.align(column) for column in zip(*bars)]
+    started = time.perf_counter()
+    indicators.latest_extended(*matrices, bar_seconds=3600)
+    extended = time.perf_counter() - started
+
+    print(f"{args.coins} coins × up to {args.bars} bars")
+    print(f"  ta per coin (base set) : {per_coin * 1000:9.1f} ms")
+    print(f"  vectorized (base set)  : {vectorized * 1000:9.1f} ms  ({per_coin / vectorized:.0f}x)")
+    print(f"  vectorized (extended)  : {extended * 1000:9.1f} ms")
+
+    # One new closed bar for every coin, folded into its live state
+    states = [states[i % len(states)] for i in range(args.coins)]
+    started = time.perf_counter()
+    for state in states:
+        state.push(state.ts + 3600, state.close * 1.01, state.close * 0.99, state.close, 1e7)
+    update = time.perf_counter() - started
+    per_update = update / args.coins * 1e6
+    print(f"  streaming, 1 new bar   : {update * 1000:9.1f} ms  ({per_update:.0f} µs/coin)")
+
+
+if __name__ == "__main__":
+    main()
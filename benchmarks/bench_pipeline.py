@@ -0,0 +1,59 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end pipeline latency, offline and reproducible.
+
+Runs the full graph in LLM_MODE=replay: upstream HTTP is served from the
+recorded fixtures by the local stand-in server and the LLM is the
+deterministic fake, each with its configured latency. Record fixtures
+first with LLM_MODE=record (same coins and trade date) for realistic
+payloads; without them the run still completes on synthetic replies.
+
+Run from the repo root:
+    REPLAY_LLM_LATENCY=0.5 REPLAY_HTTP_LATENCY=0.1 \\
+        python -m benchmarks.bench_pipeline --coins btc,eth --date 2025-08-05 --rounds 3
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["LLM_MODE"] = "replay"
+
+
+async def run(coins, trade_date, rounds):
+    import graph
+    import main_runner
+
+    timings = []
+    for _ in range(rounds):
+        for coin in coins:
+            # Cold every round: measure the pipeline, not the caches
+            graph.stage_cache.clear()
+            graph.toolkit.cache.clear()
+            started = time.perf_counter()
+            await main_runner.arun_trading_pipeline(coin=coin, trade_date=trade_date)
+            timings.append(time.perf_counter() - started)
+    return timings, graph.fixtures.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay-mode pipeline benchmark")
+    parser.add_argument("--coins", default="btc")
+    parser.add_argument("--date", default="2025-08-05")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    timings, fixture_stats = asyncio.run(
+        run(args.coins.split(","), args.date, args.rounds)
+    )
+    timings.sort()
+    print(f"\nruns: {len(timings)}")
+    print(f"p50:  {statistics.median(timings):.3f}s")
+    print(f"max:  {timings[-1]:.3f}s")
+    print(f"fixtures: {fixture_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# checkpoints.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+# Seconds Mongo keeps checkpoints of runs that were never resumed
+CHECKPOINT_TTL = int(os.getenv("CHECKPOINT_TTL", "86400"))
+# Most runs the in-memory checkpointer holds; the least recently written go first
+CHECKPOINT_MEMORY_RUNS = int(os.getenv("CHECKPOINT_MEMORY_RUNS", "1000"))
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """
+    Async LangGraph checkpointer on the shared Motor client.
+
+    Lets any API worker resume a failed pipeline run by its thread id.
+    Checkpoints are stored whole (channel values included) since a
+    pipeline run only ever produces a handful of them.
+    """
+
+    def __init__(self, checkpoints, writes, serde=None):
+        super().__init__(serde=serde)
+        self.checkpoints = checkpoints
+        self.writes = writes
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        await self.checkpoints.create_index(
+            [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)],
+            unique=True,
+        )
+        await self.writes.create_index(
+            [
+                ("thread_id", 1),
+                ("checkpoint_ns", 1),
+                ("checkpoint_id", 1),
+                ("task_id", 1),
+                ("idx", 1),
+            ],
+            unique=True,
+        )
+        for collection in (self.checkpoints, self.writes):
+            await collection.create_index(
+                "created_at", expireAfterSeconds=CHECKPOINT_TTL
+            )
+        self._indexes_ready = True
+
+    def _dump(self, value):
+        type_, data = self.serde.dumps_typed(value)
+        return {"type": type_, "data": data}
+
+    def _load(self, doc):
+        return self.serde.loads_typed((doc["type"], doc["data"]))
+
+    async def _to_tuple(self, doc) -> CheckpointTuple:
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        checkpoint_id = doc["checkpoint_id"]
+
+        pending_writes = [
+            (write["task_id"], write["channel"], self._load(write["value"]))
+            async for write in self.writes.find(
+                {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            ).sort([("task_id", 1), ("idx", 1)])
+        ]
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self._load(doc["checkpoint"]),
+            metadata=self._load(doc["metadata"]),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=pending_writes,
+        )
+
+    async def aget_tuple(self, config):
+        query = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+        }
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+
+        doc = await self.checkpoints.find_one(query, sort=[("checkpoint_id", -1)])
+        return await self._to_tuple(doc) if doc else None
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        query = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query["checkpoint_ns"] = checkpoint_ns
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        async for doc in self.checkpoints.find(query).sort("checkpoint_id", -1):
+            if limit is not None and limit <= 0:
+                break
+            checkpoint_tuple = await self._to_tuple(doc)
+            # Metadata is stored serialized, so filter after loading it
+            if filter and not all(
+                checkpoint_tuple.metadata.get(key) == value
+                for key, value in filter.items()
+            ):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        await self._ensure_indexes()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        await self.checkpoints.replace_one(
+            {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            },
+            {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "checkpoint": self._dump(checkpoint),
+                "metadata": self._dump(get_checkpoint_metadata(config, metadata)),
+                "created_at": datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await self._ensure_indexes()
+        base = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": config["configurable"]["checkpoint_id"],
+            "task_id": task_id,
+        }
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            doc = {
+                "channel": channel,
+                "value": self._dump(value),
+                "task_path": task_path,
+                "created_at": datetime.now(timezone.utc),
+            }
+            # Special channels (errors, interrupts) overwrite; regular writes
+            # are first-write-wins, mirroring InMemorySaver
+            update = {"$set": doc} if write_idx < 0 else {"$setOnInsert": doc}
+            await self.writes.update_one(
+                {**base, "idx": write_idx}, update, upsert=True
+            )
+
+    async def adelete_thread(self, thread_id):
+        await self.checkpoints.delete_many({"thread_id": thread_id})
+        await self.writes.delete_many({"thread_id": thread_id})
+
+
+class ExpiringMemorySaver(InMemorySaver):
+    """
+    In-process checkpointer that forgets runs, like the Mongo saver's TTL.
+
+    Finished runs are deleted by the runner; failed ones are kept for
+    resuming until nothing has been written to them for CHECKPOINT_TTL
+    seconds, or until more than `max_runs` runs are held.
+    """
+
+    def __init__(self, ttl: int = CHECKPOINT_TTL, max_runs: int = CHECKPOINT_MEMORY_RUNS):
+        super().__init__()
+        self.ttl = ttl
+        self.max_runs = max_runs
+        # thread_id -> last write time, oldest first
+        self._written = OrderedDict()
+        self._written_lock = threading.Lock()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        now = time.monotonic()
+        with self._written_lock:
+            self._written[thread_id] = now
+            self._written.move_to_end(thread_id)
+            expired = []
+            for old_id, written in self._written.items():
+                if old_id == thread_id:
+                    break
+                if now - written < self.ttl and len(self._written) - len(expired) <= self.max_runs:
+                    break
+                expired.append(old_id)
+        for old_id in expired:
+            self.delete_thread(old_id)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def delete_thread(self, thread_id):
+        with self._written_lock:
+            self._written.pop(thread_id, None)
+        super().delete_thread(thread_id)
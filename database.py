@@ -11,3 +11,5 @@ client = AsyncIOMotorClient(MONGO_URL)
 db = client[DB_NAME]
 
 user_collection = db.users
+analysis_cache_collection = db.analysis_cache
+analysis_jobs_collection = db.analysis_jobs
@@ -1,18 +1,28 @@
 # graph.py
 from langchain_groq import ChatGroq
 
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from typing import Annotated, TypedDict, List, Optional
 from langchain_core.messages import BaseMessage, HumanMessage
 from agents.news_agent import create_crypto_news_analyst
 from agents.fundamental_analysis_agent import create_fundamentals_analyst
 from agents.technical_anlyst_agent import create_technical_analyst
 from agents.social_media_agent import create_sentiment_analyst
-from agents.research_analyst_agent import create_research_analyst_agent
+from agents.research_analyst_agent import (
+    create_research_analyst_agent,
+    research_view_for_profile,
+)
 from agents.risk_management_agent import create_risk_manager_agent
+from toolkit.coin_registry import coin_registry
 from toolkit.crypto_toolkit import MyCryptoToolKit
+from toolkit.news_store import NewsStore
+from toolkit.price_store import PriceStore
+from checkpoints import ExpiringMemorySaver
+from result_cache import ResultCache
 from dotenv import load_dotenv
 import os
+import tempfile
 
 # -------------------------------
 # Load environment variables
@@ -24,19 +34,54 @@ GEMINI_KEY = os.getenv("GOOGLE_API_KEY")
 CRYPTOPANIC_KEY = os.getenv("CRYPTO_PANIC_KEY")
 COINGECKO_KEY = os.getenv("COINGECKO_API_KEY")
 
+# ⚡ Prefetch mode: call the analyst tools directly from state instead of
+# asking the LLM to emit the (always identical) tool call first.
+PREFETCH_TOOLS = os.getenv("PREFETCH_TOOLS", "false").lower() in ("1", "true", "yes")
+
+# 🧠 Seconds a profile-independent stage result is reused for the same
+# (coin, trade_date) across trader_position/duration variants
+STAGE_CACHE_TTL = int(os.getenv("STAGE_CACHE_TTL", "900"))
+
+# 💾 Where run checkpoints live: "memory" (per process) or "mongo" (shared)
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory").lower()
+
+# 📼 "live" (default), "record" (live + capture fixtures under replay/) or
+# "replay" (offline: fixture-backed HTTP stand-in + deterministic fake LLM)
+LLM_MODE = os.getenv("LLM_MODE", "live").lower()
+
 # -------------------------------
 # 🤖 Initialize LLM (Gemini)
 # -------------------------------
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-if not GEMINI_KEY:
-    raise ValueError("❌ Missing GOOGLE_API_KEY in .env file!")
-
-llm = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.3-70b-versatile",
-    temperature=0.2,
-)
+fixtures = None
+if LLM_MODE == "replay":
+    from replay.fixtures import FixtureStore
+    from replay.llm import ReplayChatModel
+    from replay.server import point_tools_at, start_server
+
+    fixtures = FixtureStore()
+    # Must run before the toolkit is built: tools read their base URLs at init
+    print(f"📼 Replay mode: serving fixtures at {point_tools_at(start_server(fixtures))}")
+    llm = ReplayChatModel(fixtures=fixtures)
+else:
+    if not GEMINI_KEY:
+        raise ValueError("❌ Missing GOOGLE_API_KEY in .env file!")
+
+    callbacks = None
+    if LLM_MODE == "record":
+        from replay.fixtures import FixtureStore
+        from replay.llm import LLMRecorder
+
+        fixtures = FixtureStore()
+        callbacks = [LLMRecorder(fixtures)]
+
+    llm = ChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model="llama-3.3-70b-versatile",
+        temperature=0.2,
+        callbacks=callbacks,
+    )
 
 # -------------------------------
 # 🧰 Initialize Toolkit
@@ -44,7 +89,15 @@ llm = ChatGroq(
 toolkit = MyCryptoToolKit(
     cryptopanic_key=CRYPTOPANIC_KEY,
     coingecko_key=COINGECKO_KEY,
+    # Record/replay runs start from an empty price history so every run makes
+    # the same backfill request and fixtures stay deterministic
+    prices=PriceStore(path=tempfile.mkdtemp(prefix="prices-")) if fixtures else None,
+    news=NewsStore(path=os.path.join(tempfile.mkdtemp(prefix="news-"), "news.sqlite3"))
+    if fixtures
+    else None,
 )
+if LLM_MODE == "record":
+    toolkit.http.recorder = fixtures.record_http
 
 # -------------------------------
 # 🧠 State Model
@@ -54,11 +107,15 @@ class AgentState(TypedDict):
     trade_date: str
     user_type: str
     horizon: str
-    messages: List[BaseMessage]
+    # The four analysts run in parallel, so their message writes are merged
+    # by the reducer instead of overwriting each other.
+    messages: Annotated[List[BaseMessage], add_messages]
     news_report: Optional[str]
     fundamentals_report: Optional[str]
     technical_report: Optional[str]
     sentiment_report: Optional[str]
+    # Mean post polarity from the local scorer (-1 bearish .. 1 bullish)
+    sentiment_score: Optional[float]
     research_summary: Optional[str]
     research_decision: Optional[str]
     research_confidence: Optional[float]
@@ -72,72 +129,107 @@ class AgentState(TypedDict):
 # -------------------------------
 # 🔄 AGENT NODES
 # -------------------------------
-def news_node(state):
-    state["messages"] = [
-        HumanMessage(content=f"Analyze recent news for {state['coin']}.")
-    ]
-    return create_crypto_news_analyst(llm, toolkit)(state)
+# Task message each node starts from; only the coin is filled in per request
+AGENT_TASKS = {
+    "news": "Analyze recent news for {coin}.",
+    "fundamentals": "Analyze fundamentals for {coin}.",
+    "technical": "Analyze technical indicators for {coin}.",
+    "sentiment": "Analyze social sentiment for {coin}.",
+    "research": "Create a consolidated research summary for {coin}.",
+    "risk": "Assess risk for {coin}.",
+}
+
+
+def build_agent_registry(llm, toolkit, prefetch=PREFETCH_TOOLS):
+    """
+    Build every agent once: prompts, tool-bound LLMs and report chains are
+    created here at graph compile time and reused by all requests.
+    """
+    return {
+        "news": create_crypto_news_analyst(llm, toolkit, prefetch=prefetch),
+        "fundamentals": create_fundamentals_analyst(llm, toolkit, prefetch=prefetch),
+        "technical": create_technical_analyst(llm, toolkit, prefetch=prefetch),
+        "sentiment": create_sentiment_analyst(llm, toolkit, prefetch=prefetch),
+        "research": create_research_analyst_agent(llm),
+        "risk": create_risk_manager_agent(llm),
+    }
 
 
-def fundamentals_node(state):
-    state["messages"] = [
-        HumanMessage(content=f"Analyze fundamentals for {state['coin']}.")
-    ]
-    return create_fundamentals_analyst(llm, toolkit)(state)
+# Only risk depends on user_type/horizon. Every other stage is memoized per
+# (coin, trade_date), so a profile change reruns just the risk LLM call.
+MEMOIZED_STAGES = ("news", "fundamentals", "technical", "sentiment", "research")
 
+# Profile-specific fields re-derived from a shared stage result
+STAGE_PROFILE_VIEWS = {"research": research_view_for_profile}
 
-def technical_node(state):
-    state["messages"] = [
-        HumanMessage(content=f"Analyze technical indicators for {state['coin']}.")
-    ]
-    return create_technical_analyst(llm, toolkit)(state)
 
+def is_reusable_stage(update) -> bool:
+    # Failed stages ("Error: ...") are retried on the next request
+    return not any(
+        isinstance(value, str) and value.startswith("Error")
+        for value in update.values()
+    )
 
-def sentiment_node(state):
-    state["messages"] = [
-        HumanMessage(content=f"Analyze social sentiment for {state['coin']}.")
-    ]
-    return create_sentiment_analyst(llm, toolkit)(state)
 
+stage_cache = ResultCache(ttl=STAGE_CACHE_TTL, cacheable=is_reusable_stage)
 
-def research_node(state):
-    state["messages"] = [
-        HumanMessage(
-            content=f"Create a consolidated research summary for {state['coin']}."
-        )
-    ]
-    return create_research_analyst_agent(llm)(state)
 
+def make_agent_node(name, agent, task):
+    async def agent_node(state):
+        state = {
+            **state,
+            "messages": [HumanMessage(content=task.format(coin=state["coin"]))],
+        }
+        if name not in MEMOIZED_STAGES:
+            return await agent(state)
 
-def risk_node(state):
-    state["messages"] = [
-        HumanMessage(content=f"Assess risk for {state['coin']}.")
-    ]
-    return create_risk_manager_agent(llm)(state)
+        # Keyed on the resolved id so "btc" and "bitcoin" share the stage
+        key = "|".join([name, coin_registry.key(state["coin"]), state["trade_date"]])
+        update = await stage_cache.get_or_compute(key, lambda: agent(state))
+
+        profile_view = STAGE_PROFILE_VIEWS.get(name)
+        return profile_view(update, state) if profile_view else update
+
+    return agent_node
+
+
+# -------------------------------
+# 💾 Checkpointing
+# -------------------------------
+def build_checkpointer(backend=CHECKPOINTER):
+    """
+    Checkpoint every super-step so a failed run can be resumed by its
+    thread id instead of redoing the nodes that already finished.
+    """
+    if backend == "mongo":
+        from database import db
+        from checkpoints import MongoCheckpointSaver
+
+        return MongoCheckpointSaver(db.pipeline_checkpoints, db.pipeline_writes)
+    return ExpiringMemorySaver()
 
 
 # -------------------------------
 # 🧩 Build Complete Workflow
 # -------------------------------
-def trading_graph(llm, toolkit):
+def trading_graph(llm, toolkit, checkpointer=None):
     workflow = StateGraph(AgentState)
+    agents = build_agent_registry(llm, toolkit)
+
+    for name, agent in agents.items():
+        workflow.add_node(name, make_agent_node(name, agent, AGENT_TASKS[name]))
+
+    # Fan-out: the four data analysts are independent and run concurrently
+    analysts = ["news", "fundamentals", "technical", "sentiment"]
+    for name in analysts:
+        workflow.add_edge(START, name)
 
-    workflow.add_node("news", news_node)
-    workflow.add_node("fundamentals", fundamentals_node)
-    workflow.add_node("technical", technical_node)
-    workflow.add_node("sentiment", sentiment_node)
-    workflow.add_node("research", research_node)
-    workflow.add_node("risk", risk_node)
-
-    workflow.add_edge("news", "fundamentals")
-    workflow.add_edge("fundamentals", "technical")
-    workflow.add_edge("technical", "sentiment")
-    workflow.add_edge("sentiment", "research")
+    # Fan-in: research waits for every analyst report
+    workflow.add_edge(analysts, "research")
     workflow.add_edge("research", "risk")
     workflow.add_edge("risk", END)
 
-    workflow.set_entry_point("news")
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
-graph = trading_graph(llm, toolkit)
+graph = trading_graph(llm, toolkit, checkpointer=build_checkpointer())
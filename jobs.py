@@ -0,0 +1,281 @@
+# jobs.py
+
+import abc
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from cachetools import TTLCache
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")
+
+# Concurrent runs per lane; interactive work never waits behind batch/pre-warm jobs
+JOB_LANES = {
+    "interactive": int(os.getenv("JOB_INTERACTIVE_CONCURRENCY", "4")),
+    "batch": int(os.getenv("JOB_BATCH_CONCURRENCY", "2")),
+}
+
+# Seconds finished jobs stay pollable
+JOB_TTL = int(os.getenv("JOB_TTL", "86400"))
+# Seconds a claimed Mongo job stays leased before another process may take it over
+JOB_LEASE = int(os.getenv("JOB_LEASE", "300"))
+# Seconds an idle Mongo worker waits before polling for new jobs again
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def new_job(lane, params) -> dict:
+    return {
+        "job_id": str(uuid.uuid4()),
+        "lane": lane,
+        "status": "queued",
+        "params": params,
+        "result": None,
+        "error": None,
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+class JobQueue(abc.ABC):
+    """
+    Lane-based pool of background workers running pipeline jobs.
+
+    Subclasses provide storage (`submit`, `get`, `_claim`, `_finish`);
+    this class owns the workers. Each lane has a fixed number of slots
+    that bounds its concurrency; work run outside the queue (streamed
+    batches, pre-warm) holds a slot of its lane too, via `slot()`.
+    """
+
+    def __init__(self, lanes=None):
+        self.lanes = dict(lanes or JOB_LANES)
+        self._slots = {lane: asyncio.Semaphore(slots) for lane, slots in self.lanes.items()}
+        self._workers = []
+
+    def start(self, runner):
+        """Spawn the workers. `runner(job_id, **params)` performs one job."""
+        for lane, slots in self.lanes.items():
+            for _ in range(slots):
+                self._workers.append(asyncio.create_task(self._work(lane, runner)))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _check_lane(self, lane):
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown job lane: {lane}")
+
+    def slot(self, lane):
+        """Async context manager holding one of `lane`'s concurrency slots."""
+        self._check_lane(lane)
+        return self._slots[lane]
+
+    async def _work(self, lane, runner):
+        while True:
+            job = await self._claim(lane)
+            if job is None:
+                continue
+            try:
+                result = await self._run(lane, runner, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._finish(job["job_id"], error=str(e))
+            else:
+                await self._finish(job["job_id"], result=result)
+
+    async def _run(self, lane, runner, job):
+        async with self._slots[lane]:
+            return await runner(job["job_id"], **job["params"])
+
+    @abc.abstractmethod
+    async def submit(self, lane, params) -> dict:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, job_id):
+        ...
+
+    @abc.abstractmethod
+    async def _claim(self, lane):
+        ...
+
+    @abc.abstractmethod
+    async def _finish(self, job_id, result=None, error=None):
+        ...
+
+
+# ---------------- In-process backend ---------------- #
+
+class InMemoryJobQueue(JobQueue):
+    """Jobs live in this process; fine for a single API worker."""
+
+    def __init__(self, lanes=None):
+        super().__init__(lanes)
+        self._jobs = TTLCache(maxsize=10000, ttl=JOB_TTL)
+        self._queues = {lane: asyncio.Queue() for lane in self.lanes}
+
+    async def submit(self, lane, params) -> dict:
+        self._check_lane(lane)
+        job = new_job(lane, params)
+        self._jobs[job["job_id"]] = job
+        self._queues[lane].put_nowait(job["job_id"])
+        return dict(job)
+
+    async def get(self, job_id):
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def _claim(self, lane):
+        job = self._jobs.get(await self._queues[lane].get())
+        if job is None:
+            return None
+        job.update(status="running", started_at=_now())
+        return job
+
+    async def _finish(self, job_id, result=None, error=None):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.update(
+                status="failed" if error else "succeeded",
+                result=result,
+                error=error,
+                finished_at=_now(),
+            )
+
+
+# ---------------- Shared (Mongo) backend ---------------- #
+
+class MongoJobQueue(JobQueue):
+    """
+    Jobs live in a Mongo collection shared by every API process.
+
+    Workers claim jobs atomically with find_one_and_update and hold a
+    lease they keep renewing while the job runs. If a process dies
+    mid-job the lease lapses and another worker picks the job up again;
+    since the job id doubles as the pipeline run id, a checkpointed run
+    resumes instead of starting over.
+    """
+
+    def __init__(self, collection, lanes=None):
+        super().__init__(lanes)
+        self.collection = collection
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        await self.collection.create_index(
+            [("lane", 1), ("status", 1), ("created_at", 1)]
+        )
+        # Only finished jobs carry finished_at, so queued work never expires
+        await self.collection.create_index("finished_at", expireAfterSeconds=JOB_TTL)
+        self._indexes_ready = True
+
+    @staticmethod
+    def _from_doc(doc):
+        job = {
+            key: value
+            for key, value in doc.items()
+            if key not in ("_id", "worker", "lease_until")
+        }
+        job["job_id"] = doc["_id"]
+        return job
+
+    async def submit(self, lane, params) -> dict:
+        self._check_lane(lane)
+        await self._ensure_indexes()
+        job = new_job(lane, params)
+        doc = {key: value for key, value in job.items() if key != "job_id"}
+        await self.collection.insert_one({"_id": job["job_id"], **doc})
+        return job
+
+    async def get(self, job_id):
+        doc = await self.collection.find_one({"_id": job_id})
+        return self._from_doc(doc) if doc else None
+
+    async def _claim(self, lane):
+        now = _now()
+        try:
+            doc = await self.collection.find_one_and_update(
+                {
+                    "lane": lane,
+                    "$or": [
+                        {"status": "queued"},
+                        {"status": "running", "lease_until": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "status": "running",
+                        "started_at": now,
+                        "worker": self.worker_id,
+                        "lease_until": now + timedelta(seconds=JOB_LEASE),
+                    }
+                },
+                sort=[("created_at", 1)],
+                return_document=True,
+            )
+        except Exception as e:
+            print(f"[WARN] Job claim failed: {e}")
+            doc = None
+
+        if doc is None:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            return None
+        return self._from_doc(doc)
+
+    async def _run(self, lane, runner, job):
+        # Renew the lease for as long as the job waits for a slot or runs
+        heartbeat = asyncio.create_task(self._renew_lease(job["job_id"]))
+        try:
+            return await super()._run(lane, runner, job)
+        finally:
+            heartbeat.cancel()
+
+    async def _renew_lease(self, job_id):
+        while True:
+            await asyncio.sleep(JOB_LEASE / 3)
+            try:
+                await self.collection.update_one(
+                    {"_id": job_id, "worker": self.worker_id},
+                    {"$set": {"lease_until": _now() + timedelta(seconds=JOB_LEASE)}},
+                )
+            except Exception as e:
+                print(f"[WARN] Job lease renewal failed: {e}")
+
+    async def _finish(self, job_id, result=None, error=None):
+        try:
+            await self.collection.update_one(
+                # Skip the write if the lease lapsed and another worker took over
+                {"_id": job_id, "worker": self.worker_id},
+                {
+                    "$set": {
+                        "status": "failed" if error else "succeeded",
+                        "result": result,
+                        "error": error,
+                        "finished_at": _now(),
+                    },
+                    "$unset": {"lease_until": ""},
+                },
+            )
+        except Exception as e:
+            print(f"[WARN] Job result write failed: {e}")
+
+
+def build_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    if backend == "mongo":
+        from database import analysis_jobs_collection
+
+        return MongoJobQueue(analysis_jobs_collection)
+    return InMemoryJobQueue()
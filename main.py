@@ -1,5 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from dotenv import load_dotenv
+from datetime import datetime
+import asyncio
+import json
 import os
 
 from schemas import (
@@ -7,10 +12,28 @@ from schemas import (
     LoginSchema,
     TokenResponse,
     TradeRequest,
+    BatchTradeRequest,
+    JobRequest,
 )
-from database import user_collection
+from database import user_collection, analysis_cache_collection
 from auth import hash_password, verify_password, create_access_token
-from main_runner import run_trading_pipeline
+from result_cache import ResultCache
+from jobs import build_job_queue
+from prewarm import (
+    PREWARM_COINS,
+    PREWARM_ENABLED,
+    PrewarmScheduler,
+    RequestStats,
+)
+from graph import stage_cache, toolkit
+from toolkit.news_store import NEWS_POLL_ENABLED, NewsPoller
+from main_runner import (
+    PipelineRunError,
+    RunMismatchError,
+    arun_trading_pipeline,
+    arun_trading_pipeline_batch,
+    astream_trading_pipeline,
+)
  
 load_dotenv()
 
@@ -19,6 +42,16 @@ app = FastAPI(
     version="1.0.0"
 )
 
+@app.exception_handler(ValidationError)
+async def model_validation_error(request, exc: ValidationError):
+    # Query-param models built via Depends() (e.g. an unknown coin on the
+    # stream endpoint) fail here instead of in FastAPI's body validation
+    return JSONResponse(
+        status_code=422,
+        content={"detail": exc.errors(include_url=False, include_context=False)},
+    )
+
+
 # -----------------------------
 # AUTH APIs
 # -----------------------------
@@ -60,20 +93,210 @@ async def login(user: LoginSchema):
 # AI TRADING API
 # -----------------------------
 
+def is_cacheable(result: dict) -> bool:
+    # Don't pin LLM/tool failures in the cache for the whole TTL
+    return not any(
+        str(result.get(field) or "").startswith("Error")
+        for field in ("research_summary", "final_reason")
+    )
+
+
+result_cache = ResultCache(
+    collection=analysis_cache_collection, cacheable=is_cacheable
+)
+
+
+async def cached_trading_pipeline(
+    coin: str,
+    trade_date: str = None,
+    trader_position: str = "existing_buyer",
+    duration: str = "short_term",
+    run_id: str = None,
+    refresh: bool = False,
+):
+    """`arun_trading_pipeline` behind the shared result cache."""
+    trade_date = trade_date or datetime.today().strftime("%Y-%m-%d")
+    key = ResultCache.make_key(coin, trade_date, trader_position, duration)
+    return await result_cache.get_or_compute(
+        key,
+        lambda: arun_trading_pipeline(
+            coin=coin,
+            trade_date=trade_date,
+            trader_position=trader_position,
+            duration=duration,
+            run_id=run_id,
+        ),
+        refresh=refresh,
+    )
+
+
+job_queue = build_job_queue()
+
+
+async def batch_lane_pipeline(**kwargs):
+    """`cached_trading_pipeline` holding a slot of the job queue's batch lane."""
+    async with job_queue.slot("batch"):
+        return await cached_trading_pipeline(**kwargs)
+
+
+# Request frequency drives which coins the pre-warm scheduler keeps hot
+request_stats = RequestStats()
+prewarm_scheduler = PrewarmScheduler(
+    batch_lane_pipeline,
+    request_stats,
+    coins=PREWARM_COINS or toolkit.coins.seed_ids(),
+)
+
+# Keeps the news store current so the news node never waits on CryptoPanic
+news_poller = NewsPoller(toolkit.news_agent)
+
+
 @app.post("/trade/analyze")
-def analyze_trade(request: TradeRequest):
+async def analyze_trade(request: TradeRequest):
+    request_stats.record(request.coin, request.trader_position, request.duration)
     try:
-        result = run_trading_pipeline(
+        result = await cached_trading_pipeline(
             coin=request.coin,
             trade_date=request.trade_date,
             trader_position=request.trader_position,
             duration=request.duration,
+            run_id=request.run_id,
         )
 
         return {
             "status": "success",
+            "run_id": result.get("run_id"),
             "data": result
         }
 
+    except PipelineRunError as e:
+        # Retrying with this run id resumes from the node that failed
+        raise HTTPException(
+            status_code=500, detail=str(e), headers={"X-Run-Id": e.run_id}
+        )
+    except RunMismatchError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.get("/trade/analyze/stream")
+async def analyze_trade_stream(request: TradeRequest = Depends()):
+    """Server-sent events: one event per report as soon as its node finishes."""
+    request_stats.record(request.coin, request.trader_position, request.duration)
+
+    async def event_stream():
+        try:
+            async for event, data in astream_trading_pipeline(
+                coin=request.coin,
+                trade_date=request.trade_date,
+                trader_position=request.trader_position,
+                duration=request.duration,
+                run_id=request.run_id,
+            ):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event(
+                "error", {"detail": str(e), "run_id": getattr(e, "run_id", None)}
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/trade/analyze/batch")
+async def analyze_trade_batch(request: BatchTradeRequest):
+    """Server-sent events: one `result` event per coin, in completion order."""
+
+    async def event_stream():
+        completed = 0
+        async for coin, result in arun_trading_pipeline_batch(
+            coins=request.coins,
+            trade_date=request.trade_date,
+            trader_position=request.trader_position,
+            duration=request.duration,
+            concurrency=request.concurrency,
+            runner=batch_lane_pipeline,
+        ):
+            completed += 1
+            yield sse_event("result", {"coin": coin, **result})
+        yield sse_event("done", {"completed": completed})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/trade/cache/stats")
+async def cache_stats():
+    return {
+        "results": result_cache.snapshot(),
+        "stages": stage_cache.snapshot(),
+        "tools": toolkit.cache.snapshot(),
+        "upstream": toolkit.http.snapshot(),
+        "prices": toolkit.prices.stats,
+        "prewarm": prewarm_scheduler.snapshot(),
+        "news": news_poller.snapshot(),
+        "sentiment": toolkit.reddit_scraper.snapshot(),
+    }
+
+
+# -----------------------------
+# BACKGROUND JOBS
+# -----------------------------
+
+async def run_job(job_id: str, run_id=None, **params):
+    # The job id doubles as the run id, so a re-claimed job resumes its run;
+    # a run id from the request resumes that failed run instead
+    return await cached_trading_pipeline(**params, run_id=run_id or job_id)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    # Load the coin list off the event loop now rather than on the first request
+    await asyncio.to_thread(toolkit.coins.load)
+    job_queue.start(run_job)
+    if PREWARM_ENABLED:
+        prewarm_scheduler.start()
+    if NEWS_POLL_ENABLED:
+        news_poller.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await prewarm_scheduler.stop()
+    await news_poller.stop()
+    await job_queue.stop()
+
+
+@app.post("/trade/jobs", status_code=202)
+async def submit_trade_job(request: JobRequest):
+    request_stats.record(request.coin, request.trader_position, request.duration)
+    job = await job_queue.submit(
+        request.lane,
+        {
+            "coin": request.coin,
+            "trade_date": request.trade_date,
+            "trader_position": request.trader_position,
+            "duration": request.duration,
+            "run_id": request.run_id,
+        },
+    )
+    return {"job_id": job["job_id"], "lane": job["lane"], "status": job["status"]}
+
+
+@app.get("/trade/jobs/{job_id}")
+async def get_trade_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
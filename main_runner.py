@@ -1,6 +1,49 @@
-from graph import graph  # make sure this imports your compiled LangGraph
+from graph import graph, toolkit  # make sure this imports your compiled LangGraph
+from toolkit.coin_registry import coin_registry
 from datetime import datetime
+import asyncio
+import os
 import re
+import uuid
+
+# Max per-coin pipelines running at once in a batch
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# State keys pushed to streaming clients as soon as their node finishes
+STREAMED_REPORTS = (
+    "news_report",
+    "fundamentals_report",
+    "technical_report",
+    "sentiment_report",
+    "research_summary",
+)
+
+
+class PipelineRunError(Exception):
+    """A pipeline run failed; retrying with `run_id` resumes it from the failed node."""
+
+    def __init__(self, run_id, cause):
+        super().__init__(str(cause))
+        self.run_id = run_id
+
+
+class RunMismatchError(ValueError):
+    """`run_id` belongs to a checkpointed run for a different request."""
+
+    def __init__(self, run_id):
+        super().__init__(f"Run {run_id} was started for a different request")
+        self.run_id = run_id
+
+
+# Initial-state fields that must match before a checkpointed run is resumed
+RUN_IDENTITY = ("coin", "trade_date", "user_type", "horizon")
+
+
+def run_identity(state):
+    return tuple(
+        coin_registry.key(state.get(field) or "") if field == "coin" else state.get(field)
+        for field in RUN_IDENTITY
+    )
 
 
 def run_trading_pipeline(
@@ -8,11 +51,22 @@ def run_trading_pipeline(
     trade_date: str = None,
     trader_position: str = "existing_buyer",
     duration: str = "short_term",
+    run_id: str = None,
 ):
-    if trade_date is None:
-        trade_date = datetime.today().strftime("%Y-%m-%d")
+    """Blocking wrapper around `arun_trading_pipeline` for CLI/script use."""
+    return asyncio.run(
+        arun_trading_pipeline(
+            coin=coin,
+            trade_date=trade_date,
+            trader_position=trader_position,
+            duration=duration,
+            run_id=run_id,
+        )
+    )
 
-    state = {
+
+def build_initial_state(coin, trade_date, trader_position, duration):
+    return {
         "coin": coin,
         "trade_date": trade_date,
         "user_type": trader_position,
@@ -22,6 +76,7 @@ def run_trading_pipeline(
         "fundamentals_report": None,
         "technical_report": None,
         "sentiment_report": None,
+        "sentiment_score": None,
         "research_summary": None,
         "risk_notes": None,
         "final_recommendation": None,
@@ -31,13 +86,9 @@ def run_trading_pipeline(
         "confidence": None,
     }
 
-    print(
-        f"\n🚀 Starting pipeline for: {coin} ({trader_position}, {duration}) on {trade_date}\n"
-    )
-    final_state = graph.invoke(state)
 
-    # === Build structured output ===
-    structured_output = {
+def build_structured_output(final_state, coin, trade_date, trader_position, duration):
+    return {
         "coin": coin,
         "trade_date": trade_date,
         "final_decision": final_state.get("final_recommendation", ""),
@@ -53,11 +104,62 @@ def run_trading_pipeline(
             "news": {"raw": final_state.get("news_report", "")},
             "fundamentals": {"raw": final_state.get("fundamentals_report", "")},
             "technical": {"raw": final_state.get("technical_report", "")},
-            "sentiment": {"raw": final_state.get("sentiment_report", "")},
+            "sentiment": {
+                "raw": final_state.get("sentiment_report", ""),
+                "score": final_state.get("sentiment_score"),
+            },
             "overall": {"raw": final_state.get("research_summary", "")},
         },
     }
 
+
+async def start_or_resume(run_id, state):
+    """
+    Return the graph input and config for `run_id`. A run whose checkpoint
+    still has pending nodes (it failed part-way) is resumed from there;
+    anything else starts fresh from `state`. Resuming a run checkpointed
+    for another coin/date/profile raises RunMismatchError.
+    """
+    config = {"configurable": {"thread_id": run_id}}
+    snapshot = await graph.aget_state(config)
+    if snapshot.next:
+        if run_identity(snapshot.values) != run_identity(state):
+            raise RunMismatchError(run_id)
+        print(f"♻️ Resuming run {run_id} at: {', '.join(snapshot.next)}")
+        return None, config
+    return state, config
+
+
+async def arun_trading_pipeline(
+    coin: str,
+    trade_date: str = None,
+    trader_position: str = "existing_buyer",
+    duration: str = "short_term",
+    run_id: str = None,
+):
+    if trade_date is None:
+        trade_date = datetime.today().strftime("%Y-%m-%d")
+    run_id = run_id or str(uuid.uuid4())
+
+    state = build_initial_state(coin, trade_date, trader_position, duration)
+
+    print(
+        f"\n🚀 Starting pipeline for: {coin} ({trader_position}, {duration}) on {trade_date}\n"
+    )
+    graph_input, config = await start_or_resume(run_id, state)
+    try:
+        final_state = await graph.ainvoke(graph_input, config)
+    except Exception as e:
+        raise PipelineRunError(run_id, e) from e
+    # Finished runs have nothing left to resume
+    await graph.checkpointer.adelete_thread(run_id)
+
+    # === Build structured output ===
+    structured_output = build_structured_output(
+        final_state, coin, trade_date, trader_position, duration
+    )
+    structured_output["run_id"] = run_id
+
     # === Keep old prints for CLI debugging ===
     print("\n✅ Final Decision Output\n")
     print("📰 News Report:\n", final_state.get("news_report", "N/A"))
@@ -75,6 +177,124 @@ def run_trading_pipeline(
     return structured_output
 
 
+async def astream_trading_pipeline(
+    coin: str,
+    trade_date: str = None,
+    trader_position: str = "existing_buyer",
+    duration: str = "short_term",
+    run_id: str = None,
+):
+    """
+    Run the pipeline and yield `(event, payload)` pairs as nodes finish.
+
+    A `run` event with the run id comes first, then one event per report
+    in STREAMED_REPORTS, then a `final_decision` event carrying the same
+    structured output that `arun_trading_pipeline` returns.
+    """
+    if trade_date is None:
+        trade_date = datetime.today().strftime("%Y-%m-%d")
+    run_id = run_id or str(uuid.uuid4())
+
+    state = build_initial_state(coin, trade_date, trader_position, duration)
+    graph_input, config = await start_or_resume(run_id, state)
+    yield "run", {"run_id": run_id, "resumed": graph_input is None}
+
+    try:
+        async for chunk in graph.astream(graph_input, config, stream_mode="updates"):
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                for key in STREAMED_REPORTS:
+                    if update.get(key) is not None:
+                        yield key, {"node": node, "content": update[key]}
+        # Read back the merged state so a resumed run still reports
+        # the nodes that finished before the failure
+        final_state = (await graph.aget_state(config)).values
+    except Exception as e:
+        raise PipelineRunError(run_id, e) from e
+    await graph.checkpointer.adelete_thread(run_id)
+
+    structured_output = build_structured_output(
+        final_state, coin, trade_date, trader_position, duration
+    )
+    structured_output["run_id"] = run_id
+    yield "final_decision", structured_output
+
+
+def run_trading_pipeline_batch(
+    coins,
+    trade_date: str = None,
+    trader_position: str = "existing_buyer",
+    duration: str = "short_term",
+    concurrency: int = None,
+):
+    """Blocking wrapper: returns {coin: result} once every coin has finished."""
+
+    async def collect():
+        return {
+            coin: result
+            async for coin, result in arun_trading_pipeline_batch(
+                coins, trade_date, trader_position, duration, concurrency
+            )
+        }
+
+    return asyncio.run(collect())
+
+
+async def arun_trading_pipeline_batch(
+    coins,
+    trade_date: str = None,
+    trader_position: str = "existing_buyer",
+    duration: str = "short_term",
+    concurrency: int = None,
+    runner=None,
+):
+    """
+    Analyze many coins and yield `(coin, result)` in completion order.
+
+    Market data for every coin is fetched up front with a single
+    /coins/markets call and technical indicators for all of them are
+    computed in one vectorized pass; the per-coin graphs then reuse those
+    caches and run with at most `concurrency` pipelines in flight.
+    `runner` defaults to `arun_trading_pipeline` and can be swapped for a
+    cached variant.
+    """
+    runner = runner or arun_trading_pipeline
+    coins = list(dict.fromkeys(coins))
+    semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
+
+    snapshot = await toolkit.fundamental_agent.afetch_markets(coins)
+    if "error" in snapshot:
+        print(f"[WARN] Bulk market snapshot failed: {snapshot['error']}")
+    await toolkit.aprime_technicals(coins)
+
+    async def run_one(coin):
+        async with semaphore:
+            try:
+                data = await runner(
+                    coin=coin,
+                    trade_date=trade_date,
+                    trader_position=trader_position,
+                    duration=duration,
+                )
+                return coin, {"status": "success", "data": data}
+            except Exception as e:
+                return coin, {
+                    "status": "error",
+                    "detail": str(e),
+                    "run_id": getattr(e, "run_id", None),
+                }
+
+    tasks = [asyncio.create_task(run_one(coin)) for coin in coins]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away mid-batch: don't leave orphaned pipelines running
+        for task in tasks:
+            task.cancel()
+
+
 if __name__ == "__main__":
     # Modify this line to run for different coins or dates
     run_trading_pipeline(
@@ -0,0 +1,150 @@
+# prewarm.py
+
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from main_runner import arun_trading_pipeline_batch
+from toolkit.coin_registry import coin_registry
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")
+# Comma-separated coins always warmed; empty means the toolkit's known coins
+PREWARM_COINS = [c.strip() for c in os.getenv("PREWARM_COINS", "").split(",") if c.strip()]
+# Seconds between cycles; cycles start on wall-clock multiples (600 -> :00, :10, ...)
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", "600"))
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "2"))
+# Most-requested (coin, position, duration) combos warmed on top of PREWARM_COINS
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "12"))
+
+DEFAULT_PROFILE = ("existing_buyer", "short_term")
+
+
+class RequestStats:
+    """
+    Decaying request counts per (coin, trader_position, duration).
+
+    Counts are halved after every pre-warm cycle, so yesterday's spike
+    fades out instead of pinning a coin in the hot set forever. Coins are
+    keyed by their registry id, so "btc" and "bitcoin" count together.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+
+    def record(self, coin, trader_position, duration):
+        self._counts[(coin_registry.key(coin), trader_position, duration)] += 1
+
+    def top(self, n):
+        return [key for key, _ in self._counts.most_common(n)]
+
+    def decay(self):
+        self._counts = Counter(
+            {key: count / 2 for key, count in self._counts.items() if count >= 1}
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "|".join(key): round(count, 2)
+            for key, count in self._counts.most_common(PREWARM_TOP_N)
+        }
+
+
+class PrewarmScheduler:
+    """
+    Periodically runs the pipeline for hot coins so their first request of
+    the day is a result-cache hit instead of a cold run.
+
+    `runner` has the `cached_trading_pipeline` signature plus `refresh`;
+    it is called with refresh=True so entries are recomputed before they
+    expire rather than merely read back.
+    """
+
+    def __init__(
+        self,
+        runner,
+        stats: RequestStats,
+        coins=None,
+        interval: int = PREWARM_INTERVAL,
+        concurrency: int = PREWARM_CONCURRENCY,
+        top_n: int = PREWARM_TOP_N,
+    ):
+        self.runner = runner
+        self.stats = stats
+        self.coins = list(coins or [])
+        self.interval = interval
+        self.concurrency = concurrency
+        self.top_n = top_n
+        self._task = None
+        self.last_run = {}
+
+    def plan(self):
+        """Return {(trader_position, duration): [coins]} for the next cycle."""
+        plan = {}
+        for coin, trader_position, duration in self.stats.top(self.top_n):
+            plan.setdefault((trader_position, duration), []).append(coin)
+        default_coins = plan.setdefault(DEFAULT_PROFILE, [])
+        for coin in map(coin_registry.key, self.coins):
+            if coin not in default_coins:
+                default_coins.append(coin)
+        return {profile: coins for profile, coins in plan.items() if coins}
+
+    async def run_once(self):
+        started = time.perf_counter()
+        trade_date = datetime.today().strftime("%Y-%m-%d")
+        warmed, failed = 0, 0
+
+        async def refresh(**kwargs):
+            return await self.runner(**kwargs, refresh=True)
+
+        for (trader_position, duration), coins in self.plan().items():
+            async for coin, result in arun_trading_pipeline_batch(
+                coins,
+                trade_date=trade_date,
+                trader_position=trader_position,
+                duration=duration,
+                concurrency=self.concurrency,
+                runner=refresh,
+            ):
+                if result["status"] == "success":
+                    warmed += 1
+                else:
+                    failed += 1
+                    print(f"[WARN] Pre-warm failed for {coin}: {result['detail']}")
+
+        self.stats.decay()
+        self.last_run = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "warmed": warmed,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+        print(f"🔥 Pre-warm cycle done: {self.last_run}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] Pre-warm cycle failed: {e}")
+            await asyncio.sleep(self.interval - time.time() % self.interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "interval_seconds": self.interval,
+            "last_run": self.last_run,
+            "hot": self.stats.snapshot(),
+        }
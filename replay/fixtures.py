@@ -0,0 +1,125 @@
+# replay/fixtures.py
+
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlencode, urlsplit
+
+REPLAY_DIR = os.getenv("REPLAY_DIR", os.path.join(os.path.dirname(__file__), "fixtures"))
+
+# Never written to fixture files, and ignored when matching requests
+SECRET_PARAMS = {"x_cg_demo_api_key", "x_cg_pro_api_key", "auth_token", "api_key"}
+# Time-window bounds derived from the wall clock; a replay at a later time
+# must still match the recording
+VOLATILE_PARAMS = {"from", "to"}
+
+
+def http_key(host_and_path: str, params) -> str:
+    """
+    Fixture key for a GET: "host/path?sorted-params" without secrets.
+
+    The stand-in server serves upstream hosts as path prefixes
+    (http://127.0.0.1:PORT/api.coingecko.com/api/v3/...), so recording
+    and replay arrive at the same key.
+    """
+    query = urlencode(
+        sorted(
+            (name, str(value))
+            for name, value in (params or {}).items()
+            if name not in SECRET_PARAMS | VOLATILE_PARAMS and value is not None
+        )
+    )
+    return f"{host_and_path.strip('/')}?{query}"
+
+
+def url_key(url: str, params) -> str:
+    parts = urlsplit(url)
+    return http_key(f"{parts.hostname}{parts.path}", params)
+
+
+def message_signature(message) -> dict:
+    # Tool call ids are random per run, so only names/args take part
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": [
+            {"name": call["name"], "args": call["args"]}
+            for call in getattr(message, "tool_calls", None) or []
+        ],
+    }
+
+
+def llm_key(messages, tool_names) -> str:
+    payload = {
+        "messages": [message_signature(message) for message in messages],
+        "tools": sorted(tool_names or []),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class FixtureStore:
+    """
+    Recorded upstream HTTP responses and LLM replies, one JSON file each
+    (`http.json`, `llm.json`) under `path`. Writes go straight to disk so
+    a recording session that dies half-way still leaves usable fixtures.
+    """
+
+    def __init__(self, path: str = REPLAY_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self.http = self._load("http.json")
+        self.llm = self._load("llm.json")
+        self.stats = {"http_hits": 0, "http_misses": 0, "llm_hits": 0, "llm_misses": 0}
+
+    def _load(self, name):
+        try:
+            with open(os.path.join(self.path, name), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, name, data):
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, name)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(target + ".tmp", target)
+
+    # ---------------- HTTP ---------------- #
+
+    def record_http(self, url, params, response):
+        """`HttpClient.recorder` hook."""
+        record = {
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": response.text,
+        }
+        with self._lock:
+            self.http[url_key(url, params)] = record
+            self._save("http.json", self.http)
+
+    def get_http(self, key):
+        record = self.http.get(key)
+        self.stats["http_hits" if record else "http_misses"] += 1
+        return record
+
+    # ---------------- LLM ---------------- #
+
+    def record_llm(self, key, message):
+        record = {
+            "content": message.content,
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"]}
+                for call in getattr(message, "tool_calls", None) or []
+            ],
+        }
+        with self._lock:
+            self.llm[key] = record
+            self._save("llm.json", self.llm)
+
+    def get_llm(self, key):
+        record = self.llm.get(key)
+        self.stats["llm_hits" if record else "llm_misses"] += 1
+        return record
@@ -0,0 +1,128 @@
+# replay/llm.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from replay.fixtures import FixtureStore, llm_key
+
+# Seconds each fake LLM call takes, to mimic real inference latency
+REPLAY_LLM_LATENCY = float(os.getenv("REPLAY_LLM_LATENCY", "0"))
+
+
+def tool_names(tools):
+    """Names of bound tools, given in OpenAI tool format (as ChatGroq binds them)."""
+    return [tool.get("function", tool).get("name") for tool in tools or []]
+
+
+# Synthetic research output in the exact shape extract_research_view parses
+SYNTHETIC_RESEARCH = (
+    "Market Summary:\n"
+    "• Replay run: synthetic research summary.\n"
+    "Short-Term Recommendation: Hold, Confidence: 0.6\n"
+    "Medium-Term Recommendation: Hold, Confidence: 0.6\n"
+    "Long-Term Recommendation: Buy, Confidence: 0.8\n"
+    "Existing Holder Advice: Hold — Reason: replay\n"
+    "New Investor Advice: Hold — Reason: replay"
+)
+
+
+class LLMRecorder(BaseCallbackHandler):
+    """Callback that stores every chat model reply under its prompt's fixture key."""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+        self._pending = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        tools = (kwargs.get("invocation_params") or {}).get("tools")
+        self._pending[run_id] = llm_key(messages[0], tool_names(tools))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        key = self._pending.pop(run_id, None)
+        if key is not None:
+            self.store.record_llm(key, response.generations[0][0].message)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._pending.pop(run_id, None)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for ChatGroq.
+
+    Returns the recorded reply for a prompt when the fixtures have one.
+    Otherwise it synthesizes a stable reply: a tool call when tools are
+    bound and none has run yet, research output in the parsed format,
+    or a short report. Every call sleeps `latency` seconds.
+    """
+
+    fixtures: Optional[Any] = None
+    latency: float = REPLAY_LLM_LATENCY
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages, tools=None) -> AIMessage:
+        tools = tool_names(tools)
+        key = llm_key(messages, tools)
+        record = self.fixtures.get_llm(key) if self.fixtures is not None else None
+        if record is not None:
+            return AIMessage(
+                content=record["content"],
+                tool_calls=[
+                    {**call, "id": f"call_{key[:12]}_{i}", "type": "tool_call"}
+                    for i, call in enumerate(record["tool_calls"])
+                ],
+            )
+        return self._synthesize(key, messages, tools)
+
+    def _synthesize(self, key, messages, tools) -> AIMessage:
+        if tools and not any(isinstance(m, ToolMessage) for m in messages):
+            task = next(
+                (m.content for m in reversed(messages) if isinstance(m, HumanMessage)),
+                "",
+            )
+            match = re.search(r"for (\S+?)\.?$", task.strip())
+            coin = match.group(1) if match else "bitcoin"
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": tools[0],
+                        "args": {"coin": coin},
+                        "id": f"call_{key[:12]}_0",
+                        "type": "tool_call",
+                    }
+                ],
+            )
+
+        system = messages[0].content if messages else ""
+        if "research analyst" in system:
+            return AIMessage(content=SYNTHETIC_RESEARCH)
+        digest = hashlib.sha256(
+            json.dumps([m.content for m in messages], default=str).encode()
+        ).hexdigest()[:8]
+        return AIMessage(content=f"Replay report {digest}: {system[:80].strip()}")
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, tools))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, tools))])
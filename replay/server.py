@@ -0,0 +1,97 @@
+# replay/server.py
+"""
+Local stand-in for CoinGecko and CryptoPanic that serves recorded fixtures.
+
+Upstream hosts are mounted as path prefixes, so the tools only need their
+base URLs pointed here:
+
+    COINGECKO_BASE_URL=http://127.0.0.1:8765/api.coingecko.com/api/v3
+    CRYPTOPANIC_BASE_URL=http://127.0.0.1:8765/cryptopanic.com
+
+Run standalone (e.g. for load tests against a separate API process):
+    python -m replay.server --port 8765 --latency 0.05
+LLM_MODE=replay starts one in-process automatically.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from replay.fixtures import FixtureStore, http_key
+
+# Seconds added to every stand-in response, to mimic upstream round trips
+REPLAY_HTTP_LATENCY = float(os.getenv("REPLAY_HTTP_LATENCY", "0"))
+
+
+def make_handler(store: FixtureStore, latency: float):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            key = http_key(parts.path, dict(parse_qsl(parts.query)))
+            record = store.get_http(key)
+            if latency:
+                time.sleep(latency)
+
+            if record is None:
+                status = 404
+                content_type = "application/json"
+                body = json.dumps({"error": f"No fixture recorded for {key}"})
+            else:
+                status = record["status"]
+                content_type = record["content_type"]
+                body = record["body"]
+
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_server(store: FixtureStore, host="127.0.0.1", port=0, latency=REPLAY_HTTP_LATENCY):
+    """Serve `store` from a daemon thread; returns the server (see .server_port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(store, latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def point_tools_at(server):
+    """Set the env overrides the tools read for their upstream base URLs."""
+    base = f"http://{server.server_address[0]}:{server.server_port}"
+    os.environ["COINGECKO_BASE_URL"] = f"{base}/api.coingecko.com/api/v3"
+    os.environ["CRYPTOPANIC_BASE_URL"] = f"{base}/cryptopanic.com"
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=REPLAY_HTTP_LATENCY)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port), make_handler(FixtureStore(), args.latency)
+    )
+    base = f"http://{args.host}:{args.port}"
+    print(f"Serving fixtures on {base}")
+    print(f"COINGECKO_BASE_URL={base}/api.coingecko.com/api/v3")
+    print(f"CRYPTOPANIC_BASE_URL={base}/cryptopanic.com")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
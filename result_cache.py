@@ -0,0 +1,134 @@
+# result_cache.py
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+from cachetools import TTLCache
+
+from toolkit.coin_registry import coin_registry
+
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "900"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+
+
+class ResultCache:
+    """
+    Two-tier cache for finished pipeline results.
+
+    - L1: in-process LRU with TTL (cachetools.TTLCache)
+    - L2: optional shared Mongo collection, so every API worker sees hits
+
+    Concurrent misses for the same key are coalesced: one pipeline runs and
+    the other callers await its result.
+    """
+
+    def __init__(
+        self,
+        collection=None,
+        ttl: int = RESULT_CACHE_TTL,
+        maxsize: int = RESULT_CACHE_SIZE,
+        cacheable=None,
+    ):
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._collection = collection
+        self._cacheable = cacheable or (lambda value: True)
+        self._inflight = {}
+        self._index_ready = False
+        self.stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+        }
+
+    @staticmethod
+    def make_key(coin, trade_date, trader_position, duration) -> str:
+        # Registry id, so "btc" hits the entry pre-warmed as "bitcoin"
+        return "|".join([coin_registry.key(coin), trade_date, trader_position, duration])
+
+    async def get_or_compute(self, key, compute, refresh=False):
+        """
+        Return the cached value for `key`, or await `compute()` exactly once.
+
+        `refresh=True` skips both tiers and recomputes (used by pre-warming
+        to replace entries before they expire); it still coalesces with a
+        load already in flight.
+        """
+        if not refresh and key in self._local:
+            self.stats["hits"] += 1
+            return self._local[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            # Run the load in its own task so a cancelled caller (client
+            # disconnect) doesn't cancel it for everyone else waiting on it.
+            task = asyncio.create_task(self._load(key, compute, refresh))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    def clear(self):
+        """Drop the local tier (the shared tier expires on its own)."""
+        self._local.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "size": len(self._local),
+            "ttl_seconds": self.ttl,
+        }
+
+    async def _load(self, key, compute, refresh=False):
+        value = None if refresh else await self._shared_get(key)
+        if value is not None:
+            self.stats["shared_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            value = await compute()
+            if not self._cacheable(value):
+                return value
+            await self._shared_set(key, value)
+
+        self._local[key] = value
+        return value
+
+    # ---------------- Shared (Mongo) tier ---------------- #
+
+    async def _shared_get(self, key):
+        if self._collection is None:
+            return None
+        try:
+            doc = await self._collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+            )
+        except Exception as e:
+            print(f"[WARN] Result cache read failed: {e}")
+            return None
+        return doc["result"] if doc else None
+
+    async def _shared_set(self, key, value):
+        if self._collection is None:
+            return
+        try:
+            if not self._index_ready:
+                # Mongo drops documents once expires_at has passed
+                await self._collection.create_index("expires_at", expireAfterSeconds=0)
+                self._index_ready = True
+            await self._collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "result": value,
+                    "expires_at": datetime.now(timezone.utc)
+                    + timedelta(seconds=self.ttl),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"[WARN] Result cache write failed: {e}")
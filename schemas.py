@@ -1,7 +1,9 @@
 
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+from toolkit.coin_registry import coin_registry
 
 class SignupSchema(BaseModel):
     name: str
@@ -19,8 +21,40 @@ class TokenResponse(BaseModel):
     name: Optional[str]
     email: EmailStr
 
+def validate_coin(coin: str) -> str:
+    # Reject typos/unknown symbols up front, before any network or LLM work
+    if not coin_registry.is_known(coin):
+        raise ValueError(f"Unknown coin: {coin}")
+    return coin
+
+
 class TradeRequest(BaseModel):
     coin: str
     trade_date: Optional[str] = None
     trader_position: str = "existing_buyer"
     duration: str = "short_term"
+    # Returned by a failed run; pass it back to resume from the failed node
+    run_id: Optional[str] = None
+
+    @field_validator("coin")
+    @classmethod
+    def known_coin(cls, coin):
+        return validate_coin(coin)
+
+
+class BatchTradeRequest(BaseModel):
+    coins: List[str] = Field(min_length=1, max_length=100)
+    trade_date: Optional[str] = None
+    trader_position: str = "existing_buyer"
+    duration: str = "short_term"
+    concurrency: Optional[int] = Field(default=None, ge=1, le=16)
+
+    @field_validator("coins")
+    @classmethod
+    def known_coins(cls, coins):
+        return [validate_coin(coin) for coin in coins]
+
+
+class JobRequest(TradeRequest):
+    # Interactive jobs have their own workers, so batch/pre-warm load can't starve them
+    lane: Literal["interactive", "batch"] = "interactive"
@@ -0,0 +1,221 @@
+# toolkit/coin_registry.py
+
+import json
+import os
+import threading
+import time
+
+# On-disk copy of CoinGecko's /coins/list (+ market-cap ranks), refreshed weekly
+COIN_REGISTRY_PATH = os.getenv(
+    "COIN_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "coingecko_coins.json"),
+)
+COIN_REGISTRY_TTL = int(os.getenv("COIN_REGISTRY_TTL", str(7 * 24 * 3600)))
+# Coins ranked by market cap; the rest are ranked behind them
+RANKED_PAGES = int(os.getenv("COIN_REGISTRY_RANKED_PAGES", "1"))
+
+# (id, symbol, name, market-cap rank) for the coins the tools used to hardcode.
+# They resolve even before (or without) the full list being loaded.
+SEED_COINS = [
+    ("bitcoin", "btc", "Bitcoin", 1),
+    ("ethereum", "eth", "Ethereum", 2),
+    ("tether", "usdt", "Tether", 3),
+    ("ripple", "xrp", "XRP", 4),
+    ("binancecoin", "bnb", "BNB", 5),
+    ("solana", "sol", "Solana", 6),
+    ("usd-coin", "usdc", "USDC", 7),
+    ("tron", "trx", "TRON", 8),
+    ("dogecoin", "doge", "Dogecoin", 9),
+    ("cardano", "ada", "Cardano", 10),
+    ("hyperliquid", "hype", "Hyperliquid", 11),
+    ("chainlink", "link", "Chainlink", 12),
+    ("stellar", "xlm", "Stellar", 13),
+    ("sui", "sui", "Sui", 14),
+    ("bitcoin-cash", "bch", "Bitcoin Cash", 15),
+    ("hedera-hashgraph", "hbar", "Hedera", 16),
+    ("avalanche-2", "avax", "Avalanche", 17),
+    ("wrapped-bitcoin", "wbtc", "Wrapped Bitcoin", 18),
+    ("the-open-network", "ton", "Toncoin", 19),
+    ("polkadot", "dot", "Polkadot", 20),
+]
+# Keys older clients (frontend/lib/coins.ts) still send, from the per-tool maps the
+# registry replaced; consulted only when the id/symbol/name indexes find nothing
+LEGACY_ALIASES = {
+    "binance coin": "binancecoin",
+    "usd coin": "usd-coin",
+    "hedera": "hedera-hashgraph",
+    "bitcoin cash": "bitcoin-cash",
+    "avalanche": "avalanche-2",
+    "wrapped bitcoin": "wrapped-bitcoin",
+    "toncoin": "the-open-network",
+}
+# Seeds that track another asset's price (stablecoins, wrapped tokens); nothing to analyze
+PEGGED_COINS = {"tether", "usd-coin", "wrapped-bitcoin"}
+
+UNRANKED = 10**9
+
+
+class CoinRegistry:
+    """
+    Every CoinGecko coin, indexed by id, symbol and name.
+
+    Loaded lazily on first lookup: from the disk cache when fresh, else from
+    /coins/list plus the top market-cap page for ranks. A query matching
+    several coins (e.g. a symbol shared by hundreds of tokens) resolves to
+    the one with the highest market cap.
+
+    If the full list can't be loaded only the seed coins are known; unknown
+    queries then pass through unchanged instead of being rejected.
+    """
+
+    def __init__(self, http=None, path: str = COIN_REGISTRY_PATH, ttl: int = COIN_REGISTRY_TTL):
+        self.http = http
+        self.path = path
+        self.ttl = ttl
+        self.complete = False
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._index(
+            [
+                {"id": coin_id, "symbol": symbol, "name": name, "rank": rank}
+                for coin_id, symbol, name, rank in SEED_COINS
+            ]
+        )
+
+    # ---------------- Loading ---------------- #
+
+    def _index(self, coins):
+        by_id, by_symbol, by_name = {}, {}, {}
+        for coin in coins:
+            by_id[coin["id"]] = coin
+        for coin in sorted(by_id.values(), key=lambda c: c.get("rank") or UNRANKED):
+            # Best-ranked coin first, so [0] is the market-cap winner
+            by_symbol.setdefault(coin["symbol"].lower(), []).append(coin)
+            by_name.setdefault(coin["name"].lower(), []).append(coin)
+        self.by_id, self.by_symbol, self.by_name = by_id, by_symbol, by_name
+
+    def load(self):
+        """Load the full coin list (idempotent; call at startup to avoid a lazy first hit)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            coins = self._read_disk(fresh_only=True) or self._fetch() or self._read_disk()
+            if coins:
+                seeds = {coin_id: rank for coin_id, _, _, rank in SEED_COINS}
+                for coin in coins:
+                    coin.setdefault("rank", seeds.get(coin["id"]))
+                self._index(coins)
+                self.complete = True
+            else:
+                print("[WARN] Coin list unavailable; only the built-in coins are indexed.")
+            self._loaded = True
+
+    def _read_disk(self, fresh_only=False):
+        try:
+            if fresh_only and time.time() - os.path.getmtime(self.path) > self.ttl:
+                return None
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _fetch(self):
+        if self.http is None:
+            from toolkit.http_client import HttpClient
+
+            self.http = HttpClient()
+        base_url = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+        key = {"x_cg_demo_api_key": os.getenv("COINGECKO_API_KEY")}
+        try:
+            listing = self.http.get(f"{base_url}/coins/list", params=key)
+            if listing.status_code != 200:
+                print(f"[WARN] Coin list fetch failed: {listing.status_code}")
+                return None
+            coins = [
+                {"id": c["id"], "symbol": c.get("symbol") or "", "name": c.get("name") or ""}
+                for c in listing.json()
+                if c.get("id")
+            ]
+
+            ranks = {}
+            for page in range(1, RANKED_PAGES + 1):
+                markets = self.http.get(
+                    f"{base_url}/coins/markets",
+                    params={
+                        "vs_currency": "usd",
+                        "order": "market_cap_desc",
+                        "per_page": 250,
+                        "page": page,
+                        **key,
+                    },
+                )
+                if markets.status_code != 200:
+                    break
+                for row in markets.json():
+                    if row.get("market_cap_rank"):
+                        ranks[row["id"]] = row["market_cap_rank"]
+            for coin in coins:
+                if coin["id"] in ranks:
+                    coin["rank"] = ranks[coin["id"]]
+        except Exception as e:
+            print(f"[WARN] Coin list fetch failed: {e}")
+            return None
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(coins, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"[WARN] Could not cache coin list: {e}")
+        return coins
+
+    # ---------------- Lookup ---------------- #
+
+    def resolve(self, query: str):
+        """Return the best-ranked coin whose id, symbol or name matches `query`."""
+        self.load()
+        query = (query or "").strip().lower()
+        candidates = []
+        if query in self.by_id:
+            candidates.append(self.by_id[query])
+        for index in (self.by_symbol, self.by_name):
+            if query in index:
+                candidates.append(index[query][0])
+        if not candidates:
+            return self.by_id.get(LEGACY_ALIASES.get(query))
+        # Stable sort: an exact id match wins ties
+        return min(candidates, key=lambda c: c.get("rank") or UNRANKED)
+
+    def is_known(self, query: str) -> bool:
+        return self.resolve(query) is not None or not self.complete
+
+    def coin_id(self, query: str):
+        """CoinGecko id for `query`; None if it's definitely not a coin."""
+        coin = self.resolve(query)
+        if coin is not None:
+            return coin["id"]
+        return None if self.complete else query.strip().lower()
+
+    def key(self, query: str) -> str:
+        """Canonical cache/stats key: the CoinGecko id, so aliases share one entry."""
+        return self.coin_id(query) or query.strip().lower()
+
+    def symbol(self, query: str):
+        """Ticker for `query` (e.g. "bitcoin" -> "BTC")."""
+        coin = self.resolve(query)
+        return (coin["symbol"] if coin else query.strip()).upper()
+
+    def seed_ids(self, pegged: bool = False):
+        """Seed coin ids; stablecoins and wrapped tokens only when `pegged`."""
+        return [
+            coin_id
+            for coin_id, _, _, _ in SEED_COINS
+            if pegged or coin_id not in PEGGED_COINS
+        ]
+
+
+# Shared by the toolkit and request validation
+coin_registry = CoinRegistry()
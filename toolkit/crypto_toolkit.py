@@ -4,6 +4,11 @@ from tools.news import FinanceNewsAnalystAgent
 from tools.fundamentals import FundamentalAnalystAgent
 from tools.sentiment import SocialSentimentScraper
 from tools.technical import TechnicalAnalystAgent
+from toolkit.coin_registry import coin_registry
+from toolkit.http_client import HttpClient
+from toolkit.news_store import NewsStore
+from toolkit.price_store import PriceStore
+from toolkit.tool_cache import ToolCache
 
 # Import wrapped tools and the global reference
 from toolkit.crypto_tools_wrapped import (
@@ -11,6 +16,7 @@ from toolkit.crypto_tools_wrapped import (
     get_crypto_fundamentals,
     get_crypto_technicals,
     get_reddit_sentiment_posts,
+    aprime_technicals,
     TOOLKIT_REF,
 )
 
@@ -23,24 +29,53 @@ class MyCryptoToolKit:
         reddit_id=None,
         reddit_secret=None,
         reddit_agent=None,
+        cache_ttls=None,
+        http=None,
+        coins=None,
+        prices=None,
+        news=None,
     ):
+        # 🌐 One pooled keep-alive client for every upstream call
+        self.http = http or HttpClient()
+
+        # 🪙 One coin registry resolving names/symbols/ids for every tool
+        self.coins = coins or coin_registry
+        if self.coins.http is None:
+            self.coins.http = self.http
+
         # Create agent instances
-        self.news_agent = FinanceNewsAnalystAgent(cryptopanic_key)
-        self.fundamental_agent = FundamentalAnalystAgent(coingecko_key)
-        self.technical_agent = TechnicalAnalystAgent(coingecko_key)
+        shared = {"http": self.http, "coins": self.coins}
+        # 📰 Local news store, kept current by the background NewsPoller
+        self.news = news or NewsStore()
+        self.news_agent = FinanceNewsAnalystAgent(cryptopanic_key, store=self.news, **shared)
+        self.fundamental_agent = FundamentalAnalystAgent(coingecko_key, **shared)
+        # 📈 Local price history: warm coins only fetch the bars added since last time
+        self.prices = prices or PriceStore()
+        self.technical_agent = TechnicalAnalystAgent(
+            coingecko_key, prices=self.prices, **shared
+        )
 
         # ✅ Social/news sentiment scraper (CryptoPanic + Twitter/X)
         # Kept under attribute name `reddit_scraper` for backward compatibility.
-        self.reddit_scraper = SocialSentimentScraper(cryptopanic_key)
+        self.reddit_scraper = SocialSentimentScraper(cryptopanic_key, **shared)
+
+        # 🗄️ Short-lived cache of raw upstream data shared by every request;
+        # `cache_ttls` overrides the per-data-type freshness (seconds)
+        self.cache = ToolCache(ttls=cache_ttls)
 
         # Inject them into global context for tools
         TOOLKIT_REF["news_agent"] = self.news_agent
         TOOLKIT_REF["fundamental_agent"] = self.fundamental_agent
         TOOLKIT_REF["technical_agent"] = self.technical_agent
         TOOLKIT_REF["reddit_scraper"] = self.reddit_scraper
+        TOOLKIT_REF["cache"] = self.cache
+        TOOLKIT_REF["coins"] = self.coins
 
         # Expose tools
         self.get_crypto_news = get_crypto_news
         self.get_crypto_fundamentals = get_crypto_fundamentals
         self.get_crypto_technicals = get_crypto_technicals
         self.get_reddit_sentiment_posts = get_reddit_sentiment_posts
+
+        # Batch paths fill the technicals cache for many coins in one pass
+        self.aprime_technicals = aprime_technicals
@@ -1,9 +1,13 @@
 # toolkit/crypto_tools_wrapped.py
 
 from pydantic import BaseModel
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
+import asyncio
 import json
 
+from tools import sentiment_scorer
+from tools.sentiment import NO_POSTS
+
 # Global reference to shared tool instances (agents/scrapers)
 TOOLKIT_REF = {}
 
@@ -13,37 +17,153 @@ class CoinInput(BaseModel):
     coin: str
 
 
-@tool(args_schema=CoinInput)
+def _key(coin):
+    # Registry id, so "btc", "BTC" and "bitcoin" share one entry and one upstream call
+    return TOOLKIT_REF["coins"].key(coin)
+
+
+def _cached(kind, coin, fetch):
+    return TOOLKIT_REF["cache"].get_or_fetch(kind, _key(coin), fetch)
+
+
+async def _acached(kind, coin, fetch):
+    return await TOOLKIT_REF["cache"].aget_or_fetch(kind, _key(coin), fetch)
+
+
+def _coin_tool(func, coroutine):
+    """Expose a sync/async implementation pair as a single LangChain tool."""
+    return StructuredTool.from_function(
+        func=func,
+        coroutine=coroutine,
+        name=func.__name__,
+        args_schema=CoinInput,
+    )
+
+
+# ---------------- News ---------------- #
+
 def get_crypto_news(coin: str) -> str:
     """Return recent news articles related to a cryptocurrency coin."""
-    news = TOOLKIT_REF["news_agent"].fetch_news(currencies=coin)
+    news = _cached(
+        "news", coin, lambda: TOOLKIT_REF["news_agent"].fetch_news(currencies=coin)
+    )
     return json.dumps(news, indent=2)
 
 
-@tool(args_schema=CoinInput)
+async def aget_crypto_news(coin: str) -> str:
+    news = await _acached(
+        "news", coin, lambda: TOOLKIT_REF["news_agent"].afetch_news(currencies=coin)
+    )
+    return json.dumps(news, indent=2)
+
+
+# ---------------- Fundamentals ---------------- #
+
 def get_crypto_fundamentals(coin: str) -> str:
     """Fetch raw fundamental data for a cryptocurrency coin."""
-    data = TOOLKIT_REF["fundamental_agent"].fetch_data(coin)
+    data = _cached(
+        "fundamentals", coin, lambda: TOOLKIT_REF["fundamental_agent"].fetch_data(coin)
+    )
     return json.dumps(data, indent=2)
 
 
-@tool(args_schema=CoinInput)
+async def aget_crypto_fundamentals(coin: str) -> str:
+    data = await _acached(
+        "fundamentals", coin, lambda: TOOLKIT_REF["fundamental_agent"].afetch_data(coin)
+    )
+    return json.dumps(data, indent=2)
+
+
+# ---------------- Technicals ---------------- #
+
+def _technicals(df):
+    if isinstance(df, dict) and "error" in df:
+        return df
+    return TOOLKIT_REF["technical_agent"].compute_indicators(df)
+
+
 def get_crypto_technicals(coin: str) -> str:
     """Return technical indicators (RSI, MACD, Bollinger Bands) for a cryptocurrency coin."""
-    df = TOOLKIT_REF["technical_agent"].fetch_ohlc_data(coin)
-    if isinstance(df, dict) and "error" in df:
-        return json.dumps(df)
-    indicators = TOOLKIT_REF["technical_agent"].compute_indicators(df)
+    agent = TOOLKIT_REF["technical_agent"]
+    indicators = _cached(
+        "technicals",
+        coin,
+        lambda: _technicals(_cached("ohlc", coin, lambda: agent.fetch_ohlc_data(coin))),
+    )
+    if "error" in indicators:
+        return json.dumps(indicators)
+    return json.dumps(indicators, indent=2)
+
+
+async def aget_crypto_technicals(coin: str) -> str:
+    agent = TOOLKIT_REF["technical_agent"]
+
+    async def compute():
+        df = await _acached("ohlc", coin, lambda: agent.afetch_ohlc_data(coin))
+        # Indicator state is loaded, replayed and saved on disk: keep it off the loop
+        return await asyncio.to_thread(_technicals, df)
+
+    indicators = await _acached("technicals", coin, compute)
+    if "error" in indicators:
+        return json.dumps(indicators)
     return json.dumps(indicators, indent=2)
 
 
-@tool(args_schema=CoinInput)
+async def aprime_technicals(coins):
+    """
+    Fill the technicals cache for many coins: OHLC is fetched concurrently,
+    then indicators for all of them are computed in one vectorized pass in
+    a worker thread (it reads and writes the per-series indicator state).
+    """
+    agent = TOOLKIT_REF["technical_agent"]
+    frames = await asyncio.gather(
+        *(_acached("ohlc", coin, lambda c=coin: agent.afetch_ohlc_data(c)) for coin in coins)
+    )
+    ready = {
+        coin: df
+        for coin, df in zip(coins, frames)
+        if not (isinstance(df, dict) and "error" in df)
+    }
+    if not ready:
+        return {}
+    computed = await asyncio.to_thread(agent.compute_indicators_many, ready)
+    for coin, indicators in computed.items():
+        TOOLKIT_REF["cache"].put("technicals", _key(coin), indicators)
+    return computed
+
+
+# ---------------- Social sentiment ---------------- #
+
+def _sentiment(cleaned_posts):
+    # The scraper's placeholder is not a post
+    if cleaned_posts == [NO_POSTS]:
+        cleaned_posts = []
+    return json.dumps(sentiment_scorer.summarize(cleaned_posts), indent=2)
+
+
 def get_reddit_sentiment_posts(coin: str) -> str:
     """
-    Fetch cleaned social & news posts (Twitter/X + CryptoPanic)
-    about a cryptocurrency for sentiment analysis.
+    Score recent social & news posts (Twitter/X + CryptoPanic) about a
+    cryptocurrency: aggregate polarity stats plus a few representative posts.
 
     Kept under the old name for backward compatibility.
     """
-    cleaned_posts = TOOLKIT_REF["reddit_scraper"].get_cleaned_posts(coin)
-    return "\n\n".join(cleaned_posts[:20])
+    cleaned_posts = _cached(
+        "posts", coin, lambda: TOOLKIT_REF["reddit_scraper"].get_cleaned_posts(coin)
+    )
+    return _sentiment(cleaned_posts)
+
+
+async def aget_reddit_sentiment_posts(coin: str) -> str:
+    cleaned_posts = await _acached(
+        "posts", coin, lambda: TOOLKIT_REF["reddit_scraper"].aget_cleaned_posts(coin)
+    )
+    return _sentiment(cleaned_posts)
+
+
+get_crypto_news = _coin_tool(get_crypto_news, aget_crypto_news)
+get_crypto_fundamentals = _coin_tool(get_crypto_fundamentals, aget_crypto_fundamentals)
+get_crypto_technicals = _coin_tool(get_crypto_technicals, aget_crypto_technicals)
+get_reddit_sentiment_posts = _coin_tool(
+    get_reddit_sentiment_posts, aget_reddit_sentiment_posts
+)
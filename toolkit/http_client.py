@@ -0,0 +1,205 @@
+# toolkit/http_client.py
+
+import asyncio
+import os
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from toolkit.rate_limit import (
+    HTTP_MAX_RETRIES,
+    RETRY_STATUSES,
+    backoff_delay,
+    build_limiters,
+    parse_retry_after,
+)
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+# Total pooled connections, and the most any one upstream host may hold
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+# Seconds an idle keep-alive connection stays in the async pool
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2 = os.getenv("HTTP2", "false").lower() in ("1", "true", "yes")
+
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client shared by every tool.
+
+    - sync: one requests.Session whose per-host pools block at
+      `max_per_host` connections
+    - async: one httpx.AsyncClient per event loop (pooled connections
+      belong to the loop that opened them), with a per-host semaphore
+      since httpx only limits connections globally
+
+    Every call gets the default connect/read timeouts unless it passes
+    its own `timeout`. Calls to rate-limited providers (see
+    toolkit/rate_limit.py) wait for quota first, and 429/5xx responses are
+    retried with Retry-After or jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_per_host: int = HTTP_MAX_PER_HOST,
+        http2: bool = HTTP2,
+        limiters=None,
+    ):
+        if http2 and not HAS_H2:
+            print("[WARN] HTTP2 requested but the 'h2' package is not installed. Using HTTP/1.1.")
+            http2 = False
+
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.http2 = http2
+        self.limiters = build_limiters() if limiters is None else limiters
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max(1, max_connections // max_per_host),
+            pool_maxsize=max_per_host,
+            pool_block=True,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Per event loop: (httpx.AsyncClient, {host: Semaphore}, closer task)
+        self._async_clients = {}
+
+        # Optional `recorder(url, params, response)` fed every final response;
+        # set by LLM_MODE=record to capture replay fixtures
+        self.recorder = None
+
+    # ---------------- Quota / retries ---------------- #
+
+    def _limiter(self, url):
+        return self.limiters.get(urlsplit(url).hostname)
+
+    def _retry_delay(self, response, attempt, limiter):
+        """Seconds to sleep before retrying `response`, or None to return it."""
+        if response.status_code not in RETRY_STATUSES or attempt >= HTTP_MAX_RETRIES:
+            return None
+
+        delay = backoff_delay(
+            attempt, parse_retry_after(response.headers.get("Retry-After"))
+        )
+        print(
+            f"[WARN] {response.status_code} from {urlsplit(str(response.url)).hostname}; "
+            f"retry {attempt + 1}/{HTTP_MAX_RETRIES} in {delay:.1f}s"
+        )
+        if limiter is None:
+            return delay
+        limiter.stats["retries"] += 1
+        if response.status_code == 429:
+            # Holds back every caller; the retry's own reservation does the waiting
+            limiter.throttled(delay)
+            return 0.0
+        return delay
+
+    def _record(self, url, kwargs, response):
+        if self.recorder is not None:
+            try:
+                self.recorder(url, kwargs.get("params"), response)
+            except Exception as e:
+                print(f"[WARN] HTTP recording failed: {e}")
+        return response
+
+    def snapshot(self) -> dict:
+        return {
+            limiter.name: limiter.snapshot()
+            for limiter in {id(l): l for l in self.limiters.values()}.values()
+        }
+
+    # ---------------- Sync ---------------- #
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", (self.connect_timeout, self.read_timeout))
+        limiter = self._limiter(url)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                time.sleep(limiter.reserve())
+            response = self.session.get(url, **kwargs)
+            delay = self._retry_delay(response, attempt, limiter)
+            if delay is None:
+                return self._record(url, kwargs, response)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.session.close()
+
+    # ---------------- Async ---------------- #
+
+    def _client_for_loop(self):
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            # A new loop (e.g. another asyncio.run from the CLI) can't reuse
+            # connections opened on another one, so it gets its own pool
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=self.http2,
+            )
+            closer = loop.create_task(self._close_with_loop(loop, client))
+            entry = self._async_clients[loop] = (client, {}, closer)
+        return entry
+
+    async def _close_with_loop(self, loop, client):
+        # asyncio.run cancels leftover tasks before closing its loop, so the
+        # pool is closed on the loop that owns it instead of leaking sockets
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if self._async_clients.get(loop, (None,))[0] is client:
+                del self._async_clients[loop]
+            await client.aclose()
+
+    async def aget(self, url, **kwargs):
+        client, host_slots, _ = self._client_for_loop()
+        host = urlsplit(url).netloc
+        slots = host_slots.get(host)
+        if slots is None:
+            slots = host_slots[host] = asyncio.Semaphore(self.max_per_host)
+
+        limiter = self._limiter(url)
+        attempt = 0
+        while True:
+            # Wait for quota before taking a connection slot
+            if limiter is not None:
+                await asyncio.sleep(limiter.reserve())
+            async with slots:
+                response = await client.get(url, **kwargs)
+            delay = self._retry_delay(response, attempt, limiter)
+            if delay is None:
+                return self._record(url, kwargs, response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            client, _, closer = entry
+            closer.cancel()
+            await client.aclose()
@@ -0,0 +1,401 @@
+# toolkit/indicator_state.py
+
+import copy
+import json
+import math
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from tools.indicators import (
+    ATR_WINDOW,
+    BB_DEV,
+    BB_WINDOW,
+    EMA_SPANS,
+    EXTENDED_ROUNDING,
+    MACD_FAST,
+    MACD_SIGN,
+    MACD_SLOW,
+    RSI_WINDOW,
+    SECONDS_PER_YEAR,
+    STOCH_SMOOTH,
+    STOCH_WINDOW,
+    VOL_WINDOW,
+)
+
+NAN = float("nan")
+STATE_VERSION = 1
+
+
+class RollingWindow:
+    """
+    The last `size` values with a running sum and sum of squares.
+
+    Sums are kept relative to `shift` (a value from the buffer) so large
+    prices don't lose precision, and are recomputed from the buffer every
+    `size` pushes so rounding errors can't accumulate.
+    """
+
+    def __init__(self, size, items=(), shift=None):
+        self.size = size
+        self.items = deque(items, maxlen=size)
+        self.shift = shift
+        self._pushes = 0
+        self._resync()
+
+    def _resync(self):
+        if self.items:
+            self.shift = self.items[0]
+        deltas = [x - self.shift for x in self.items] if self.items else []
+        self.total = math.fsum(deltas)
+        self.total_sq = math.fsum(d * d for d in deltas)
+
+    def push(self, value):
+        if self.shift is None:
+            self.shift = value
+        if len(self.items) == self.size:
+            old = self.items[0] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        self.items.append(value)
+        delta = value - self.shift
+        self.total += delta
+        self.total_sq += delta * delta
+        self._pushes += 1
+        if self._pushes % self.size == 0:
+            self._resync()
+
+    @property
+    def full(self):
+        return len(self.items) == self.size
+
+    def mean(self):
+        return self.shift + self.total / len(self.items)
+
+    def std(self, ddof=0):
+        n = len(self.items)
+        variance = (self.total_sq - self.total * self.total / n) / (n - ddof)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self):
+        return {"items": list(self.items), "shift": self.shift}
+
+
+class IndicatorState:
+    """
+    Streaming form of `indicators.compute_extended` for one series of bars.
+
+    `push` folds in one closed bar in constant time: EMA accumulators for
+    the trend EMAs and MACD/signal, Wilder averages for RSI and ATR,
+    ring buffers for Bollinger, stochastic RSI and realized volatility.
+    Fed the same bars, `values` matches a full recomputation. The state
+    round-trips through `to_dict`/`from_dict`.
+    """
+
+    SPANS = (MACD_FAST, MACD_SLOW, *EMA_SPANS)
+    # Plain attributes serialized as they are
+    SCALARS = (
+        "bar_seconds", "ts", "close", "count", "signal", "macd_count", "avg_up",
+        "avg_down", "tr_total", "atr", "obv", "has_volume", "values",
+    )
+
+    def __init__(self, bar_seconds: int):
+        self.bar_seconds = bar_seconds
+        # Start time and close of the last pushed bar
+        self.ts = None
+        self.close = None
+        self.count = 0
+        self.ema = {span: None for span in self.SPANS}
+        self.signal = None
+        self.macd_count = 0
+        self.avg_up = None
+        self.avg_down = None
+        self.tr_total = 0.0
+        self.atr = None
+        self.obv = 0.0
+        self.has_volume = False
+        self.closes = RollingWindow(BB_WINDOW)
+        self.returns = RollingWindow(VOL_WINDOW)
+        self.recent_rsi = deque(maxlen=STOCH_WINDOW)
+        self.recent_stoch = deque(maxlen=STOCH_SMOOTH)
+        self.recent_k = deque(maxlen=STOCH_SMOOTH)
+        self.values = {}
+
+    def push(self, ts, high, low, close, volume=NAN):
+        previous = self.close
+        self.ts, self.close = int(ts), float(close)
+        self.count += 1
+
+        for span, value in self.ema.items():
+            self.ema[span] = close if value is None else value + 2 / (span + 1) * (close - value)
+        ema = {span: v if self.count >= span else NAN for span, v in self.ema.items()}
+
+        macd = ema[MACD_FAST] - ema[MACD_SLOW]
+        if not math.isnan(macd):
+            if self.signal is None:
+                self.signal = macd
+            else:
+                self.signal += 2 / (MACD_SIGN + 1) * (macd - self.signal)
+            self.macd_count += 1
+        signal = self.signal if self.macd_count >= MACD_SIGN else NAN
+
+        # The first bar counts as no move, as in `ta`
+        change = 0.0 if previous is None else close - previous
+        up, down = max(change, 0.0), max(-change, 0.0)
+        if self.avg_up is None:
+            self.avg_up, self.avg_down = up, down
+        else:
+            self.avg_up += (up - self.avg_up) / RSI_WINDOW
+            self.avg_down += (down - self.avg_down) / RSI_WINDOW
+        rsi = NAN
+        if self.count >= RSI_WINDOW:
+            rsi = 100.0 if self.avg_down == 0 else 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+        true_range = high - low
+        if previous is not None:
+            true_range = max(true_range, abs(high - previous), abs(low - previous))
+        if self.count <= ATR_WINDOW:
+            # Wilder's average is seeded with the mean of the first window
+            self.tr_total += true_range
+            if self.count == ATR_WINDOW:
+                self.atr = self.tr_total / ATR_WINDOW
+        else:
+            self.atr += (true_range - self.atr) / ATR_WINDOW
+
+        self.closes.push(close)
+        bb_middle = bb_std = NAN
+        if self.closes.full:
+            bb_middle, bb_std = self.closes.mean(), self.closes.std()
+
+        stoch = stoch_k = stoch_d = NAN
+        if not math.isnan(rsi):
+            self.recent_rsi.append(rsi)
+            if len(self.recent_rsi) == STOCH_WINDOW:
+                lowest, highest = min(self.recent_rsi), max(self.recent_rsi)
+                stoch = (rsi - lowest) / (highest - lowest) if highest > lowest else NAN
+                self.recent_stoch.append(stoch)
+                if len(self.recent_stoch) == STOCH_SMOOTH:
+                    stoch_k = sum(self.recent_stoch) / STOCH_SMOOTH
+                    self.recent_k.append(stoch_k)
+                    if len(self.recent_k) == STOCH_SMOOTH:
+                        stoch_d = sum(self.recent_k) / STOCH_SMOOTH
+
+        if not math.isnan(volume):
+            self.has_volume = True
+            self.obv += -volume if previous is not None and close < previous else volume
+
+        realized = NAN
+        if previous is not None:
+            self.returns.push(math.log(close / previous))
+            if self.returns.full:
+                annualize = math.sqrt(SECONDS_PER_YEAR / self.bar_seconds)
+                realized = self.returns.std(ddof=1) * annualize
+
+        self.values = {
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": signal,
+            "bb_lower": bb_middle - BB_DEV * bb_std,
+            "bb_middle": bb_middle,
+            "bb_upper": bb_middle + BB_DEV * bb_std,
+            **{f"ema{span}": ema[span] for span in EMA_SPANS},
+            "atr": self.atr if self.atr is not None else NAN,
+            "stoch_rsi": stoch,
+            "stoch_rsi_k": stoch_k,
+            "stoch_rsi_d": stoch_d,
+            "obv": self.obv if self.has_volume else NAN,
+            "realized_vol": realized,
+            "close": close,
+        }
+
+    def peek(self, bars):
+        """Values after `bars` (still revisable) without committing them."""
+        if not bars:
+            return self.values
+        preview = copy.deepcopy(self)
+        for bar in bars:
+            preview.push(*bar)
+        return preview.values
+
+    def to_dict(self) -> dict:
+        return {
+            **{name: getattr(self, name) for name in self.SCALARS},
+            "ema": {str(span): value for span, value in self.ema.items()},
+            "closes": self.closes.to_dict(),
+            "returns": self.returns.to_dict(),
+            "recent_rsi": list(self.recent_rsi),
+            "recent_stoch": list(self.recent_stoch),
+            "recent_k": list(self.recent_k),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        state = cls(data["bar_seconds"])
+        for name in cls.SCALARS:
+            setattr(state, name, data[name])
+        state.ema = {int(span): value for span, value in data["ema"].items()}
+        state.closes = RollingWindow(BB_WINDOW, **data["closes"])
+        state.returns = RollingWindow(VOL_WINDOW, **data["returns"])
+        state.recent_rsi = deque(data["recent_rsi"], maxlen=STOCH_WINDOW)
+        state.recent_stoch = deque(data["recent_stoch"], maxlen=STOCH_SMOOTH)
+        state.recent_k = deque(data["recent_k"], maxlen=STOCH_SMOOTH)
+        return state
+
+
+def bucket_bars(bars, seconds):
+    """Aggregate stored (ts, close, volume) rows into (start, high, low, close, volume) bars."""
+    if len(bars) == 0:
+        return []
+    ts = np.asarray(bars["ts"])
+    closes = np.asarray(bars["close"])
+    volumes = np.asarray(bars["volume"])
+    starts = ts // seconds * seconds
+    first = np.flatnonzero(np.append(True, starts[1:] != starts[:-1]))
+    last = np.append(first[1:] - 1, len(ts) - 1)
+    return list(
+        zip(
+            starts[first].tolist(),
+            np.maximum.reduceat(closes, first).tolist(),
+            np.minimum.reduceat(closes, first).tolist(),
+            closes[last].tolist(),
+            volumes[last].tolist(),
+        )
+    )
+
+
+class IndicatorStateStore:
+    """
+    Live indicator state per coin and timeframe, following a PriceStore.
+
+    Each `latest` call pushes only the bars stored since the last call.
+    The two newest hourly bars can still be rewritten by the next delta
+    fetch, so buckets touching them are previewed (`peek`) instead of
+    committed. A write reaching into committed bars (e.g. a backfill
+    revising old points, reported through `invalidate`) makes that
+    timeframe rebuild from the stored series on the next call.
+    State is saved as `<coin>-<currency>.indicators.json` next to the
+    price file, so it survives restarts.
+    """
+
+    def __init__(self, prices, timeframes: dict):
+        self.prices = prices
+        self.timeframes = timeframes
+        self._states = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"pushed": 0, "rebuilds": 0, "loaded": 0}
+
+    def _file(self, coin_id, vs_currency):
+        return os.path.join(self.prices.path, f"{coin_id}-{vs_currency}.indicators.json")
+
+    def _lock(self, series):
+        with self._locks_guard:
+            return self._locks.setdefault(series, threading.Lock())
+
+    def _load(self, coin_id, vs_currency):
+        try:
+            with open(self._file(coin_id, vs_currency), encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                return {}
+            self.stats["loaded"] += 1
+            return {
+                name: IndicatorState.from_dict(state)
+                for name, state in data["timeframes"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self, coin_id, vs_currency, states):
+        target = self._file(coin_id, vs_currency)
+        payload = {
+            "version": STATE_VERSION,
+            "timeframes": {name: state.to_dict() for name, state in states.items()},
+        }
+        try:
+            with open(target + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(target + ".tmp", target)
+        except OSError as e:
+            print(f"[WARN] Could not save indicator state for {coin_id}: {e}")
+
+    def invalidate(self, coin_id: str, vs_currency: str, since: int):
+        """Drop timeframes whose committed bars include times from `since` on."""
+        series = (coin_id, vs_currency)
+        with self._lock(series):
+            if series not in self._states:
+                self._states[series] = self._load(coin_id, vs_currency)
+            states = self._states[series]
+            stale = [
+                name
+                for name, state in states.items()
+                if state.ts is not None and since < state.ts + state.bar_seconds
+            ]
+            for name in stale:
+                del states[name]
+            if stale:
+                self.stats["rebuilds"] += len(stale)
+                self._save(coin_id, vs_currency, states)
+
+    @staticmethod
+    def _committed_intact(state, bars, seconds):
+        """The stored bars still end the last committed bucket with the same close."""
+        if state.ts is None:
+            return True
+        end = int(np.searchsorted(bars["ts"], state.ts + seconds, side="left")) - 1
+        if end < 0 or int(bars["ts"][end]) < state.ts:
+            return False
+        return float(bars["close"][end]) == state.close
+
+    def latest(self, coin_id: str, vs_currency: str = "usd"):
+        """
+        {timeframe: rounded indicator values (plus "bars")} for the stored
+        series, or None when nothing is stored yet.
+        """
+        bars = self.prices.read(coin_id, vs_currency)
+        if bars is None or len(bars) == 0:
+            return None
+
+        series = (coin_id, vs_currency)
+        with self._lock(series):
+            if series not in self._states:
+                self._states[series] = self._load(coin_id, vs_currency)
+            states = self._states[series]
+            cutoff = int(bars["ts"][-1]) - self.prices.resolution
+            changed = False
+            result = {}
+
+            for name, seconds in self.timeframes.items():
+                state = states.get(name)
+                # Safety net for files rewritten by another process
+                if state is None or not self._committed_intact(state, bars, seconds):
+                    if state is not None:
+                        self.stats["rebuilds"] += 1
+                    state = states[name] = IndicatorState(seconds)
+                start = 0
+                if state.ts is not None:
+                    start = int(np.searchsorted(bars["ts"], state.ts + seconds, side="left"))
+                buckets = bucket_bars(bars[start:], seconds)
+
+                ready = [bucket for bucket in buckets if bucket[0] + seconds <= cutoff]
+                for bucket in ready:
+                    state.push(*bucket)
+                self.stats["pushed"] += len(ready)
+                changed = changed or bool(ready)
+
+                pending = buckets[len(ready):]
+                values = state.peek(pending)
+                result[name] = {
+                    "bars": state.count + len(pending),
+                    **{
+                        key: round(value, digits) if math.isfinite(value) else None
+                        for key, digits in EXTENDED_ROUNDING.items()
+                        for value in [values.get(key, NAN)]
+                    },
+                }
+
+            if changed:
+                self._save(coin_id, vs_currency, states)
+        return result
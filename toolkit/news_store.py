@@ -0,0 +1,282 @@
+# toolkit/news_store.py
+
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+NEWS_STORE_PATH = os.getenv(
+    "NEWS_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "news.sqlite3"),
+)
+# Posts older than this are pruned after every poll cycle
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "7"))
+# Items handed to the news analyst per coin
+NEWS_TOP_K = int(os.getenv("NEWS_TOP_K", "8"))
+# Hours for a post's recency weight to halve
+NEWS_HALF_LIFE_HOURS = float(os.getenv("NEWS_HALF_LIFE_HOURS", "12"))
+# Seconds a currency's stored posts are served without polling it inline
+NEWS_MAX_AGE = int(os.getenv("NEWS_MAX_AGE", "900"))
+
+NEWS_POLL_ENABLED = os.getenv("NEWS_POLL_ENABLED", "true").lower() in ("1", "true", "yes")
+# Seconds between background poll cycles
+NEWS_POLL_INTERVAL = int(os.getenv("NEWS_POLL_INTERVAL", "120"))
+# Feed pages followed per currency while they are all newer than the cursor
+NEWS_POLL_PAGES = int(os.getenv("NEWS_POLL_PAGES", "3"))
+# Currencies not requested for this long drop out of the poll set
+NEWS_TRACK_HOURS = int(os.getenv("NEWS_TRACK_HOURS", "24"))
+
+# Ranking weight per source domain (unlisted sources weigh 1.0);
+# NEWS_SOURCE_WEIGHTS="coindesk.com=1.5,example.com=0.5" overrides entries
+SOURCE_WEIGHTS = {
+    "reuters.com": 1.4,
+    "bloomberg.com": 1.4,
+    "coindesk.com": 1.3,
+    "theblock.co": 1.3,
+    "cointelegraph.com": 1.2,
+    "decrypt.co": 1.1,
+    **{
+        domain.strip(): float(weight)
+        for domain, _, weight in (
+            item.partition("=")
+            for item in os.getenv("NEWS_SOURCE_WEIGHTS", "").split(",")
+            if "=" in item
+        )
+    },
+}
+# Whole-market feed (no currency filter)
+MARKET = "*"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    source TEXT,
+    domain TEXT,
+    url TEXT,
+    published INTEGER NOT NULL,
+    votes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS post_currencies (
+    currency TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    post_id TEXT NOT NULL,
+    PRIMARY KEY (currency, post_id)
+);
+CREATE INDEX IF NOT EXISTS post_currencies_recent
+    ON post_currencies (currency, published DESC);
+CREATE INDEX IF NOT EXISTS posts_published ON posts (published);
+CREATE TABLE IF NOT EXISTS cursors (
+    currency TEXT PRIMARY KEY,
+    last_published INTEGER,
+    polled_at REAL,
+    requested_at REAL
+);
+"""
+
+
+def parse_post(post):
+    """A CryptoPanic post as a store row dict, or None when it is unusable."""
+    title = (post.get("title") or "").strip()
+    published = post.get("published_at")
+    if not title or not published:
+        return None
+    url = post.get("url") or post.get("original_url") or "https://cryptopanic.com/"
+    source = post.get("source") or {}
+    votes = post.get("votes") or {}
+    return {
+        "id": str(post.get("id") or post.get("slug") or url),
+        "title": title,
+        "source": source.get("title", "Unknown"),
+        "domain": source.get("domain", ""),
+        "url": url,
+        "published": int(datetime.fromisoformat(published.replace("Z", "+00:00")).timestamp()),
+        "votes": sum(int(v) for v in votes.values() if isinstance(v, (int, float))),
+        "currencies": [
+            c["code"].upper()
+            for c in post.get("currencies") or post.get("instruments") or []
+            if isinstance(c, dict) and c.get("code")
+        ],
+    }
+
+
+def relevance(row, now):
+    """Recency (exponential decay) × source weight × a log bonus for votes."""
+    age_hours = max(now - row["published"], 0) / 3600
+    recency = 0.5 ** (age_hours / NEWS_HALF_LIFE_HOURS)
+    weight = SOURCE_WEIGHTS.get(row["domain"] or "", 1.0)
+    return recency * weight * (1 + math.log1p(row["votes"]) / 4)
+
+
+class NewsStore:
+    """
+    Local CryptoPanic posts in SQLite, keyed by post id.
+
+    Posts are indexed per currency by publish time; a per-currency cursor
+    (newest publish time seen) lets polls stop paging at what is already
+    stored. Re-seen posts only refresh their vote counts. Reads rank the
+    recent posts of a currency and return the top K.
+    """
+
+    def __init__(self, path: str = NEWS_STORE_PATH, retention_days: int = NEWS_RETENTION_DAYS):
+        self.path = path
+        self.retention = retention_days * 86400
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One connection shared by the worker threads, serialized by a lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+        self.stats = {"polls": 0, "new_posts": 0, "reads": 0, "inline_polls": 0}
+
+    def cursor(self, currency: str):
+        """(last_published, polled_at) for a currency, or None if never polled."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_published, polled_at FROM cursors WHERE currency = ?",
+                (currency,),
+            ).fetchone()
+        return None if row is None or row["polled_at"] is None else tuple(row)
+
+    def touch(self, currency: str, now=None):
+        """Record a request for a currency, keeping it in the poll set."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO cursors (currency, requested_at) VALUES (?, ?) "
+                "ON CONFLICT (currency) DO UPDATE SET requested_at = excluded.requested_at",
+                (currency, now or time.time()),
+            )
+
+    def tracked(self, now=None):
+        """Currencies requested within NEWS_TRACK_HOURS."""
+        since = (now or time.time()) - NEWS_TRACK_HOURS * 3600
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT currency FROM cursors WHERE requested_at >= ?", (since,)
+            ).fetchall()
+        return [row["currency"] for row in rows]
+
+    def add(self, currency: str, rows, now=None):
+        """
+        Merge parsed posts fetched for `currency` and advance its cursor.
+        Returns how many were not stored before.
+        """
+        now = now or time.time()
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO posts (id, title, source, domain, url, published, votes) "
+                "VALUES (:id, :title, :source, :domain, :url, :published, :votes)",
+                rows,
+            )
+            new = self._db.total_changes - before
+            self._db.executemany(
+                "UPDATE posts SET votes = :votes WHERE id = :id AND votes != :votes", rows
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO post_currencies (currency, published, post_id) "
+                "VALUES (?, ?, ?)",
+                [
+                    (code, row["published"], row["id"])
+                    for row in rows
+                    for code in {currency, *row["currencies"]}
+                ],
+            )
+            newest = max((row["published"] for row in rows), default=None)
+            self._db.execute(
+                "INSERT INTO cursors (currency, last_published, polled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (currency) DO UPDATE SET polled_at = excluded.polled_at, "
+                "last_published = MAX(COALESCE(last_published, 0), "
+                "COALESCE(excluded.last_published, 0))",
+                (currency, newest, now),
+            )
+        self.stats["polls"] += 1
+        self.stats["new_posts"] += new
+        return new
+
+    def top(self, currency: str, k: int = NEWS_TOP_K, now=None):
+        """The `k` most relevant posts of the retention window, best first."""
+        now = now or time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT p.title, p.source, p.domain, p.url, p.published, p.votes "
+                "FROM post_currencies c JOIN posts p ON p.id = c.post_id "
+                "WHERE c.currency = ? AND c.published >= ? "
+                "ORDER BY c.published DESC LIMIT 200",
+                (currency, now - self.retention),
+            ).fetchall()
+        self.stats["reads"] += 1
+        return sorted(rows, key=lambda row: relevance(row, now), reverse=True)[:k]
+
+    def prune(self, now=None):
+        cutoff = (now or time.time()) - self.retention
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM post_currencies WHERE published < ?", (cutoff,))
+            self._db.execute("DELETE FROM posts WHERE published < ?", (cutoff,))
+
+
+class NewsPoller:
+    """
+    Background loop that keeps the news store current for every recently
+    requested currency, so the news tool reads locally instead of waiting
+    on CryptoPanic.
+    """
+
+    def __init__(self, agent, interval: int = NEWS_POLL_INTERVAL):
+        self.agent = agent
+        self.interval = interval
+        self._task = None
+        self.last_run = {}
+
+    async def run_once(self):
+        started = time.perf_counter()
+        store = self.agent.store
+        polled, new, failed = 0, 0, 0
+        for currency in await asyncio.to_thread(store.tracked):
+            result = await self.agent.apoll(currency)
+            if isinstance(result, dict):
+                failed += 1
+                print(f"[WARN] News poll failed for {currency}: {result['error']}")
+            else:
+                polled += 1
+                new += result
+        await asyncio.to_thread(store.prune)
+        self.last_run = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "polled": polled,
+            "new_posts": new,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] News poll cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "interval_seconds": self.interval,
+            "last_run": self.last_run,
+            "store": self.agent.store.stats,
+        }
@@ -0,0 +1,132 @@
+# toolkit/price_store.py
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+PRICE_STORE_DIR = os.getenv(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "prices"),
+)
+# Seconds per stored bar; CoinGecko serves hourly points for ranges of 1-90 days
+PRICE_RESOLUTION = int(os.getenv("PRICE_RESOLUTION", "3600"))
+# History kept per coin; it grows through deltas past what one backfill returns
+PRICE_RETENTION_DAYS = int(os.getenv("PRICE_RETENTION_DAYS", "365"))
+# Longest range fetched in one backfill request while staying hourly
+PRICE_BACKFILL_DAYS = int(os.getenv("PRICE_BACKFILL_DAYS", "90"))
+# Seconds the newest stored point is good enough to skip the delta request
+PRICE_FRESHNESS = int(os.getenv("PRICE_FRESHNESS", "300"))
+
+BAR_DTYPE = np.dtype([("ts", "<i8"), ("close", "<f8"), ("volume", "<f8")])
+
+
+class PriceStore:
+    """
+    Local per-coin price history as memory-mapped NumPy files.
+
+    One `<coin>-<currency>.npy` per series holds (ts, close, volume) rows,
+    bucketed to `resolution` seconds and sorted by time. Reads map the file
+    instead of loading it. Writes merge new points in (the newest point of
+    a bucket wins, so the still-open bar keeps updating), trim to the
+    retention window and atomically replace the file.
+    """
+
+    def __init__(
+        self,
+        path: str = PRICE_STORE_DIR,
+        resolution: int = PRICE_RESOLUTION,
+        retention_days: int = PRICE_RETENTION_DAYS,
+    ):
+        self.path = path
+        self.resolution = resolution
+        self.retention = retention_days * 86400
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"backfills": 0, "deltas": 0, "fresh": 0}
+
+    def _file(self, coin_id, vs_currency):
+        return os.path.join(self.path, f"{coin_id}-{vs_currency}.npy")
+
+    def _lock(self, series):
+        with self._locks_guard:
+            return self._locks.setdefault(series, threading.Lock())
+
+    def read(self, coin_id: str, vs_currency: str = "usd"):
+        """The whole stored series as a read-only memory-mapped array (or None)."""
+        try:
+            return np.load(self._file(coin_id, vs_currency), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def plan_fetch(self, coin_id: str, vs_currency: str, days: int, now=None):
+        """
+        Return the (from, to) unix-seconds range still missing for a
+        `days` lookback, or None when the stored series is fresh enough.
+        """
+        now = now or time.time()
+        bars = self.read(coin_id, vs_currency)
+        if bars is None or len(bars) == 0 or int(bars["ts"][-1]) < now - days * 86400:
+            # Cold (or too stale to bridge): one backfill of the longest hourly
+            # range, so later, longer lookbacks are served locally
+            self.stats["backfills"] += 1
+            return int(now) - PRICE_BACKFILL_DAYS * 86400, int(now)
+
+        # Bars are bucketed, so the file's write time is when data last arrived
+        if now - os.path.getmtime(self._file(coin_id, vs_currency)) < PRICE_FRESHNESS:
+            self.stats["fresh"] += 1
+            return None
+        last = int(bars["ts"][-1])
+        # Refetch from the last (possibly still open) bar onwards
+        self.stats["deltas"] += 1
+        return last - self.resolution, int(now)
+
+    def append(self, coin_id: str, vs_currency: str, prices, volumes=None):
+        """
+        Merge CoinGecko `[[ms, value], ...]` price/volume points into the
+        series. Returns the earliest bar time written (None if nothing was).
+        """
+        if not prices:
+            return None
+        points = np.asarray(prices, dtype="f8")
+        new = np.zeros(len(points), dtype=BAR_DTYPE)
+        new["ts"] = (points[:, 0] // 1000).astype("i8") // self.resolution * self.resolution
+        new["close"] = points[:, 1]
+        if volumes:
+            volume_by_ms = dict((int(ms), value) for ms, value in volumes)
+            new["volume"] = [volume_by_ms.get(int(ms), np.nan) for ms in points[:, 0]]
+        else:
+            new["volume"] = np.nan
+
+        series = (coin_id, vs_currency)
+        with self._lock(series):
+            old = self.read(coin_id, vs_currency)
+            merged = new if old is None else np.concatenate([np.asarray(old), new])
+            # Stable sort keeps arrival order within a bucket; keep the last one
+            merged = merged[np.argsort(merged["ts"], kind="stable")]
+            last_of_bucket = np.append(merged["ts"][1:] != merged["ts"][:-1], True)
+            merged = merged[last_of_bucket]
+            merged = merged[merged["ts"] >= merged["ts"][-1] - self.retention]
+
+            os.makedirs(self.path, exist_ok=True)
+            target = self._file(coin_id, vs_currency)
+            tmp = target + ".tmp.npy"
+            np.save(tmp, merged)
+            os.replace(tmp, target)
+        return int(new["ts"].min())
+
+    def frame(self, coin_id: str, vs_currency: str = "usd", days: int = 30):
+        """The last `days` of bars as a DataFrame (close, volume) on a UTC index."""
+        bars = self.read(coin_id, vs_currency)
+        if bars is None or len(bars) == 0:
+            return None
+        start = int(bars["ts"][-1]) - days * 86400
+        window = bars[np.searchsorted(bars["ts"], start, side="left"):]
+        df = pd.DataFrame(
+            {"close": np.array(window["close"]), "volume": np.array(window["volume"])},
+            index=pd.to_datetime(np.array(window["ts"]), unit="s", utc=True),
+        )
+        df.index.name = "timestamp"
+        return df
@@ -0,0 +1,122 @@
+# toolkit/rate_limit.py
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Requests per minute each provider's plan allows (CoinGecko demo: 30/min)
+COINGECKO_RATE_PER_MIN = float(os.getenv("COINGECKO_RATE_PER_MIN", "30"))
+CRYPTOPANIC_RATE_PER_MIN = float(os.getenv("CRYPTOPANIC_RATE_PER_MIN", "60"))
+# Requests a provider may take in a burst before the per-minute rate applies
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "5"))
+
+# Retries after a 429/5xx before the response is handed back as-is
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "1.0"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30.0"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Host -> (provider name, requests per minute)
+PROVIDER_HOSTS = {
+    "api.coingecko.com": ("coingecko", COINGECKO_RATE_PER_MIN),
+    "pro-api.coingecko.com": ("coingecko", COINGECKO_RATE_PER_MIN),
+    "cryptopanic.com": ("cryptopanic", CRYPTOPANIC_RATE_PER_MIN),
+}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """Retry-After if the server sent one, else full-jitter exponential backoff."""
+    if retry_after is not None:
+        return min(retry_after, HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2**attempt))
+
+
+class ProviderLimiter:
+    """
+    Token bucket for one upstream provider, shared by sync and async callers.
+
+    Callers reserve a slot rather than poll for a token: each reservation
+    is handed the next free send time under a lock, so waiters are served
+    strictly in arrival order across every concurrent pipeline. A 429
+    pushes the next free slot past its Retry-After for everyone.
+    """
+
+    def __init__(self, name: str, rate_per_min: float, burst: int = RATE_LIMIT_BURST):
+        self.name = name
+        self.interval = 60.0 / rate_per_min
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        # Time at which the bucket is back to a full burst
+        self._full_at = time.monotonic()
+        self.stats = {
+            "requests": 0,
+            "waited": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "throttled": 0,
+            "retries": 0,
+        }
+
+    def reserve(self) -> float:
+        """Claim the next send slot and return how many seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            # Each request moves "full again" one interval further out; the
+            # bucket holds `burst` intervals, so only the excess has to wait
+            full_at = max(self._full_at, now) + self.interval
+            wait = max(0.0, full_at - now - self.burst * self.interval)
+            self._full_at = full_at
+
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds_total"] += wait
+                self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], wait)
+            return wait
+
+    def throttled(self, delay: float):
+        """The provider pushed back (429): hold every caller for `delay` seconds."""
+        with self._lock:
+            self.stats["throttled"] += 1
+            empty_until = time.monotonic() + delay
+            self._full_at = max(self._full_at, empty_until + self.burst * self.interval)
+
+    def snapshot(self) -> dict:
+        stats = dict(self.stats)
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 3)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 3)
+        stats["wait_seconds_avg"] = round(
+            stats["wait_seconds_total"] / stats["requests"] if stats["requests"] else 0.0, 3
+        )
+        stats["rate_per_min"] = round(60.0 / self.interval, 2)
+        return stats
+
+
+def build_limiters(hosts=None) -> dict:
+    """Return {host: ProviderLimiter}; hosts of one provider share a bucket."""
+    by_provider = {}
+    limiters = {}
+    for host, (provider, rate_per_min) in (hosts or PROVIDER_HOSTS).items():
+        if provider not in by_provider:
+            by_provider[provider] = ProviderLimiter(provider, rate_per_min)
+        limiters[host] = by_provider[provider]
+    return limiters
@@ -0,0 +1,124 @@
+# toolkit/tool_cache.py
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from cachetools import TTLCache
+
+# Freshness per upstream data type, in seconds
+DEFAULT_TTLS = {
+    "ohlc": 60,
+    "technicals": 60,
+    "fundamentals": 600,
+    "news": 180,
+    "posts": 180,
+}
+DEFAULT_MAXSIZE = 512
+
+
+def is_cacheable(value) -> bool:
+    """
+    Upstream failures come back as {"error": ...} / {"warning": ...} and partial
+    data carries "warnings": never cached, so the next call retries.
+    """
+    return not (
+        isinstance(value, dict) and ("error" in value or "warning" in value or "warnings" in value)
+    )
+
+
+class ToolCache:
+    """
+    Size-bounded TTL caches for raw upstream tool data, one per data type.
+
+    Concurrent requests for the same (kind, key) are deduplicated: only the
+    first caller hits the network, the rest wait for and share its result.
+    Both blocking (`get_or_fetch`) and async (`aget_or_fetch`) callers are
+    supported, matching the sync/async tool implementations.
+    """
+
+    def __init__(self, ttls=None, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._caches = {
+            kind: TTLCache(maxsize=maxsize, ttl=ttl) for kind, ttl in self.ttls.items()
+        }
+        # cachetools caches are not thread-safe
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._inflight = {}
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+
+    def _lookup(self, kind, key, stat="hits"):
+        with self._lock:
+            cache = self._caches[kind]
+            if key in cache:
+                self.stats[kind][stat] += 1
+                return True, cache[key]
+        return False, None
+
+    def _store(self, kind, key, value):
+        if is_cacheable(value):
+            with self._lock:
+                self._caches[kind][key] = value
+
+    def put(self, kind, key, value):
+        """Fill an entry computed elsewhere (e.g. a batch primed in one pass)."""
+        self._store(kind, key, value)
+
+    def get_or_fetch(self, kind, key, fetch):
+        found, value = self._lookup(kind, key)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault((kind, key), threading.Lock())
+        with key_lock:
+            # Another thread may have filled it while we waited on the key lock
+            found, value = self._lookup(kind, key, stat="coalesced")
+            if found:
+                return value
+
+            self.stats[kind]["misses"] += 1
+            value = fetch()
+            self._store(kind, key, value)
+
+        with self._lock:
+            self._key_locks.pop((kind, key), None)
+        return value
+
+    async def aget_or_fetch(self, kind, key, fetch):
+        found, value = self._lookup(kind, key)
+        if found:
+            return value
+
+        task = self._inflight.get((kind, key))
+        if task is None:
+            self.stats[kind]["misses"] += 1
+            task = asyncio.create_task(self._aload(kind, key, fetch))
+            self._inflight[(kind, key)] = task
+            task.add_done_callback(lambda _: self._inflight.pop((kind, key), None))
+        else:
+            self.stats[kind]["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    async def _aload(self, kind, key, fetch):
+        value = await fetch()
+        self._store(kind, key, value)
+        return value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                kind: {
+                    **self.stats[kind],
+                    "size": len(cache),
+                    "ttl_seconds": self.ttls[kind],
+                }
+                for kind, cache in self._caches.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            for cache in self._caches.values():
+                cache.clear()
@@ -1,89 +1,232 @@
-import requests
+import asyncio
+import os
+import threading
+
+from cachetools import TTLCache
+
+from toolkit.coin_registry import CoinRegistry, coin_registry
+from toolkit.http_client import HttpClient
+
+# Seconds a bulk /coins/markets row can stand in for per-coin market data
+MARKET_SNAPSHOT_TTL = int(os.getenv("MARKET_SNAPSHOT_TTL", "120"))
+# Slow-moving data: the slim /coins/{id} doc (name, categories, platforms,
+# TVL) and the exchange listings count are refetched far less often
+DETAIL_TTL = int(os.getenv("FUNDAMENTALS_DETAIL_TTL", "3600"))
+LISTINGS_TTL = int(os.getenv("LISTINGS_COUNT_TTL", "21600"))
+# Coins each of those caches holds; any listed coin can be requested
+FUNDAMENTALS_CACHE_SIZE = int(os.getenv("FUNDAMENTALS_CACHE_SIZE", "2048"))
+
+# /coins/{id} without tickers, community/developer stats, translations or sparkline
+SLIM_DETAIL_PARAMS = {
+    "localization": "false",
+    "tickers": "false",
+    "community_data": "false",
+    "developer_data": "false",
+    "sparkline": "false",
+}
 
 
 class FundamentalAnalystAgent:
-    def __init__(self, coingecko_api_key: str = None):
+    def __init__(
+        self,
+        coingecko_api_key: str = None,
+        http: HttpClient = None,
+        coins: CoinRegistry = None,
+    ):
         self.coingecko_api_key = coingecko_api_key
-        self.base_url = "https://api.coingecko.com/api/v3"
-        # Map common coin names to CoinGecko IDs
-        self.coin_id_map = {
-            "bitcoin": "bitcoin",
-            "btc": "bitcoin",
-            "ethereum": "ethereum",
-            "eth": "ethereum",
-            "xrp": "ripple",
-            "ripple": "ripple",
-            "tether": "tether",
-            "usdt": "tether",
-            "binance coin": "binancecoin",
-            "bnb": "binancecoin",
-            "solana": "solana",
-            "sol": "solana",
-            "usd coin": "usd-coin",
-            "usdc": "usd-coin",
-            "dogecoin": "dogecoin",
-            "doge": "dogecoin",
-            "tron": "tron",
-            "trx": "tron",
-            "cardano": "cardano",
-            "ada": "cardano",
-            "hyperliquid": "hyperliquid",
-            "hype": "hyperliquid",
-            "stellar": "stellar",
-            "xlm": "stellar",
-            "sui": "sui",
-            "chainlink": "chainlink",
-            "link": "chainlink",
-            "hedera": "hedera",
-            "hbar": "hedera",
-            "bitcoin cash": "bitcoin-cash",
-            "bch": "bitcoin-cash",
-            "avalanche": "avalanche",
-            "avax": "avalanche",
-            "wrapped bitcoin": "wrapped-bitcoin",
-            "wbtc": "wrapped-bitcoin",
-            "toncoin": "toncoin",
-            "ton": "toncoin",
-            "polkadot": "polkadot",
-            "dot": "polkadot",
+        self.http = http or HttpClient()
+        self.coins = coins or coin_registry
+        # Overridable so replay runs can point at the local stand-in server
+        self.base_url = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+        self._market_snapshot = TTLCache(maxsize=FUNDAMENTALS_CACHE_SIZE, ttl=MARKET_SNAPSHOT_TTL)
+        self._details = TTLCache(maxsize=FUNDAMENTALS_CACHE_SIZE, ttl=DETAIL_TTL)
+        self._listings = TTLCache(maxsize=FUNDAMENTALS_CACHE_SIZE, ttl=LISTINGS_TTL)
+        # cachetools caches are not thread-safe
+        self._lock = threading.Lock()
+
+    def normalize_id(self, coin_id: str):
+        """CoinGecko id for a name/symbol/id; None for an unknown coin."""
+        return self.coins.coin_id(coin_id)
+
+    # ---------------- Bulk market snapshot ---------------- #
+
+    def _markets_args(self, coin_ids):
+        ids = [i for i in dict.fromkeys(map(self.normalize_id, coin_ids)) if i]
+        params = {
+            "vs_currency": "usd",
+            "ids": ",".join(ids),
+            "per_page": len(ids),
+            "x_cg_demo_api_key": self.coingecko_api_key,
         }
+        return f"{self.base_url}/coins/markets", params
+
+    def fetch_markets(self, coin_ids) -> dict:
+        """
+        Fetch core market metrics for many coins with one /coins/markets call.
+
+        Rows are kept for MARKET_SNAPSHOT_TTL seconds so that per-coin
+        `fetch_data` calls made right after (e.g. by a batch run) skip the
+        market part of the detail request.
+        """
+        url, params = self._markets_args(coin_ids)
+        try:
+            return self._store_markets(self.http.get(url, params=params))
+        except Exception as e:
+            return {"error": f"Failed to fetch markets: {str(e)}"}
+
+    async def afetch_markets(self, coin_ids) -> dict:
+        """Async variant of `fetch_markets`."""
+        url, params = self._markets_args(coin_ids)
+        try:
+            return self._store_markets(await self.http.aget(url, params=params))
+        except Exception as e:
+            return {"error": f"Failed to fetch markets: {str(e)}"}
+
+    def _store_markets(self, response) -> dict:
+        if response.status_code != 200:
+            return {"error": f"Markets data failed: {response.status_code}"}
+
+        rows = {row["id"]: row for row in response.json() if row.get("id")}
+        with self._lock:
+            self._market_snapshot.update(rows)
+        return rows
+
+    def _fresh(self, store, coin_id):
+        with self._lock:
+            return store.get(coin_id)
+
+    def _put(self, store, coin_id, value):
+        with self._lock:
+            store[coin_id] = value
+
+    # ---------------- Per-coin fundamentals ---------------- #
+
+    def _plan(self, coin_id: str):
+        """
+        Return the requests still needed for `coin_id` as {part: (url, params)}.
+
+        Market metrics come from a /coins/markets row, the slim detail doc
+        and listings count from their own longer-lived caches, so a warm
+        coin needs at most the one small markets call.
+        """
+        key = {"x_cg_demo_api_key": self.coingecko_api_key}
+        plan = {}
+        if self._fresh(self._market_snapshot, coin_id) is None:
+            plan["markets"] = self._markets_args([coin_id])
+        if self._fresh(self._details, coin_id) is None:
+            plan["detail"] = (
+                f"{self.base_url}/coins/{coin_id}",
+                {**SLIM_DETAIL_PARAMS, **key},
+            )
+        if self._fresh(self._listings, coin_id) is None:
+            # First page only: the count comes from the pagination header
+            plan["listings"] = (
+                f"{self.base_url}/coins/{coin_id}/tickers",
+                {"page": 1, "include_exchange_logo": "false", **key},
+            )
+        return plan
 
     def fetch_data(self, coin_id: str) -> dict:
         """Return fundamental metrics from CoinGecko."""
-        # Normalize coin_id
-        coin_id = self.coin_id_map.get(coin_id.lower(), coin_id.lower())
-        params = {"localization": "false", "x_cg_demo_api_key": self.coingecko_api_key}
+        coin_id, query = self.normalize_id(coin_id), coin_id
+        if coin_id is None:
+            return {"error": f"Unknown coin: {query}"}
+        try:
+            responses = {
+                part: self.http.get(url, params=params)
+                for part, (url, params) in self._plan(coin_id).items()
+            }
+            return self._assemble(coin_id, responses)
+
+        except Exception as e:
+            return {"error": f"Failed to fetch data: {str(e)}"}
+
+    async def afetch_data(self, coin_id: str) -> dict:
+        """Async variant of `fetch_data`; the needed CoinGecko calls run concurrently."""
+        coin_id, query = self.normalize_id(coin_id), coin_id
+        if coin_id is None:
+            return {"error": f"Unknown coin: {query}"}
         try:
-            coin_resp = requests.get(f"{self.base_url}/coins/{coin_id}", params=params)
-            tickers_resp = requests.get(
-                f"{self.base_url}/coins/{coin_id}/tickers", params=params
+            plan = self._plan(coin_id)
+            results = await asyncio.gather(
+                *(self.http.aget(url, params=params) for url, params in plan.values())
             )
+            return self._assemble(coin_id, dict(zip(plan, results)))
 
-            if coin_resp.status_code != 200:
-                return {"error": f"Coin data failed: {coin_resp.status_code}"}
-            if tickers_resp.status_code != 200:
-                return {"warning": f"Ticker data failed: {tickers_resp.status_code}"}
+        except Exception as e:
+            return {"error": f"Failed to fetch data: {str(e)}"}
 
-            coin_data = coin_resp.json()
-            tickers_data = tickers_resp.json()
+    # ---------------- Parsing ---------------- #
 
-            return {
+    def _store_detail(self, coin_id, response):
+        """Cache the slim detail doc; returns a warning if it couldn't be fetched."""
+        if response.status_code != 200:
+            print(f"[WARN] Coin detail for {coin_id} failed: {response.status_code}")
+            return f"Coin detail unavailable ({response.status_code})"
+        coin_data = response.json()
+        market_data = coin_data.get("market_data") or {}
+        self._put(
+            self._details,
+            coin_id,
+            {
                 "Name": coin_data.get("name", "Unknown"),
                 "Symbol": coin_data.get("symbol", "").upper(),
-                "Market Cap (USD)": coin_data.get("market_data", {})
-                .get("market_cap", {})
-                .get("usd", 0),
-                "Circulating Supply": coin_data.get("market_data", {}).get(
-                    "circulating_supply", 0
-                ),
-                "Total Supply": coin_data.get("market_data", {}).get("total_supply", 0),
-                "TVL (USD)": coin_data.get("market_data", {}).get(
-                    "total_value_locked", None
-                ),
+                "TVL (USD)": market_data.get("total_value_locked", None),
                 "Token Categories": coin_data.get("categories") or [],
                 "Token Platforms": coin_data.get("platforms") or {},
-                "Exchange Listings Count": len(tickers_data.get("tickers", [])),
-            }
+            },
+        )
 
-        except Exception as e:
-            return {"error": f"Failed to fetch data: {str(e)}"}
+    def _store_listings(self, coin_id, response):
+        """Cache the listings count; returns a warning if it couldn't be fetched."""
+        if response.status_code != 200:
+            print(f"[WARN] Ticker data for {coin_id} failed: {response.status_code}")
+            return f"Exchange listings unavailable ({response.status_code})"
+        total = response.headers.get("total")
+        count = int(total) if total and total.isdigit() else len(
+            response.json().get("tickers", [])
+        )
+        self._put(self._listings, coin_id, count)
+
+    def _assemble(self, coin_id, responses) -> dict:
+        if "markets" in responses:
+            rows = self._store_markets(responses["markets"])
+            if "error" in rows:
+                return {"error": f"Coin data failed: {rows['error']}"}
+        # Partial data is still returned, but says which parts are missing
+        warnings = []
+        if "detail" in responses:
+            warnings.append(self._store_detail(coin_id, responses["detail"]))
+        if "listings" in responses:
+            warnings.append(self._store_listings(coin_id, responses["listings"]))
+        warnings = [warning for warning in warnings if warning]
+
+        market_row = self._fresh(self._market_snapshot, coin_id)
+        if market_row is None:
+            return {"error": f"Coin data failed: no market data for '{coin_id}'"}
+        detail = self._fresh(self._details, coin_id) or {
+            "Name": market_row.get("name", "Unknown"),
+            "Symbol": (market_row.get("symbol") or "").upper(),
+            "TVL (USD)": None,
+            "Token Categories": [],
+            "Token Platforms": {},
+        }
+
+        payload = {
+            "Name": detail["Name"],
+            "Symbol": detail["Symbol"],
+            "Current Price (USD)": market_row.get("current_price"),
+            "Market Cap (USD)": market_row.get("market_cap") or 0,
+            "24H Volume (USD)": market_row.get("total_volume"),
+            "Circulating Supply": market_row.get("circulating_supply") or 0,
+            "Total Supply": market_row.get("total_supply") or 0,
+            "Max Supply": market_row.get("max_supply"),
+            "Market Rank": market_row.get("market_cap_rank"),
+            "TVL (USD)": detail["TVL (USD)"],
+            "Token Categories": detail["Token Categories"],
+            "Token Platforms": detail["Token Platforms"],
+            "Exchange Listings Count": self._fresh(self._listings, coin_id),
+        }
+        if warnings:
+            payload["warnings"] = warnings
+        return payload
@@ -0,0 +1,330 @@
+# tools/indicators.py
+"""
+Vectorized technical indicators over a coins × timestamps matrix.
+
+Every function takes 2-D float arrays (one row per coin, oldest bar
+first) and computes all rows at once. Rows of different lengths are
+right-aligned and left-padded with NaN (see `align`); values before a
+row's first bar stay NaN.
+
+Results match the `ta` package defaults (fillna=False), which the
+single-coin tool used before: RSI is Wilder-smoothed with
+`ewm(alpha=1/window, adjust=False, min_periods=window)`, MACD lines and
+EMAs are `ewm(span, adjust=False, min_periods=span)`, Bollinger bands use
+a population (ddof=0) rolling std and ATR is Wilder's average seeded with
+the mean of the first `window` true ranges. `benchmarks/bench_indicators.py`
+checks this against `ta`.
+"""
+
+import numpy as np
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+BB_WINDOW, BB_DEV = 20, 2
+EMA_SPANS = (20, 50, 200)
+ATR_WINDOW = 14
+STOCH_WINDOW, STOCH_SMOOTH = 14, 3
+# Log returns per realized-volatility estimate
+VOL_WINDOW = 30
+SECONDS_PER_YEAR = 365 * 86400
+
+
+def align(series_list) -> np.ndarray:
+    """Stack 1-D series of any length into a right-aligned NaN-padded matrix."""
+    rows = [np.asarray(s, dtype="f8") for s in series_list]
+    width = max((len(r) for r in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        if len(row):
+            matrix[i, width - len(row):] = row
+    return matrix
+
+
+# ---------------- Time-major kernels ---------------- #
+# Internally every matrix is timestamps × coins, so each step of a
+# recursion reads one contiguous row holding all coins.
+
+
+def _first_valid(cols):
+    return np.argmax(~np.isnan(cols), axis=0)
+
+
+def _before(cols, index):
+    """Mask of the rows of each column that come before `index[column]`."""
+    return np.arange(cols.shape[0])[:, None] < index
+
+
+def _ewm(cols: np.ndarray, alpha, min_periods=0) -> np.ndarray:
+    """
+    Recursive EWMA (pandas `adjust=False`) down a time-major matrix.
+
+    `alpha` and `min_periods` may be per-column arrays, so several
+    averages of different spans run in the same pass. Each column starts
+    from its first non-NaN value and stays NaN for `min_periods - 1` bars
+    after it; an interior NaN bar carries the previous average forward.
+    The loop runs over time only, so its cost barely grows with the
+    number of coins.
+    """
+    valid = ~np.isnan(cols)
+    first = np.argmax(valid, axis=0)
+    state = cols[first, np.arange(cols.shape[1])]
+    alpha = np.broadcast_to(np.asarray(alpha, dtype="f8"), state.shape)
+
+    out = np.empty(cols.shape)
+    step = np.empty(state.shape)
+    for t in range(cols.shape[0]):
+        np.subtract(cols[t], state, out=step)
+        step *= alpha
+        np.add(state, step, out=state, where=valid[t])
+        out[t] = state
+
+    out[_before(cols, first + np.maximum(np.asarray(min_periods), 1) - 1)] = np.nan
+    return out
+
+
+def _rolling(cols, window, reduce, keep=None):
+    """
+    `reduce(windows, axis=-1)` over each trailing `window` rows; a window
+    containing NaN yields NaN. With `keep` only the last `keep` rows are
+    computed and returned.
+    """
+    if keep is not None:
+        cols = cols[-(keep + window - 1):]
+    out = np.full(cols.shape, np.nan)
+    if len(cols) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(cols, window, axis=0)
+        out[window - 1:] = reduce(windows, axis=-1)
+    return out if keep is None else out[-keep:]
+
+
+def _moves(cols):
+    """Per-bar gains and losses, as `ta` feeds them to the RSI averages."""
+    diff = np.diff(cols, axis=0, prepend=np.nan)
+    # An undefined change (first bar, NaN neighbour) counts as no move
+    up, down = np.fmax(diff, 0.0), np.fmax(-diff, 0.0)
+    padding = _before(cols, _first_valid(cols))
+    up[padding] = np.nan
+    down[padding] = np.nan
+    return up, down
+
+
+def _rsi_from(avg_up, avg_down):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+
+
+def _true_range(high, low, close):
+    previous = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    # fmax skips NaN, so the first bar's range is just high - low
+    return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+
+
+def _wilder_seed(values, window):
+    """
+    Blank each column up to its `window`-th value and put the mean of the
+    first `window` values there, so an alpha=1/window EWMA over the result
+    is Wilder's average the way `ta` seeds ATR.
+    """
+    first = _first_valid(values)
+    seed_at = first + window - 1
+    totals = np.cumsum(np.nan_to_num(values), axis=0)
+    seeded = values.copy()
+    seeded[_before(values, seed_at)] = np.nan
+
+    columns = np.flatnonzero(seed_at < len(values))
+    start, end = first[columns], seed_at[columns]
+    preceding = np.where(start > 0, totals[np.maximum(start - 1, 0), columns], 0.0)
+    seeded[end, columns] = (totals[end, columns] - preceding) / window
+    return seeded
+
+
+def _rsi(cols, window):
+    up, down = _moves(cols)
+    avg_up, avg_down = np.hsplit(_ewm(np.hstack([up, down]), 1 / window, window), 2)
+    return _rsi_from(avg_up, avg_down)
+
+
+def _macd(cols, fast, slow, sign):
+    spans = np.repeat([fast, slow], cols.shape[1])
+    ema_fast, ema_slow = np.hsplit(_ewm(np.hstack([cols, cols]), 2 / (spans + 1), spans), 2)
+    line = ema_fast - ema_slow
+    return line, _ewm(line, 2 / (sign + 1), sign)
+
+
+def _bollinger(cols, window, dev, keep=None):
+    middle = _rolling(cols, window, np.mean, keep)
+    std = _rolling(cols, window, np.std, keep)
+    return middle - dev * std, middle, middle + dev * std
+
+
+def _time_major(matrix):
+    return np.ascontiguousarray(np.atleast_2d(np.asarray(matrix, dtype="f8")).T)
+
+
+# ---------------- Public API (coins × timestamps) ---------------- #
+
+
+def ewm(x: np.ndarray, alpha, min_periods=0) -> np.ndarray:
+    """`_ewm` for a coins × timestamps matrix."""
+    return _ewm(_time_major(x), alpha, min_periods).T
+
+
+def rsi(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    return _rsi(_time_major(close), window).T
+
+
+def macd(close: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, sign: int = MACD_SIGN):
+    """Return (macd line, signal line)."""
+    line, signal = _macd(_time_major(close), fast, slow, sign)
+    return line.T, signal.T
+
+
+def bollinger(close: np.ndarray, window: int = BB_WINDOW, dev: float = BB_DEV, last_only=False):
+    """Return (lower, middle, upper) bands."""
+    keep = 1 if last_only else None
+    return tuple(band.T for band in _bollinger(_time_major(close), window, dev, keep))
+
+
+def compute(close: np.ndarray, last_only: bool = True) -> dict:
+    """
+    RSI, MACD/signal and Bollinger bands for every row of `close`.
+
+    Returns {name: array}; with `last_only` each array holds one value per
+    coin (the latest bar), otherwise the full coins × timestamps series.
+    """
+    cols = _time_major(close)
+    macd_line, macd_signal = _macd(cols, MACD_FAST, MACD_SLOW, MACD_SIGN)
+    bb_lower, bb_middle, bb_upper = _bollinger(cols, BB_WINDOW, BB_DEV, 1 if last_only else None)
+    series = {
+        "rsi": _rsi(cols, RSI_WINDOW),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "bb_lower": bb_lower,
+        "bb_middle": bb_middle,
+        "bb_upper": bb_upper,
+        "close": cols,
+    }
+    if last_only:
+        return {name: values[-1] for name, values in series.items()}
+    return {name: values.T for name, values in series.items()}
+
+
+def compute_extended(high, low, close, volume, bar_seconds: int, last_only: bool = True) -> dict:
+    """
+    The base set plus EMA 20/50/200, ATR, stochastic RSI, OBV and
+    annualized realized volatility, for bars of `bar_seconds` each.
+
+    Every exponential average (MACD fast/slow, the trend EMAs, RSI gains
+    and losses, ATR) runs in one stacked recursion; only the MACD signal,
+    which smooths two of them, needs a second. Rolling windows are only
+    evaluated over the tail when `last_only`. Returns {name: array} like
+    `compute`.
+    """
+    high, low, cols, volume = (_time_major(m) for m in (high, low, close, volume))
+    n = cols.shape[1]
+    keep = 1 if last_only else None
+
+    spans = (MACD_FAST, MACD_SLOW, *EMA_SPANS)
+    up, down = _moves(cols)
+    true_range = _wilder_seed(_true_range(high, low, cols), ATR_WINDOW)
+    alpha = np.concatenate(
+        [np.full(n, 2 / (span + 1)) for span in spans]
+        + [np.full(2 * n, 1 / RSI_WINDOW), np.full(n, 1 / ATR_WINDOW)]
+    )
+    min_periods = np.concatenate(
+        [np.full(n, span) for span in spans] + [np.full(2 * n, RSI_WINDOW), np.ones(n)]
+    )
+    averages = np.hsplit(
+        _ewm(np.hstack([cols] * len(spans) + [up, down, true_range]), alpha, min_periods),
+        len(spans) + 3,
+    )
+    ema = dict(zip(spans, averages))
+    avg_up, avg_down, atr = averages[len(spans):]
+
+    line = ema[MACD_FAST] - ema[MACD_SLOW]
+    signal = _ewm(line, 2 / (MACD_SIGN + 1), MACD_SIGN)
+    rsi_values = _rsi_from(avg_up, avg_down)
+    bb_lower, bb_middle, bb_upper = _bollinger(cols, BB_WINDOW, BB_DEV, keep)
+
+    # Stochastic RSI: where RSI sits in its own recent range, then %K/%D smoothing
+    stoch_keep = None if keep is None else 2 * STOCH_SMOOTH - 1
+    lowest = _rolling(rsi_values, STOCH_WINDOW, np.min, stoch_keep)
+    highest = _rolling(rsi_values, STOCH_WINDOW, np.max, stoch_keep)
+    recent = rsi_values if stoch_keep is None else rsi_values[-stoch_keep:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoch = (recent - lowest) / (highest - lowest)
+    stoch_k = _rolling(stoch, STOCH_SMOOTH, np.mean, None if keep is None else STOCH_SMOOTH)
+    stoch_d = _rolling(stoch_k, STOCH_SMOOTH, np.mean, keep)
+
+    # On-balance volume; as in `ta` an unchanged (or first) close adds volume
+    diff = np.diff(cols, axis=0, prepend=np.nan)
+    obv = np.nancumsum(np.where(diff < 0, -volume, volume), axis=0)
+    obv[_before(cols, _first_valid(cols)) | np.all(np.isnan(volume), axis=0)] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(cols), axis=0, prepend=np.nan)
+    realized = _rolling(returns, VOL_WINDOW, lambda w, axis: np.std(w, axis=axis, ddof=1), keep)
+    realized = realized * np.sqrt(SECONDS_PER_YEAR / bar_seconds)
+
+    series = {
+        "rsi": rsi_values,
+        "macd": line,
+        "macd_signal": signal,
+        "bb_lower": bb_lower,
+        "bb_middle": bb_middle,
+        "bb_upper": bb_upper,
+        **{f"ema{span}": ema[span] for span in EMA_SPANS},
+        "atr": atr,
+        "stoch_rsi": stoch,
+        "stoch_rsi_k": stoch_k,
+        "stoch_rsi_d": stoch_d,
+        "obv": obv,
+        "realized_vol": realized,
+        "close": cols,
+    }
+    if last_only:
+        return {name: values[-1] for name, values in series.items()}
+    return {name: values.T for name, values in series.items()}
+
+
+# Decimal places reported per indicator by the technicals tool
+ROUNDING = {
+    "rsi": 2,
+    "macd": 4,
+    "macd_signal": 4,
+    "bb_lower": 2,
+    "bb_middle": 2,
+    "bb_upper": 2,
+    "close": 2,
+}
+EXTENDED_ROUNDING = {
+    **ROUNDING,
+    **{f"ema{span}": 2 for span in EMA_SPANS},
+    "atr": 4,
+    "stoch_rsi": 4,
+    "stoch_rsi_k": 4,
+    "stoch_rsi_d": 4,
+    "obv": 0,
+    "realized_vol": 4,
+}
+
+
+def _rounded(values, rounding):
+    return [
+        {
+            name: round(float(values[name][i]), digits) if np.isfinite(values[name][i]) else None
+            for name, digits in rounding.items()
+        }
+        for i in range(len(values["close"]))
+    ]
+
+
+def latest(close: np.ndarray) -> list:
+    """Latest base indicator values as one rounded dict per row (None where undefined)."""
+    return _rounded(compute(close, last_only=True), ROUNDING)
+
+
+def latest_extended(high, low, close, volume, bar_seconds: int) -> list:
+    """Latest `compute_extended` values as one rounded dict per row."""
+    values = compute_extended(high, low, close, volume, bar_seconds, last_only=True)
+    return _rounded(values, EXTENDED_ROUNDING)
@@ -1,93 +1,172 @@
-import requests
-from datetime import datetime
-
-# ✅ Mapping coin names to symbols for CryptoPanic
-COIN_SYMBOL_MAP = {
-    "bitcoin": "BTC",
-    "ethereum": "ETH",
-    "ripple": "XRP",
-    "tether": "USDT",
-    "binance coin": "BNB",
-    "solana": "SOL",
-    "usd coin": "USDC",
-    "dogecoin": "DOGE",
-    "tron": "TRX",
-    "cardano": "ADA",
-    "hyperliquid": "HYPE",
-    "stellar": "XLM",
-    "sui": "SUI",
-    "chainlink": "LINK",
-    "hedera": "HBAR",
-    "bitcoin cash": "BCH",
-    "avalanche": "AVAX",
-    "wrapped bitcoin": "WBTC",
-    "toncoin": "TON",
-    "polkadot": "DOT",
-    # Add more as needed
-}
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from toolkit.coin_registry import CoinRegistry, coin_registry
+from toolkit.http_client import HttpClient
+from toolkit.news_store import (
+    MARKET,
+    NEWS_MAX_AGE,
+    NEWS_POLL_PAGES,
+    NEWS_TOP_K,
+    NewsStore,
+    parse_post,
+)
 
 
 class FinanceNewsAnalystAgent:
-    def __init__(self, cryptopanic_api_key: str):
+    def __init__(
+        self,
+        cryptopanic_api_key: str,
+        http: HttpClient = None,
+        coins: CoinRegistry = None,
+        store: NewsStore = None,
+    ):
         self.api_key = cryptopanic_api_key
-        self.base_url = "https://cryptopanic.com/api/developer/v2/posts/"
+        self.http = http or HttpClient()
+        self.coins = coins or coin_registry
+        # 📰 Local post store; the news tool reads its top-ranked items
+        self.store = store or NewsStore()
+        # Overridable so replay runs can point at the local stand-in server
+        cryptopanic_url = os.getenv("CRYPTOPANIC_BASE_URL", "https://cryptopanic.com")
+        self.base_url = f"{cryptopanic_url}/api/developer/v2/posts/"
 
-    def fetch_news(self, currencies=None, filter_type="hot", kind="news", public=True):
-        """Fetch news articles for specific coin(s) or the whole market."""
+    def _build_params(self, currency, kind, public):
+        # No `filter`: the unfiltered feed is newest-first, which the cursor walk
+        # relies on (hot/rising are ranked feeds); hotness is ranked locally by votes
         params = {
             "auth_token": self.api_key,
-            "filter": filter_type,
             "kind": kind,
         }
 
         if public:
             params["public"] = "true"
 
-        if currencies:
-            # ✅ Map coin name to ticker symbol if available
-            symbol = COIN_SYMBOL_MAP.get(currencies.lower(), currencies.upper())
-            params["currencies"] = symbol
+        if currency != MARKET:
+            # ✅ CryptoPanic filters by ticker symbol
+            params["currencies"] = currency
+
+        return params
+
+    def _currency(self, currencies):
+        return self.coins.symbol(currencies) if currencies else MARKET
+
+    # ---------------- Polling ---------------- #
 
+    def poll(self, currency, max_pages=NEWS_POLL_PAGES, kind="news", public=True):
+        """
+        Fetch the posts of `currency` newer than its cursor into the store,
+        paging the chronological feed until it reaches the cursor.
+        Returns the number of new posts, or {"error": ...}.
+        """
+        cursor = self.store.cursor(currency)
+        url, params = self.base_url, self._build_params(currency, kind, public)
+        rows = []
         try:
-            response = requests.get(self.base_url, params=params)
-
-            if response.status_code != 200:
-                return {"error": f"API Error {response.status_code}: {response.text}"}
-
-            results = response.json().get("results", [])
-            parsed_news = []
-
-            for post in results:
-                title = post.get("title", "").strip()
-                published = post.get("published_at")
-                url = (
-                    post.get("url")
-                    or post.get("original_url")
-                    or "https://cryptopanic.com/"
-                )
-                source = post.get("source", {}).get("title", "Unknown")
-
-                if not title or not published:
-                    continue
-
-                pub_time = datetime.fromisoformat(
-                    published.replace("Z", "+00:00")
-                ).strftime("%b %d %Y %H:%M UTC")
-
-                parsed_news.append(
-                    {
-                        "Title": title,
-                        "Source": source,
-                        "Published": pub_time,
-                        "URL": url,
-                    }
-                )
-
-            return (
-                parsed_news
-                if parsed_news
-                else {"error": f"No news found for {currencies}"}
-            )
+            for _ in range(max_pages):
+                page = self._parse_page(self.http.get(url, params=params))
+                if isinstance(page, dict):
+                    return page
+                page_rows, url = page
+                rows.extend(page_rows)
+                # `next` links carry the query string already
+                params = None
+                if not url or self._reached(page_rows, cursor):
+                    break
+        except Exception as e:
+            return {"error": f"Failed to fetch news: {str(e)}"}
+        return self.store.add(currency, rows)
 
+    async def apoll(self, currency, max_pages=NEWS_POLL_PAGES, kind="news", public=True):
+        """Async variant of `poll`; store reads/writes run off the event loop."""
+        cursor = await asyncio.to_thread(self.store.cursor, currency)
+        url, params = self.base_url, self._build_params(currency, kind, public)
+        rows = []
+        try:
+            for _ in range(max_pages):
+                page = self._parse_page(await self.http.aget(url, params=params))
+                if isinstance(page, dict):
+                    return page
+                page_rows, url = page
+                rows.extend(page_rows)
+                params = None
+                if not url or self._reached(page_rows, cursor):
+                    break
         except Exception as e:
             return {"error": f"Failed to fetch news: {str(e)}"}
+        return await asyncio.to_thread(self.store.add, currency, rows)
+
+    @staticmethod
+    def _reached(rows, cursor):
+        """True once a page holds posts at or before the stored cursor."""
+        return cursor is not None and cursor[0] is not None and any(
+            row["published"] <= cursor[0] for row in rows
+        )
+
+    def _parse_page(self, response):
+        if response.status_code != 200:
+            return {"error": f"API Error {response.status_code}: {response.text}"}
+
+        data = response.json()
+        rows = [row for row in map(parse_post, data.get("results", [])) if row]
+        return rows, data.get("next")
+
+    # ---------------- Reading ---------------- #
+
+    def _needs_poll(self, currency):
+        """Poll inline only when the background poller has not kept it fresh."""
+        self.store.touch(currency)
+        cursor = self.store.cursor(currency)
+        return cursor is None or time.time() - cursor[1] > NEWS_MAX_AGE, cursor is None
+
+    def fetch_news(self, currencies=None, filter_type="hot", kind="news", public=True):
+        """
+        Top-ranked stored news for specific coin(s) or the whole market.
+        `filter_type` is kept for existing callers; the store is filled from
+        the chronological feed and ranked locally (recency, source, votes).
+        """
+        currency = self._currency(currencies)
+        stale, cold = self._needs_poll(currency)
+        if stale:
+            self.store.stats["inline_polls"] += 1
+            result = self.poll(currency, 1, kind, public)
+            if isinstance(result, dict):
+                if cold:
+                    return result
+                print(f"[WARN] News poll for {currency} failed, serving stored posts: {result}")
+        return self._top(currency, currencies)
+
+    async def afetch_news(
+        self, currencies=None, filter_type="hot", kind="news", public=True
+    ):
+        """Async variant of `fetch_news`; store reads/writes run off the event loop."""
+        currency = self._currency(currencies)
+        stale, cold = await asyncio.to_thread(self._needs_poll, currency)
+        if stale:
+            self.store.stats["inline_polls"] += 1
+            result = await self.apoll(currency, 1, kind, public)
+            if isinstance(result, dict):
+                if cold:
+                    return result
+                print(f"[WARN] News poll for {currency} failed, serving stored posts: {result}")
+        return await asyncio.to_thread(self._top, currency, currencies)
+
+    def _top(self, currency, currencies, k=NEWS_TOP_K):
+        parsed_news = [
+            {
+                "Title": row["title"],
+                "Source": row["source"],
+                "Published": datetime.fromtimestamp(row["published"], tz=timezone.utc).strftime(
+                    "%b %d %Y %H:%M UTC"
+                ),
+                "URL": row["url"],
+            }
+            for row in self.store.top(currency, k)
+        ]
+
+        return (
+            parsed_news
+            if parsed_news
+            else {"error": f"No news found for {currencies}"}
+        )
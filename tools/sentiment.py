@@ -1,8 +1,14 @@
 # tools/sentiment.py
 
+import asyncio
 import os
 import re
-import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from toolkit.coin_registry import CoinRegistry, coin_registry
+from toolkit.http_client import HttpClient
 
 try:
     import snscrape.modules.twitter as sntwitter
@@ -10,6 +16,91 @@ except ImportError:
     sntwitter = None
     print("[WARN] snscrape not installed. Twitter/X sentiment will be disabled.")
 
+# Seconds one call may spend on all sources together; what arrived by then is used
+SENTIMENT_DEADLINE = float(os.getenv("SENTIMENT_DEADLINE", "8"))
+# Distinct posts after which every source stops early
+SENTIMENT_TARGET_POSTS = int(os.getenv("SENTIMENT_TARGET_POSTS", "40"))
+
+NO_POSTS = "No recent posts found for this coin from CryptoPanic or Twitter/X."
+
+
+def clean_post(text):
+    # Remove URLs
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text)
+    # Remove mentions and hashtags
+    text = re.sub(r"@\w+|#\w+", "", text)
+    # Normalize whitespace and truncate
+    return re.sub(r"\s+", " ", text).strip()[:500]
+
+
+class PostBatch:
+    """
+    Posts collected for one call, shared by the concurrently running
+    sources (thread-safe).
+
+    Sources `offer` posts one at a time; once the batch is full or the
+    deadline has passed, `offer` returns False and the source stops.
+    Posts offered after the deadline are counted as dropped.
+    """
+
+    def __init__(self, sources, target=SENTIMENT_TARGET_POSTS, deadline=SENTIMENT_DEADLINE):
+        self.target = target
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline
+        self.posts = []
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.sources = {
+            name: {"posts": 0, "duplicates": 0, "dropped": 0, "seconds": None}
+            for name in sources
+        }
+
+    def remaining(self):
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    @property
+    def full(self):
+        return len(self.posts) >= self.target
+
+    def offer(self, source, text):
+        """Add one raw post; False tells the source to stop."""
+        counts = self.sources[source]
+        if self.remaining() == 0:
+            counts["dropped"] += 1
+            return False
+        text = clean_post(text)
+        with self._lock:
+            if self.full:
+                return False
+            key = text.lower()
+            if not text or key in self._seen:
+                counts["duplicates"] += 1
+                return True
+            self._seen.add(key)
+            self.posts.append(text)
+            counts["posts"] += 1
+            return not self.full
+
+    def extend(self, source, texts):
+        """Offer a fetched list; what the deadline cut off counts as dropped."""
+        for i, text in enumerate(texts):
+            if not self.offer(source, text):
+                if self.remaining() == 0:
+                    self.sources[source]["dropped"] += len(texts) - i - 1
+                return
+
+    def finish(self, source):
+        self.sources[source]["seconds"] = round(time.monotonic() - self.started, 3)
+
+    def report(self):
+        """Per-source posts, duplicates, dropped and seconds (None = cut off)."""
+        return {
+            "seconds": round(time.monotonic() - self.started, 3),
+            "posts": len(self.posts),
+            "deadline_hit": self.remaining() == 0 and not self.full,
+            "sources": {name: dict(counts) for name, counts in self.sources.items()},
+        }
+
 
 class SocialSentimentScraper:
     """
@@ -17,38 +108,81 @@ class SocialSentimentScraper:
     - News posts from CryptoPanic
     - Social chatter from Twitter/X via snscrape
 
-    It exposes `get_cleaned_posts(coin_symbol)` which is used by the
-    existing `get_reddit_sentiment_posts` tool, so the rest of the
-    system does not need to change.
+    Both sources run concurrently under one deadline per call and stop
+    early once `target` distinct posts are in; whatever arrived in time
+    is returned. It exposes `get_cleaned_posts(coin_symbol)` which is
+    used by the existing `get_reddit_sentiment_posts` tool, so the rest
+    of the system does not need to change.
     """
 
-    def __init__(self, cryptopanic_key: str | None = None):
+    SOURCES = ("cryptopanic", "twitter")
+
+    def __init__(
+        self,
+        cryptopanic_key: str | None = None,
+        http: HttpClient = None,
+        coins: CoinRegistry = None,
+        deadline: float = SENTIMENT_DEADLINE,
+        target: int = SENTIMENT_TARGET_POSTS,
+    ):
+        self.http = http or HttpClient()
+        self.coins = coins or coin_registry
+        # Overridable so replay runs can point at the local stand-in server
+        cryptopanic_url = os.getenv("CRYPTOPANIC_BASE_URL", "https://cryptopanic.com")
+        self.posts_url = f"{cryptopanic_url}/api/v1/posts/"
         # Support both env names for safety
         self.cryptopanic_key = (
             cryptopanic_key
             or os.getenv("CRYPTO_PANIC_KEY")
             or os.getenv("CRYPTO_PANIC_API_KEY")
         )
+        self.deadline = deadline
+        self.target = target
+        # A source cut off by the deadline finishes in the background (it stops
+        # at its next post), so blocking callers never wait on it
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sentiment")
+        self.stats = {
+            "calls": 0,
+            "early_stops": 0,
+            "deadline_hits": 0,
+            "sources": {
+                name: {"posts": 0, "dropped": 0, "cut_off": 0} for name in self.SOURCES
+            },
+        }
+        self.last_report = {}
 
     # ---------------- CryptoPanic (News) ---------------- #
 
-    def fetch_cryptopanic_posts(self, coin_symbol: str, limit: int = 30):
+    def fetch_cryptopanic_posts(self, coin_symbol: str, limit: int = 30, timeout=10):
         if not self.cryptopanic_key:
             print("[WARN] CRYPTO_PANIC_KEY not set. Skipping CryptoPanic news.")
             return []
 
-        params = {
-            "auth_token": self.cryptopanic_key,
-            "currencies": coin_symbol,
-            "filter": "important",
-            "kind": "news",
-        }
+        try:
+            res = self.http.get(
+                self.posts_url,
+                params=self._cryptopanic_params(coin_symbol),
+                timeout=timeout,
+            )
+            res.raise_for_status()
+            data = res.json()
+        except Exception as e:
+            print(f"[WARN] CryptoPanic fetch failed: {e}")
+            return []
+
+        return self._parse_cryptopanic(data, limit)
+
+    async def afetch_cryptopanic_posts(self, coin_symbol: str, limit: int = 30, timeout=10):
+        """Async variant of `fetch_cryptopanic_posts`."""
+        if not self.cryptopanic_key:
+            print("[WARN] CRYPTO_PANIC_KEY not set. Skipping CryptoPanic news.")
+            return []
 
         try:
-            res = requests.get(
-                "https://cryptopanic.com/api/v1/posts/",
-                params=params,
-                timeout=10,
+            res = await self.http.aget(
+                self.posts_url,
+                params=self._cryptopanic_params(coin_symbol),
+                timeout=timeout,
             )
             res.raise_for_status()
             data = res.json()
@@ -56,6 +190,17 @@ class SocialSentimentScraper:
             print(f"[WARN] CryptoPanic fetch failed: {e}")
             return []
 
+        return self._parse_cryptopanic(data, limit)
+
+    def _cryptopanic_params(self, coin_symbol: str):
+        return {
+            "auth_token": self.cryptopanic_key,
+            "currencies": self.coins.symbol(coin_symbol),
+            "filter": "important",
+            "kind": "news",
+        }
+
+    def _parse_cryptopanic(self, data, limit):
         posts = []
         for item in data.get("results", [])[:limit]:
             title = item.get("title") or ""
@@ -67,60 +212,149 @@ class SocialSentimentScraper:
 
     # ---------------- Twitter/X (snscrape) ---------------- #
 
-    def fetch_twitter_posts(self, coin_symbol: str, limit: int = 50):
+    def _twitter_items(self, coin_symbol: str, limit: int = 50, deadline=None):
+        """
+        Tweets as they are scraped. Iteration stops at `limit` items or once
+        the monotonic `deadline` has passed, checked on every scraped item
+        (empty ones too), so a worker is released as soon as snscrape
+        returns past the deadline.
+        """
         if sntwitter is None:
-            return []
+            return
 
         query = f"{coin_symbol} crypto lang:en"
-        posts = []
+        for i, tweet in enumerate(sntwitter.TwitterSearchScraper(query).get_items()):
+            if i >= limit or (deadline is not None and time.monotonic() >= deadline):
+                break
+            content = getattr(tweet, "content", "")
+            if content:
+                yield content
+
+    def fetch_twitter_posts(self, coin_symbol: str, limit: int = 50):
+        """Cleaned Twitter/X posts alone, collected like a batch source under the deadline."""
+        batch = PostBatch(("twitter",), limit, self.deadline)
+        future = self._pool.submit(self._stream_twitter, batch, coin_symbol, limit)
+        wait([future], timeout=batch.remaining())
+        return list(batch.posts)
+
+    async def afetch_twitter_posts(self, coin_symbol: str, limit: int = 50):
+        """snscrape is blocking, so run it off the event loop."""
+        return await asyncio.to_thread(self.fetch_twitter_posts, coin_symbol, limit)
+
+    # ---------------- Concurrent collection ---------------- #
+
+    def _fetch_timeout(self, batch):
+        # Never wait on a request past the call's deadline
+        return min(10, max(batch.remaining(), 0.1))
+
+    def _stream_twitter(self, batch, coin_symbol, limit=50):
         try:
-            for i, tweet in enumerate(
-                sntwitter.TwitterSearchScraper(query).get_items()
-            ):
-                if i >= limit:
+            for text in self._twitter_items(coin_symbol, limit, batch.deadline):
+                if not batch.offer("twitter", text):
                     break
-                content = getattr(tweet, "content", "")
-                if content:
-                    posts.append(content)
         except Exception as e:
             print(f"[WARN] Twitter/X scraping failed: {e}")
-            return []
+        batch.finish("twitter")
 
-        return posts
+    def _collect_cryptopanic(self, batch, coin_symbol):
+        texts = self.fetch_cryptopanic_posts(coin_symbol, timeout=self._fetch_timeout(batch))
+        batch.extend("cryptopanic", texts)
+        batch.finish("cryptopanic")
+
+    async def _acollect_cryptopanic(self, batch, coin_symbol):
+        texts = await self.afetch_cryptopanic_posts(
+            coin_symbol, timeout=self._fetch_timeout(batch)
+        )
+        batch.extend("cryptopanic", texts)
+        batch.finish("cryptopanic")
+
+    def collect_posts(self, coin_symbol: str):
+        """
+        Run every source concurrently until the batch is full, all of them
+        are done or the deadline fires. Returns (posts, report).
+        """
+        batch = PostBatch(self.SOURCES, self.target, self.deadline)
+        pending = {
+            self._pool.submit(self._collect_cryptopanic, batch, coin_symbol),
+            self._pool.submit(self._stream_twitter, batch, coin_symbol),
+        }
+        while pending and not batch.full:
+            done, pending = wait(pending, timeout=batch.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+        return self._finish(coin_symbol, batch)
+
+    async def acollect_posts(self, coin_symbol: str):
+        """Async variant of `collect_posts`."""
+        batch = PostBatch(self.SOURCES, self.target, self.deadline)
+        pending = {
+            asyncio.create_task(self._acollect_cryptopanic(batch, coin_symbol)),
+            asyncio.ensure_future(
+                asyncio.get_running_loop().run_in_executor(
+                    self._pool, self._stream_twitter, batch, coin_symbol
+                )
+            ),
+        }
+        while pending and not batch.full:
+            done, pending = await asyncio.wait(
+                pending, timeout=batch.remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+        for task in pending:
+            task.cancel()
+        return self._finish(coin_symbol, batch)
+
+    def _finish(self, coin_symbol, batch):
+        report = batch.report()
+        self.last_report = {"coin": coin_symbol, **report}
+        self.stats["calls"] += 1
+        self.stats["early_stops"] += batch.full
+        self.stats["deadline_hits"] += report["deadline_hit"]
+        for name, counts in report["sources"].items():
+            totals = self.stats["sources"][name]
+            totals["posts"] += counts["posts"]
+            totals["dropped"] += counts["dropped"]
+            totals["cut_off"] += counts["seconds"] is None
+        if report["deadline_hit"]:
+            print(f"[WARN] Sentiment sources for {coin_symbol} hit the deadline: {report}")
+        return list(batch.posts), report
 
     # ---------------- Cleaning & Public API ---------------- #
 
     def clean_posts(self, texts):
-        cleaned = []
-        for text in texts:
-            # Remove URLs
-            text = re.sub(r"http\S+|www\S+|https\S+", "", text)
-            # Remove mentions and hashtags
-            text = re.sub(r"@\w+|#\w+", "", text)
-            # Normalize whitespace and truncate
-            text = re.sub(r"\s+", " ", text).strip()[:500]
-            if text:
-                cleaned.append(text)
-        return cleaned
+        """The batch path's cleaning for a plain list: cleaned, empty ones dropped."""
+        return [text for text in map(clean_post, texts) if text]
 
     def get_cleaned_posts(self, coin_symbol: str):
         """
-        Returns a list of cleaned text snippets combining:
+        Returns a list of cleaned, distinct text snippets combining:
         - CryptoPanic news (titles/descriptions)
         - Twitter/X posts
 
         This is used by the `get_reddit_sentiment_posts` tool, so the
         social media agent can keep working without any code changes.
         """
-        crypto_news = self.fetch_cryptopanic_posts(coin_symbol)
-        twitter_posts = self.fetch_twitter_posts(coin_symbol)
+        cleaned, _ = self.collect_posts(coin_symbol)
 
-        combined = crypto_news + twitter_posts
-        cleaned = self.clean_posts(combined)
+        if not cleaned:
+            return [NO_POSTS]
+
+        return cleaned
+
+    async def aget_cleaned_posts(self, coin_symbol: str):
+        """Async variant of `get_cleaned_posts`."""
+        cleaned, _ = await self.acollect_posts(coin_symbol)
 
         if not cleaned:
-            return [
-                "No recent posts found for this coin from CryptoPanic or Twitter/X."
-            ]
+            return [NO_POSTS]
 
         return cleaned
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "deadline_seconds": self.deadline,
+            "target_posts": self.target,
+            "last_call": self.last_report,
+        }
@@ -0,0 +1,210 @@
+# tools/sentiment_scorer.py
+"""
+Lexicon/rule-based sentiment for short crypto posts, batched with NumPy.
+
+VADER-style: every token gets a valence from `LEXICON` (-4..4), shifted
+by the rules VADER uses — a booster word up to three tokens earlier
+("very bullish"), a negation in the same window flips and damps it
+("not bullish"), ALL-CAPS words in mixed-case text are emphasised,
+clauses after "but" outweigh the ones before it, and exclamation marks
+push the total further. The summed valence is normalised to a compound
+polarity in [-1, 1] with `s / sqrt(s² + 15)`.
+
+All posts are tokenized into one flat array and scored in a single
+pass: each distinct word is looked up once, the window rules are
+shifted arrays masked to stay inside a post, and per-post sums are one
+`bincount`. No network, model files or GPU.
+"""
+
+import re
+
+import numpy as np
+
+# Compound polarity beyond which a post counts as bullish / bearish
+POLARITY_THRESHOLD = 0.05
+# VADER's normalisation constant
+ALPHA = 15
+# Tokens before a sentiment word that boosters/negations still reach
+WINDOW = 3
+WINDOW_DECAY = (1.0, 0.95, 0.9)
+NEGATION_SCALAR = -0.74
+CAPS_BOOST = 0.733
+EXCLAMATION_BOOST = 0.292
+MAX_EXCLAMATIONS = 4
+BUT_BEFORE, BUT_AFTER = 0.5, 1.5
+# Characters of each representative post handed to the LLM
+REPRESENTATIVE_CHARS = 200
+
+LEXICON = {
+    # Market direction
+    "bullish": 2.9, "bull": 1.9, "bulls": 1.5, "bearish": -2.9, "bear": -1.9, "bears": -1.5,
+    "moon": 2.5, "mooning": 2.8, "pump": 1.5, "pumping": 1.8, "pumped": 1.3,
+    "dump": -2.1, "dumping": -2.4, "dumped": -2.0, "rally": 2.2, "rallies": 2.2,
+    "rallying": 2.3, "surge": 2.2, "surges": 2.2, "surging": 2.3, "soar": 2.4,
+    "soars": 2.4, "soaring": 2.5, "skyrocket": 2.7, "skyrockets": 2.7, "breakout": 2.0,
+    "rebound": 1.6, "rebounds": 1.6, "recovery": 1.6, "recovers": 1.5, "gain": 1.6,
+    "gains": 1.6, "climb": 1.3, "climbs": 1.3, "rise": 1.2, "rises": 1.2, "rising": 1.2,
+    "uptrend": 1.8, "ath": 2.2, "outperform": 1.8, "outperforms": 1.8, "accumulate": 1.2,
+    "accumulation": 1.3, "buy": 1.0, "buying": 1.1, "long": 0.6, "hodl": 1.3,
+    "crash": -3.0, "crashes": -3.0, "crashing": -3.1, "plunge": -2.7, "plunges": -2.7,
+    "plunging": -2.8, "plummet": -2.9, "plummets": -2.9, "tank": -2.2, "tanks": -2.2,
+    "tanking": -2.4, "slump": -2.2, "slumps": -2.2, "drop": -1.4, "drops": -1.4,
+    "fall": -1.3, "falls": -1.3, "falling": -1.5, "decline": -1.5, "declines": -1.5,
+    "downtrend": -1.8, "selloff": -2.3, "capitulation": -2.5, "correction": -1.2,
+    "loss": -1.8, "losses": -1.9, "liquidated": -2.3, "liquidation": -2.0,
+    "liquidations": -2.1, "underperform": -1.8, "sell": -1.0, "selling": -1.2,
+    "short": -0.6, "rekt": -2.8, "bagholder": -1.9, "bagholders": -1.9,
+    # Risk and trust
+    "hack": -2.9, "hacked": -3.0, "exploit": -2.7, "exploited": -2.8, "scam": -3.2,
+    "scams": -3.2, "fraud": -3.3, "rug": -3.0, "rugpull": -3.3, "ponzi": -3.1,
+    "theft": -2.9, "stolen": -2.8, "lawsuit": -2.1, "sued": -2.2, "sues": -2.2,
+    "ban": -2.2, "banned": -2.4, "bans": -2.2, "crackdown": -2.3, "delist": -2.4,
+    "delisted": -2.5, "delisting": -2.4, "insolvent": -3.0, "insolvency": -3.0,
+    "bankrupt": -3.1, "bankruptcy": -3.1, "outage": -2.0, "vulnerability": -2.2,
+    "fud": -1.9, "fear": -2.0, "panic": -2.5, "risky": -1.5, "risk": -1.0,
+    "warning": -1.6, "warns": -1.6, "concern": -1.3, "concerns": -1.3,
+    "uncertainty": -1.4, "volatile": -0.8, "bubble": -1.8, "overvalued": -1.6,
+    "secure": 1.4, "audited": 1.3, "trusted": 1.7, "safe": 1.5,
+    # Adoption and fundamentals
+    "adoption": 1.9, "approval": 2.0, "approved": 2.1, "approves": 2.0, "etf": 0.8,
+    "partnership": 1.8, "partners": 1.4, "integration": 1.4, "launch": 1.2,
+    "launches": 1.3, "upgrade": 1.6, "upgraded": 1.6, "listing": 1.4, "listed": 1.2,
+    "inflows": 1.7, "inflow": 1.6, "outflows": -1.6, "outflow": -1.5, "record": 1.2,
+    "milestone": 1.7, "growth": 1.7, "growing": 1.5, "innovation": 1.6,
+    "institutional": 0.8, "undervalued": 1.6, "strong": 1.8, "strength": 1.6,
+    "weak": -1.7, "weakness": -1.7, "halt": -1.7, "halted": -1.8, "delay": -1.2,
+    "delayed": -1.3, "reject": -2.0, "rejected": -2.1, "rejects": -2.0,
+    # General opinion
+    "good": 1.9, "great": 3.1, "excellent": 3.2, "amazing": 2.8, "awesome": 3.1,
+    "love": 3.2, "like": 1.5, "best": 3.2, "better": 1.9, "positive": 2.6,
+    "optimistic": 2.3, "confident": 2.2, "win": 2.8, "winning": 2.4, "profit": 2.0,
+    "profits": 2.1, "profitable": 2.1, "opportunity": 1.8, "huge": 1.3,
+    "exciting": 2.2, "excited": 2.1, "happy": 2.7, "wow": 2.3, "lol": 1.8,
+    "bad": -2.5, "terrible": -2.5, "awful": -2.0, "worst": -3.1, "worse": -2.1,
+    "hate": -2.7, "negative": -2.7, "pessimistic": -2.0, "lose": -2.1, "losing": -1.9,
+    "lost": -1.3, "fail": -2.5, "fails": -2.5, "failed": -2.3, "failure": -2.4,
+    "disaster": -3.1, "dead": -3.3, "dying": -2.9, "worried": -1.9, "worry": -1.9,
+    "angry": -2.3, "sad": -2.1, "ugly": -2.3, "trouble": -1.7, "problem": -1.7,
+    "problems": -1.7, "doubt": -1.5, "doubts": -1.5,
+}
+
+BOOSTERS = {
+    "absolutely": 0.293, "completely": 0.293, "extremely": 0.293, "hugely": 0.293,
+    "incredibly": 0.293, "massive": 0.293, "massively": 0.293, "highly": 0.293,
+    "really": 0.293, "so": 0.293, "super": 0.293, "totally": 0.293, "very": 0.293,
+    "most": 0.293, "more": 0.293, "strongly": 0.293, "major": 0.293,
+    "barely": -0.293, "hardly": -0.293, "slightly": -0.293, "somewhat": -0.293,
+    "little": -0.293, "marginally": -0.293, "kinda": -0.293, "partly": -0.293,
+}
+
+NEGATIONS = frozenset(
+    "not no never none nobody nothing neither nor nowhere cannot without "
+    "isn't aren't wasn't weren't don't doesn't didn't won't wouldn't can't "
+    "couldn't shouldn't hasn't haven't hadn't ain't".split()
+)
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z'’]*")
+
+
+def _lookup(words, table, default=0.0):
+    return np.array([table.get(word, default) for word in words], dtype="f8")
+
+
+def score_posts(texts) -> np.ndarray:
+    """Compound polarity in [-1, 1] for every text, in one pass."""
+    texts = list(texts)
+    n = len(texts)
+    if not n:
+        return np.zeros(0)
+
+    tokens = [TOKEN_RE.findall(text.replace("’", "'")) for text in texts]
+    lengths = np.fromiter((len(t) for t in tokens), dtype="i8", count=n)
+    flat = np.array([word for post in tokens for word in post] or [""], dtype=object)
+    if not lengths.sum():
+        return np.zeros(n)
+    post = np.repeat(np.arange(n), lengths)
+
+    # Every distinct word is looked up once
+    lower = np.char.lower(flat.astype(str))
+    words, inverse = np.unique(lower, return_inverse=True)
+    valence = _lookup(words, LEXICON)[inverse]
+    booster = _lookup(words, BOOSTERS)[inverse]
+    negation = np.isin(words, list(NEGATIONS))[inverse]
+    sign = np.sign(valence)
+
+    # ALL-CAPS emphasis, only when the post itself is not shouting throughout
+    caps = np.fromiter((w.isupper() and len(w) > 1 for w in flat), dtype=bool, count=len(flat))
+    mixed = np.bincount(post, weights=caps, minlength=n) < lengths
+    valence += np.where(caps & mixed[post], sign * CAPS_BOOST, 0.0)
+
+    # Boosters and negations up to WINDOW tokens earlier in the same post
+    negated = np.zeros(len(flat), dtype=bool)
+    for distance in range(1, WINDOW + 1):
+        same = np.zeros(len(flat), dtype=bool)
+        same[distance:] = post[distance:] == post[:-distance]
+        earlier_booster = np.zeros(len(flat))
+        earlier_booster[distance:] = booster[:-distance]
+        valence += np.where(same, sign * earlier_booster * WINDOW_DECAY[distance - 1], 0.0)
+        earlier_negation = np.zeros(len(flat), dtype=bool)
+        earlier_negation[distance:] = negation[:-distance]
+        negated |= same & earlier_negation
+    valence = np.where(negated, valence * NEGATION_SCALAR, valence)
+
+    # "but": what follows it counts more than what came before
+    is_but = lower == "but"
+    buts = np.concatenate([[0], np.cumsum(is_but)])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    buts_so_far = buts[1:] - np.repeat(buts[starts], lengths)
+    has_but = np.bincount(post, weights=is_but, minlength=n) > 0
+    valence *= np.where(has_but[post], np.where(buts_so_far > 0, BUT_AFTER, BUT_BEFORE), 1.0)
+
+    total = np.bincount(post, weights=valence, minlength=n)
+    exclamations = np.minimum([text.count("!") for text in texts], MAX_EXCLAMATIONS)
+    total += np.sign(total) * exclamations * EXCLAMATION_BOOST
+    return total / np.sqrt(total * total + ALPHA)
+
+
+def summarize(texts, representative: int = 2) -> dict:
+    """
+    Aggregate sentiment of a batch: mean and dispersion of the compound
+    polarity, bullish/bearish/neutral counts and their ratio, plus the
+    most bullish, most bearish and most typical posts.
+    """
+    texts = list(texts)
+    scores = score_posts(texts)
+    if not len(scores):
+        return {
+            "posts": 0,
+            "mean": None,
+            "std": None,
+            "bullish": 0,
+            "bearish": 0,
+            "neutral": 0,
+            "bull_bear_ratio": None,
+            "representative": [],
+        }
+
+    bullish = int((scores >= POLARITY_THRESHOLD).sum())
+    bearish = int((scores <= -POLARITY_THRESHOLD).sum())
+    mean = float(scores.mean())
+
+    order = np.argsort(scores)
+    picks = [
+        *[i for i in order[::-1][:representative] if scores[i] >= POLARITY_THRESHOLD],
+        *[i for i in order[:representative] if scores[i] <= -POLARITY_THRESHOLD],
+        int(np.argmin(np.abs(scores - mean))),
+    ]
+    return {
+        "posts": len(scores),
+        "mean": round(mean, 4),
+        "std": round(float(scores.std()), 4),
+        "bullish": bullish,
+        "bearish": bearish,
+        "neutral": len(scores) - bullish - bearish,
+        # Bearish count floored at 1 so an all-bullish batch stays finite
+        "bull_bear_ratio": round(bullish / max(bearish, 1), 2),
+        "representative": [
+            {"text": texts[i][:REPRESENTATIVE_CHARS], "polarity": round(float(scores[i]), 3)}
+            for i in dict.fromkeys(int(i) for i in picks)
+        ],
+    }
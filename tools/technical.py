@@ -1,78 +1,198 @@
-import requests
+import asyncio
+import os
+
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
-from ta.volatility import BollingerBands
+
+from tools import indicators
+from toolkit.coin_registry import CoinRegistry, coin_registry
+from toolkit.http_client import HttpClient
+from toolkit.indicator_state import IndicatorStateStore
+from toolkit.price_store import PriceStore
+
+HEADERS = {"accept": "application/json"}
+
+# History behind the technicals tool; CoinGecko stays hourly up to 90 days
+TECHNICALS_DAYS = int(os.getenv("TECHNICALS_DAYS", "90"))
+# Bar sizes (seconds) the fetched hourly series is resampled into
+TIMEFRAMES = {"1h": 3600, "4h": 4 * 3600, "1d": 86400}
+# Timeframe whose base indicators stay at the payload's top level
+BASE_TIMEFRAME = "1h"
 
 
 class TechnicalAnalystAgent:
-    def __init__(self, coingecko_api_key: str = None):
+    def __init__(
+        self,
+        coingecko_api_key: str = None,
+        http: HttpClient = None,
+        coins: CoinRegistry = None,
+        prices: PriceStore = None,
+    ):
         self.coingecko_api_key = coingecko_api_key
-        self.base_url = "https://api.coingecko.com/api/v3"
-        # Map common coin names to CoinGecko IDs
-        self.coin_id_map = {
-            "bitcoin": "bitcoin",
-            "btc": "bitcoin",
-            "ethereum": "ethereum",
-            "eth": "ethereum",
-            "solana": "solana",
-            "sol": "solana",
-            "ripple": "ripple",
-            "xrp": "ripple",
-            "cardano": "cardano",
-            "ada": "cardano",
-        }
-
-    def fetch_ohlc_data(self, coin_id="bitcoin", vs_currency="usd", days=30):
+        self.http = http or HttpClient()
+        self.coins = coins or coin_registry
+        # Local incremental history; None downloads the full window every call
+        self.prices = prices
+        # Live per-coin indicator state following the price store
+        self.states = IndicatorStateStore(prices, TIMEFRAMES) if prices is not None else None
+        # Overridable so replay runs can point at the local stand-in server
+        self.base_url = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+
+    def _request_args(self, coin_id, vs_currency, days):
+        """
+        Return (coin_id, url, params) for the request still needed; url is
+        None when the local price store already covers the window.
+        """
+        coin_id = self.coins.coin_id(coin_id)
+        if coin_id is None:
+            return None, None, None
+        params = {"vs_currency": vs_currency, "x_cg_demo_api_key": self.coingecko_api_key}
+
+        if self.prices is None:
+            url = f"{self.base_url}/coins/{coin_id}/market_chart"
+            return coin_id, url, {**params, "days": days}
+
+        missing = self.prices.plan_fetch(coin_id, vs_currency, days)
+        if missing is None:
+            return coin_id, None, None
+        url = f"{self.base_url}/coins/{coin_id}/market_chart/range"
+        return coin_id, url, {**params, "from": missing[0], "to": missing[1]}
+
+    def fetch_ohlc_data(self, coin_id="bitcoin", vs_currency="usd", days=TECHNICALS_DAYS):
         """Fetch OHLC data from CoinGecko."""
-        coin_id = self.coin_id_map.get(coin_id.lower(), coin_id.lower())
-        url = f"{self.base_url}/coins/{coin_id}/market_chart"
-        params = {
-            "vs_currency": vs_currency,
-            "days": days,
-            "x_cg_demo_api_key": self.coingecko_api_key,
-        }
-        headers = {"accept": "application/json"}
+        resolved, url, params = self._request_args(coin_id, vs_currency, days)
+        if resolved is None:
+            return {"error": f"Unknown coin: {coin_id}"}
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=20)
-            if response.status_code != 200:
-                return {"error": f"Failed to fetch OHLC: {response.status_code}"}
-
-            data = response.json()
-            prices = data.get("prices", [])
-            if not prices:
-                return {"error": "No OHLC price data found."}
-            df = pd.DataFrame(prices, columns=["timestamp", "close"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-            df.set_index("timestamp", inplace=True)
-            df["close"] = pd.to_numeric(df["close"], errors="coerce")
-            return df
+            response = None
+            if url is not None:
+                response = self.http.get(url, params=params, headers=HEADERS)
+            return self._handle_response(response, resolved, vs_currency, days)
         except Exception as e:
             return {"error": f"Failed to fetch OHLC data: {str(e)}"}
 
-    def compute_indicators(self, df: pd.DataFrame):
-        """Compute technical indicators (RSI, MACD, Bollinger Bands)."""
+    async def afetch_ohlc_data(self, coin_id="bitcoin", vs_currency="usd", days=TECHNICALS_DAYS):
+        """
+        Async variant of `fetch_ohlc_data`; price-store reads and writes (file
+        I/O plus the merge) run off the event loop.
+        """
+        resolved, url, params = await asyncio.to_thread(
+            self._request_args, coin_id, vs_currency, days
+        )
+        if resolved is None:
+            return {"error": f"Unknown coin: {coin_id}"}
         try:
-            close = df["close"]
-            indicators = {}
-            rsi_val = RSIIndicator(close=close, window=14).rsi().iloc[-1]
-            indicators["rsi"] = round(float(rsi_val), 2) if pd.notna(rsi_val) else None
-            macd_obj = MACD(close=close, window_slow=26, window_fast=12, window_sign=9)
-            macd_line = macd_obj.macd().iloc[-1]
-            macd_signal = macd_obj.macd_signal().iloc[-1]
-            indicators["macd"] = round(float(macd_line), 4) if pd.notna(macd_line) else None
-            indicators["macd_signal"] = (
-                round(float(macd_signal), 4) if pd.notna(macd_signal) else None
+            response = None
+            if url is not None:
+                response = await self.http.aget(url, params=params, headers=HEADERS)
+            return await asyncio.to_thread(
+                self._handle_response, response, resolved, vs_currency, days
             )
-            bb = BollingerBands(close=close, window=20, window_dev=2)
-            bb_lower = bb.bollinger_lband().iloc[-1]
-            bb_mid = bb.bollinger_mavg().iloc[-1]
-            bb_upper = bb.bollinger_hband().iloc[-1]
-            indicators["bb_lower"] = round(float(bb_lower), 2) if pd.notna(bb_lower) else None
-            indicators["bb_middle"] = round(float(bb_mid), 2) if pd.notna(bb_mid) else None
-            indicators["bb_upper"] = round(float(bb_upper), 2) if pd.notna(bb_upper) else None
-            last_close = close.iloc[-1]
-            indicators["close"] = round(float(last_close), 2) if pd.notna(last_close) else None
-            return indicators
         except Exception as e:
-            return {"error": f"Failed to compute indicators: {str(e)}"}
+            return {"error": f"Failed to fetch OHLC data: {str(e)}"}
+
+    def _handle_response(self, response, coin_id, vs_currency, days):
+        if self.prices is None:
+            return self._parse_response(response)
+
+        if response is not None:
+            if response.status_code == 200:
+                data = response.json()
+                written = self.prices.append(
+                    coin_id, vs_currency, data.get("prices"), data.get("total_volumes")
+                )
+                if written is not None:
+                    self.states.invalidate(coin_id, vs_currency, written)
+            else:
+                # Serve whatever history is stored rather than failing outright
+                print(f"[WARN] Price delta for {coin_id} failed: {response.status_code}")
+
+        df = self.prices.frame(coin_id, vs_currency, days)
+        if df is None or df.empty:
+            status = response.status_code if response is not None else "empty store"
+            return {"error": f"Failed to fetch OHLC: {status}"}
+        # Lets compute_indicators find the live state for this series
+        df.attrs["series"] = (coin_id, vs_currency)
+        return df
+
+    def _parse_response(self, response):
+        if response.status_code != 200:
+            return {"error": f"Failed to fetch OHLC: {response.status_code}"}
+
+        data = response.json()
+        prices = data.get("prices", [])
+        if not prices:
+            return {"error": "No OHLC price data found."}
+        df = pd.DataFrame(prices, columns=["timestamp", "close"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
+        df.set_index("timestamp", inplace=True)
+        df["close"] = pd.to_numeric(df["close"], errors="coerce")
+        return df
+
+    @staticmethod
+    def _resample(df: pd.DataFrame, seconds: int) -> pd.DataFrame:
+        """
+        Bars of `seconds` from the close series: high/low are the extremes
+        of the closes inside each bar (CoinGecko has no intrabar range) and
+        volume is the last trailing-24h figure.
+        """
+        rule = f"{seconds}s"
+        closes = df["close"].resample(rule)
+        bars = pd.DataFrame({"high": closes.max(), "low": closes.min(), "close": closes.last()})
+        bars["volume"] = df["volume"].resample(rule).last() if "volume" in df else float("nan")
+        return bars.dropna(subset=["close"])
+
+    def compute_indicators(self, df: pd.DataFrame):
+        """Compute technical indicators (RSI, MACD, Bollinger Bands, ...) per timeframe."""
+        return self.compute_indicators_many({None: df})[None]
+
+    def compute_indicators_many(self, frames: dict) -> dict:
+        """
+        `compute_indicators` for {coin: df}.
+
+        Series backed by the price store are served from their live
+        indicator state, which only folds in the bars added since the last
+        call; the rest are resampled and computed in one vectorized pass
+        per timeframe.
+
+        Returns {coin: payload}; the payload keeps the hourly base set
+        (rsi, macd, ..., close) at the top level and has the full set per
+        timeframe under "timeframes".
+        """
+        coins = list(frames)
+        try:
+            timeframes = {}
+            if self.states is not None:
+                for coin in coins:
+                    series = frames[coin].attrs.get("series")
+                    if series is not None:
+                        timeframes[coin] = self.states.latest(*series)
+            recompute = {coin: frames[coin] for coin in coins if timeframes.get(coin) is None}
+            timeframes.update(self._recompute_timeframes(recompute))
+
+            payloads = {}
+            for coin in coins:
+                base = timeframes[coin][BASE_TIMEFRAME]
+                payloads[coin] = {name: base[name] for name in indicators.ROUNDING}
+                payloads[coin]["timeframes"] = {
+                    name: {key: value for key, value in values.items() if key != "close"}
+                    for name, values in timeframes[coin].items()
+                }
+            return payloads
+        except Exception as e:
+            return {coin: {"error": f"Failed to compute indicators: {str(e)}"} for coin in coins}
+
+    def _recompute_timeframes(self, frames: dict) -> dict:
+        coins = list(frames)
+        timeframes = {coin: {} for coin in coins}
+        if not coins:
+            return timeframes
+        for name, seconds in TIMEFRAMES.items():
+            bars = [self._resample(frames[coin], seconds) for coin in coins]
+            matrices = [
+                indicators.align(b[column].to_numpy(dtype="f8") for b in bars)
+                for column in ("high", "low", "close", "volume")
+            ]
+            rows = indicators.latest_extended(*matrices, bar_seconds=seconds)
+            for coin, frame, row in zip(coins, bars, rows):
+                timeframes[coin][name] = {"bars": len(frame), **row}
+        return timeframes